@@ -3,25 +3,58 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Iterable
 
-from repocrunch.analyzer import analyze_repo
-from repocrunch.models import SCHEMA_VERSION, RepoAnalysis
+from repocrunch.analyzer import analyze_local, analyze_many, analyze_owner, analyze_repo
+from repocrunch.fleet import scan_dir
+from repocrunch.incremental import reanalyze_repo
+from repocrunch.models import SCHEMA_VERSION, BatchResult, RepoAnalysis
+from repocrunch.results import ResultCache
 
 __version__ = "0.1.0"
-__all__ = ["analyze", "analyze_sync", "RepoAnalysis", "SCHEMA_VERSION", "__version__"]
+__all__ = [
+    "analyze",
+    "analyze_local",
+    "analyze_many",
+    "analyze_owner",
+    "analyze_sync",
+    "BatchResult",
+    "reanalyze_repo",
+    "RepoAnalysis",
+    "ResultCache",
+    "SCHEMA_VERSION",
+    "scan_dir",
+    "__version__",
+]
 
 
 async def analyze(
     repo: str,
     token: str | None = None,
+    graphql: bool = False,
+    tarball: bool = False,
+    fields: Iterable[str] | None = None,
+    result_cache: ResultCache | None = None,
 ) -> RepoAnalysis:
     """Analyze a GitHub repo asynchronously."""
-    return await analyze_repo(repo, token=token)
+    return await analyze_repo(
+        repo, token=token, graphql=graphql, tarball=tarball, fields=fields,
+        result_cache=result_cache,
+    )
 
 
 def analyze_sync(
     repo: str,
     token: str | None = None,
+    graphql: bool = False,
+    tarball: bool = False,
+    fields: Iterable[str] | None = None,
+    result_cache: ResultCache | None = None,
 ) -> RepoAnalysis:
     """Analyze a GitHub repo synchronously."""
-    return asyncio.run(analyze_repo(repo, token=token))
+    return asyncio.run(
+        analyze_repo(
+            repo, token=token, graphql=graphql, tarball=tarball, fields=fields,
+            result_cache=result_cache,
+        )
+    )
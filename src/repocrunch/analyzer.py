@@ -3,16 +3,44 @@
 from __future__ import annotations
 
 import asyncio
+import os
 import re
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Sized
+from dataclasses import replace
 from datetime import datetime, timezone
+from typing import Any
 
-from repocrunch.client import GitHubClient
+from repocrunch.backends import BareRepoClient, GitObjectStore, LocalRepoClient, RepoBackend
+from repocrunch.client import SHA_MEDIA_TYPE, GitHubClient
 from repocrunch.extractors.architecture import extract_architecture
 from repocrunch.extractors.health import extract_health
 from repocrunch.extractors.metadata import extract_metadata
 from repocrunch.extractors.security import extract_security
-from repocrunch.extractors.tech_stack import extract_tech_stack
-from repocrunch.models import RepoAnalysis
+from repocrunch.extractors.tech_stack import MANIFEST_FILES, extract_tech_stack
+from repocrunch.graphql import prefetch_repo
+from repocrunch.metrics import ANALYSES_IN_FLIGHT, ANALYSIS_LATENCY
+from repocrunch.models import BatchResult, RepoAnalysis
+from repocrunch.pathindex import PathIndex
+from repocrunch.planner import (
+    BRANCH_PROTECTION,
+    COMMITS,
+    CONTRIBUTORS,
+    FULL_PLAN,
+    LANGUAGES,
+    MANIFESTS,
+    TREE,
+    AnalysisPlan,
+    plan_analysis,
+)
+from repocrunch.results import ResultCache
+from repocrunch.rules import tree_signals
+from repocrunch.scheduler import RateLimitScheduler
+from repocrunch.tarball import read_tarball
+from repocrunch.trees import complete_tree
+
+# Repo listings (org scans) and local clones have no watcher count
+WATCHERS_UNKNOWN = "Watcher count not available from this source; summary.watchers is 0"
 
 
 def parse_repo_input(raw: str) -> tuple[str, str]:
@@ -32,60 +60,404 @@ def parse_repo_input(raw: str) -> tuple[str, str]:
     raise ValueError(f"Cannot parse repo input: {raw!r}. Use 'owner/repo' or a GitHub URL.")
 
 
+async def _fetch_tree(
+    client: GitHubClient, owner: str, repo: str, warnings: list[str]
+) -> PathIndex | None:
+    """Resolve HEAD to a commit SHA, then fetch its tree from the content-addressed cache.
+
+    If GitHub truncates the recursive listing, the missing directories are
+    fetched separately; a warning records whether the tree ended up complete.
+    """
+    sha = await client.resolve_head(owner, repo)
+    if sha is None:
+        return None
+    tree = await client.get_tree(owner, repo, sha)
+    if tree is None or not tree.truncated:
+        return tree
+    completion = await complete_tree(client, owner, repo, tree)
+    if completion.complete:
+        warnings.append(
+            f"File tree was truncated by GitHub; completed with {completion.fetches} subtree fetches"
+        )
+    else:
+        warnings.append(
+            f"File tree is incomplete: truncated by GitHub and {completion.skipped} "
+            "directories were not fetched; results may miss files"
+        )
+    return completion.index
+
+
+async def _fetch_tarball_tree(
+    client: GitHubClient, owner: str, repo: str, warnings: list[str]
+) -> PathIndex | None:
+    """Build the tree and read root manifests from one streamed tarball download."""
+    sha = await client.resolve_head(owner, repo)
+    if sha is None:
+        return None
+    contents = await read_tarball(
+        client.iter_tarball(owner, repo, sha),
+        wanted=lambda path: path in MANIFEST_FILES,
+    )
+    for name in MANIFEST_FILES:
+        # Oversized manifests weren't read; get_file_content fetches those
+        if name not in contents.skipped:
+            client.prime_file(owner, repo, name, contents.files.get(name))
+    return contents.to_index()
+
+
+async def _skip() -> None:
+    return None
+
+
+async def _add_watchers(
+    client: GitHubClient,
+    owner: str,
+    repo: str,
+    sha: str,
+    analysis: RepoAnalysis,
+    result_cache: ResultCache,
+) -> RepoAnalysis:
+    """Fill in the watcher count of an analysis an org scan stored, and store
+    the upgrade. Inside an org scan the metadata is the primed listing entry,
+    so this makes no call and leaves the analysis as it is."""
+    repo_data = await client.get_repo(owner, repo)
+    if repo_data is None or "subscribers_count" not in repo_data:
+        return analysis
+    analysis.summary.watchers = repo_data["subscribers_count"]
+    analysis.warnings.remove(WATCHERS_UNKNOWN)
+    result_cache.set(owner, repo, sha, analysis, repo_data)
+    return analysis
+
+
+async def _extract(
+    client: RepoBackend,
+    owner: str,
+    repo: str,
+    repo_data: dict[str, Any],
+    languages: dict[str, int] | None,
+    tree: PathIndex | None,
+    warnings: list[str],
+    plan: AnalysisPlan = FULL_PLAN,
+) -> dict[str, Any]:
+    """Phase 2: run the planned extractors over gathered data.
+
+    Returns RepoAnalysis sections; sections outside the plan are left out
+    and take their model defaults.
+    """
+    if tree is None:
+        tree = PathIndex()
+    # One pass over the tree yields every file-path signal the extractors use
+    signals = tree_signals(tree) if plan.wants(TREE) else {}
+    languages = languages or {}
+    primary_language = repo_data.get("language")
+    sections: dict[str, Any] = {}
+
+    if "summary" in plan.sections:
+        sections["summary"] = extract_metadata(repo_data, languages)
+        if "subscribers_count" not in repo_data:
+            warnings.append(WATCHERS_UNKNOWN)
+
+    # Async extractors run concurrently
+    tech_stack, health, security = await asyncio.gather(
+        extract_tech_stack(
+            client, owner, repo, tree, primary_language, signals,
+            read_manifests=plan.wants(MANIFESTS),
+        ) if "tech_stack" in plan.sections else _skip(),
+        extract_health(
+            client, owner, repo, repo_data,
+            commits=plan.wants(COMMITS), contributors=plan.wants(CONTRIBUTORS),
+        ) if "health" in plan.sections else _skip(),
+        extract_security(
+            client, owner, repo, tree, repo_data, warnings, signals,
+            check_protection=plan.wants(BRANCH_PROTECTION),
+        ) if "security" in plan.sections else _skip(),
+    )
+    for name, section in (("tech_stack", tech_stack), ("health", health), ("security", security)):
+        if section is not None:
+            sections[name] = section
+
+    # Architecture is sync — run after tech_stack so we have deps for test detection
+    if "architecture" in plan.sections:
+        deps = tech_stack.key_deps if tech_stack is not None else None
+        sections["architecture"] = extract_architecture(tree, deps, signals)
+
+    return sections
+
+
 async def analyze_repo(
     repo_input: str,
     token: str | None = None,
     client: GitHubClient | None = None,
+    graphql: bool = False,
+    tarball: bool = False,
+    fields: Iterable[str] | None = None,
+    result_cache: ResultCache | None = None,
 ) -> RepoAnalysis:
-    """Analyze a GitHub repo and return structured results."""
+    """Analyze a GitHub repo and return structured results.
+
+    ``fields`` limits the work to the named sections or 'section.field'
+    entries (see planner.py): only the API calls they need are made, and
+    sections not asked for keep their defaults. Raises ValueError for an
+    unknown field.
+
+    With ``graphql=True``, repo metadata, languages, commits, branch protection
+    and root manifests come from one GraphQL query instead of separate REST
+    calls. Falls back to REST when GraphQL is unavailable (e.g. no token).
+
+    With ``tarball=True``, the file tree and manifests come from a single
+    streamed tarball download instead of the tree API and per-file reads.
+
+    With a ``result_cache``, HEAD is resolved first; if the repo was already
+    analyzed at that commit the stored analysis is returned (in full, even
+    when ``fields`` asks for less) without further calls. Full analyses are
+    stored on the way out.
+    """
     owner, repo = parse_repo_input(repo_input)
+    plan = plan_analysis(fields)
     warnings: list[str] = []
 
     owns_client = client is None
     if owns_client:
         client = GitHubClient(token=token)
+    # A shared client accumulates warnings across analyses; only report ours
+    client_warnings_start = len(client.warnings)
 
+    ANALYSES_IN_FLIGHT.inc()
+    started = time.monotonic()
+    outcome = "error"
     try:
+        head = None
+        if result_cache is not None:
+            head = await client.resolve_head(owner, repo)
+            if head is not None:
+                cached = result_cache.get(owner, repo, head)
+                if cached is not None and WATCHERS_UNKNOWN in cached.warnings:
+                    cached = await _add_watchers(client, owner, repo, head, cached, result_cache)
+                if cached is not None:
+                    outcome = "cached"
+                    return cached
+                # The tree fetch below resolves HEAD too; don't ask twice
+                client.prime(f"/repos/{owner}/{repo}/commits/HEAD", head, accept=SHA_MEDIA_TYPE)
+
         # Phase 1: parallel fetch of repo metadata, languages, and file tree
-        repo_data, languages, tree_data = await asyncio.gather(
-            client.get(f"/repos/{owner}/{repo}"),
-            client.get(f"/repos/{owner}/{repo}/languages"),
-            client.get(f"/repos/{owner}/{repo}/git/trees/HEAD", params={"recursive": "1"}),
+        if graphql and not await prefetch_repo(client, owner, repo):
+            warnings.append("GraphQL unavailable (requires a token); used REST API")
+        fetch_tree = _fetch_tarball_tree if tarball else _fetch_tree
+        repo_data, languages, tree = await asyncio.gather(
+            client.get_repo(owner, repo),
+            client.get_languages(owner, repo) if plan.wants(LANGUAGES) else _skip(),
+            fetch_tree(client, owner, repo, warnings) if plan.wants(TREE) else _skip(),
         )
 
         if repo_data is None:
             raise ValueError(f"Repository not found: {owner}/{repo}")
 
-        tree_data = tree_data or {"tree": []}
-        languages = languages or {}
-        primary_language = repo_data.get("language")
-
-        # Phase 2: parallel extraction (async extractors run concurrently)
-        summary = extract_metadata(repo_data, languages)
-
-        tech_stack, health, security = await asyncio.gather(
-            extract_tech_stack(client, owner, repo, tree_data, primary_language),
-            extract_health(client, owner, repo, repo_data),
-            extract_security(client, owner, repo, tree_data, repo_data, warnings),
+        sections = await _extract(
+            client, owner, repo, repo_data, languages, tree, warnings, plan
         )
 
-        # Architecture is sync — run after tech_stack so we have deps for test detection
-        architecture = extract_architecture(tree_data, tech_stack.key_deps)
-
         # Collect client warnings
-        warnings.extend(client.warnings)
+        for warning in client.warnings[client_warnings_start:]:
+            if warning not in warnings:
+                warnings.append(warning)
 
-        return RepoAnalysis(
+        analysis = RepoAnalysis(
             repo=f"{owner}/{repo}",
             url=f"https://github.com/{owner}/{repo}",
             analyzed_at=datetime.now(timezone.utc),
-            summary=summary,
-            tech_stack=tech_stack,
-            architecture=architecture,
-            health=health,
-            security=security,
             warnings=warnings,
+            **sections,
         )
+        if result_cache is not None and head is not None and plan.fields is None:
+            result_cache.set(owner, repo, head, analysis, repo_data)
+        outcome = "ok"
+        return analysis
+    finally:
+        ANALYSES_IN_FLIGHT.dec()
+        ANALYSIS_LATENCY.observe(time.monotonic() - started, outcome)
+        client.release(owner, repo)
+        if owns_client:
+            await client.close()
+
+
+# Local and bare clones carry no branch protection rules to check
+OFFLINE_PLAN = replace(FULL_PLAN, needs=FULL_PLAN.needs - {BRANCH_PROTECTION})
+
+
+async def analyze_local(
+    path: str | os.PathLike[str],
+    max_workers: int | None = None,
+) -> RepoAnalysis:
+    """Analyze a repo straight from disk, with no network access.
+
+    ``path`` may be a working copy or a bare clone. Working copies are walked
+    with ``os.scandir`` fanned out over ``max_workers`` threads; bare clones
+    (and a checkout's commit history) are read from the git object database.
+    """
+    client: LocalRepoClient | BareRepoClient
+    if GitObjectStore.is_git_dir(path):
+        client = BareRepoClient(path)
+    else:
+        client = LocalRepoClient(path, max_workers=max_workers)
+    try:
+        repo_data, languages, tree = await asyncio.to_thread(client.scan)
+        warnings: list[str] = []
+        sections = await _extract(
+            client, client.owner, client.name, repo_data, languages, tree, warnings,
+            OFFLINE_PLAN,
+        )
+    finally:
+        client.close()
+    return RepoAnalysis(
+        repo=client.name,
+        url=client.root.as_uri(),
+        analyzed_at=datetime.now(timezone.utc),
+        warnings=warnings,
+        **sections,
+    )
+
+
+async def analyze_many(
+    repos: Iterable[str] | AsyncIterable[str],
+    concurrency: int = 8,
+    token: str | None = None,
+    client: GitHubClient | None = None,
+    graphql: bool = False,
+    tarball: bool = False,
+    scheduler: RateLimitScheduler | None = None,
+    fields: Iterable[str] | None = None,
+    result_cache: ResultCache | None = None,
+) -> AsyncIterator[BatchResult]:
+    """Analyze many repos over one shared client, yielding results as they finish.
+
+    At most ``concurrency`` analyses run at once, and repos are pulled from
+    ``repos`` lazily, so arbitrarily long (or async) inputs are fine. A failing
+    repo yields a BatchResult with ``error`` set instead of aborting the batch.
+
+    Pass a RateLimitScheduler to wait out rate limits instead of failing; the
+    batch size is added to its plan when ``repos`` has a length.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    fields = plan_analysis(fields).fields  # fail fast on unknown fields
+
+    owns_client = client is None
+    if owns_client:
+        client = GitHubClient(token=token, scheduler=scheduler)
+    scheduler = client.scheduler
+    if scheduler is not None and isinstance(repos, Sized):
+        scheduler.plan(len(repos), graphql=graphql)
+
+    if isinstance(repos, AsyncIterable):
+        source = aiter(repos)
+    else:
+        async def _iterate() -> AsyncIterator[str]:
+            for item in repos:
+                yield item
+
+        source = _iterate()
+
+    source_lock = asyncio.Lock()
+    source_errors: list[Exception] = []
+    results: asyncio.Queue[BatchResult | None] = asyncio.Queue(maxsize=concurrency)
+
+    async def worker() -> None:
+        while True:
+            async with source_lock:
+                try:
+                    repo_input = await anext(source)
+                except StopAsyncIteration:
+                    break
+                except Exception as e:
+                    # The input itself failed (e.g. a listing page); stop cleanly
+                    source_errors.append(e)
+                    break
+            try:
+                analysis = await analyze_repo(
+                    repo_input, client=client, graphql=graphql, tarball=tarball,
+                    fields=fields, result_cache=result_cache,
+                )
+                await results.put(BatchResult(repo=repo_input, analysis=analysis))
+            except Exception as e:
+                await results.put(BatchResult(repo=repo_input, error=str(e) or type(e).__name__))
+        await results.put(None)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        running = len(workers)
+        while running:
+            item = await results.get()
+            if item is None:
+                running -= 1
+            else:
+                yield item
+        await asyncio.gather(*workers)
+        if source_errors:
+            raise source_errors[0]
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if owns_client:
+            await client.close()
+
+
+async def analyze_owner(
+    owner: str,
+    concurrency: int = 8,
+    token: str | None = None,
+    client: GitHubClient | None = None,
+    graphql: bool = False,
+    tarball: bool = False,
+    scheduler: RateLimitScheduler | None = None,
+    fields: Iterable[str] | None = None,
+    result_cache: ResultCache | None = None,
+    forks: bool = True,
+    archived: bool = True,
+) -> AsyncIterator[BatchResult]:
+    """Analyze every repo of a GitHub org or user, yielding results as they finish.
+
+    The repo listing is paged concurrently and fed into analyze_many over one
+    client. Each listing entry stands in for that repo's metadata call, except
+    that listings carry no watcher count, so ``summary.watchers`` is 0 with a
+    warning saying so. Pass
+    ``forks=False`` or ``archived=False`` to skip those repos. Raises
+    ValueError if there is no such org or user.
+    """
+    fields = plan_analysis(fields).fields  # fail fast on unknown fields
+
+    owns_client = client is None
+    if owns_client:
+        client = GitHubClient(token=token, scheduler=scheduler)
+    listing = client.iter_owner_repos(owner)
+
+    async def repos() -> AsyncIterator[str]:
+        async for data in listing:
+            if (not forks and data.get("fork")) or (not archived and data.get("archived")):
+                continue
+            full_name = data["full_name"]
+            client.prime(f"/repos/{full_name}", data)
+            yield full_name
+
+    source = repos()
+    try:
+        # Fetch the first page up front so an unknown owner raises here
+        first = await anext(source, None)
+        if first is None:
+            return
+
+        async def chained() -> AsyncIterator[str]:
+            yield first
+            async for full_name in source:
+                yield full_name
+
+        async for item in analyze_many(
+            chained(), concurrency=concurrency, client=client, graphql=graphql,
+            tarball=tarball, fields=fields, result_cache=result_cache,
+        ):
+            yield item
     finally:
+        await source.aclose()
+        await listing.aclose()
         if owns_client:
             await client.close()
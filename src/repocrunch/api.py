@@ -2,41 +2,255 @@
 
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException, Query
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
 
 from repocrunch import __version__
-from repocrunch.analyzer import analyze_repo
+from repocrunch.analyzer import analyze_many, analyze_repo, parse_repo_input
 from repocrunch.client import RateLimitError
+from repocrunch.jobs import JobRunner, JobStore, job_store_path
+from repocrunch.metrics import render
+from repocrunch.planner import plan_analysis
+from repocrunch.results import ResultCache
+
+logger = logging.getLogger(__name__)
+
+# Cached analyses confirmed current within this many seconds are served at
+# once and refreshed in the background
+MAX_STALENESS = float(os.environ.get("REPOCRUNCH_MAX_STALENESS", "3600"))
+# Don't re-check HEAD for analyses confirmed more recently than this
+REVALIDATE_AFTER = float(os.environ.get("REPOCRUNCH_REVALIDATE_AFTER", "60"))
+
+# Shared across requests; persistent too when REPOCRUNCH_CACHE is set
+results = ResultCache.from_env()
+_refreshing: dict[str, asyncio.Task[None]] = {}
+
+# Batch jobs run on background workers sharing one client
+JOB_CONCURRENCY = int(os.environ.get("REPOCRUNCH_JOB_CONCURRENCY", "8"))
+_runner: JobRunner | None = None
+_store: JobStore | None = None
+
+
+def _job_store() -> JobStore | None:
+    """The job store, or None if no job was ever submitted. Never starts the runner."""
+    global _store
+    if _runner is not None:
+        return _runner.store
+    if _store is None and job_store_path().exists():
+        _store = JobStore(job_store_path())
+    return _store
+
+
+def _job_runner() -> JobRunner:
+    """The job runner, started on first use."""
+    global _runner, _store
+    if _runner is None:
+        _store = _job_store() or JobStore(job_store_path())
+        _runner = JobRunner(_store, concurrency=JOB_CONCURRENCY, result_cache=results)
+    _runner.start()
+    return _runner
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Resume jobs a previous process left unfinished
+    if job_store_path().exists():
+        _job_runner()
+    yield
+    refreshes = list(_refreshing.values())
+    for task in refreshes:
+        task.cancel()
+    await asyncio.gather(*refreshes, return_exceptions=True)
+    if _runner is not None:
+        await _runner.stop()
+    if _store is not None:
+        _store.close()
+
 
 app = FastAPI(
     title="RepoCrunch",
     version=__version__,
     description="Analyze GitHub repos into structured JSON.",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
-    allow_methods=["GET"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
 )
 
 
+async def _refresh(repo: str, token: str | None) -> None:
+    try:
+        await analyze_repo(repo, token=token, result_cache=results)
+    except Exception:
+        logger.warning("Background refresh of %s failed", repo, exc_info=True)
+
+
+def _revalidate(repo: str, owner: str, name: str, token: str | None) -> None:
+    """Refresh a repo's cached analysis in the background, once at a time."""
+    key = f"{owner}/{name}".lower()
+    if key in _refreshing:
+        return
+    task = asyncio.create_task(_refresh(repo, token))
+    _refreshing[key] = task
+    task.add_done_callback(lambda _: _refreshing.pop(key, None))
+
+
 @app.get("/analyze")
 async def analyze(
     repo: str = Query(description="GitHub repo as 'owner/repo' or URL"),
     github_token: str | None = Query(None, description="GitHub token for higher rate limits"),
+    fields: str | None = Query(
+        None, description="Comma-separated sections or 'section.field' names to compute"
+    ),
 ):
+    """Analyze a repo, serving a recent cached analysis without waiting when
+    there is one. If GitHub's rate limit is exhausted, an older cached
+    analysis is served with a warning instead of a 429."""
+    try:
+        plan = plan_analysis(fields.split(",") if fields else None)
+        owner, name = parse_repo_input(repo)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cached = results.latest(owner, name)
+    if cached is not None and cached[1] <= MAX_STALENESS:
+        analysis, age = cached
+        if age > REVALIDATE_AFTER:
+            _revalidate(repo, owner, name, github_token)
+        return plan.select(analysis.model_dump(mode="json"))
+
     try:
-        result = await analyze_repo(repo, token=github_token)
-        return result.model_dump(mode="json")
+        result = await analyze_repo(
+            repo, token=github_token, fields=plan.fields, result_cache=results
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except RateLimitError:
-        raise HTTPException(status_code=429, detail="GitHub API rate limit exhausted")
+        if cached is None:
+            raise HTTPException(status_code=429, detail="GitHub API rate limit exhausted")
+        result, age = cached
+        result.warnings.append(
+            f"GitHub API rate limit exhausted; serving an analysis last confirmed "
+            f"{int(age)}s ago"
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return plan.select(result.model_dump(mode="json"))
+
+
+# Request bodies past this size are spooled to disk
+SPOOL_BYTES = 1024 * 1024
+
+
+def _repo_lines(body: tempfile.SpooledTemporaryFile[bytes]) -> Iterator[str]:
+    """Non-blank lines of a spooled request body; closes it when done."""
+    try:
+        for line in body:
+            if line.strip():
+                yield line.decode().strip()
+    finally:
+        body.close()
+
+
+@app.post("/analyze/stream")
+async def analyze_stream(
+    request: Request,
+    github_token: str | None = Query(None, description="GitHub token for higher rate limits"),
+    fields: str | None = Query(
+        None, description="Comma-separated sections or 'section.field' names to compute"
+    ),
+    concurrency: int = Query(8, ge=1, le=32, description="Analyses run at once"),
+):
+    """Analyze repos sent one per line in the body, streaming one NDJSON line
+    per repo as each finishes (in completion order).
+
+    The body is spooled to disk and read a line at a time as workers free
+    up. At most ``concurrency`` finished results wait for the client to
+    read them before workers pause, so memory stays flat however long the
+    batch is.
+    """
+    try:
+        plan = plan_analysis(fields.split(",") if fields else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Starlette can't read the body once the response has started
+    body = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    async for chunk in request.stream():
+        body.write(chunk)
+    body.seek(0)
+
+    async def lines() -> AsyncIterator[str]:
+        async for item in analyze_many(
+            _repo_lines(body),
+            concurrency=concurrency,
+            token=github_token,
+            fields=plan.fields,
+            result_cache=results,
+        ):
+            data = item.model_dump(mode="json")
+            if data["analysis"] is not None:
+                data["analysis"] = plan.select(data["analysis"])
+            yield json.dumps(data) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+class JobRequest(BaseModel):
+    repos: list[str]
+    fields: list[str] | None = None
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: JobRequest):
+    """Queue a batch of repos for background analysis. Returns the job and its id."""
+    if not request.repos:
+        raise HTTPException(status_code=400, detail="No repos given")
+    try:
+        plan = plan_analysis(request.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    runner = _job_runner()
+    job_id = await runner.submit(request.repos, plan.fields)
+    return await asyncio.to_thread(runner.store.get, job_id)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Position of the first repo to return"),
+    limit: int = Query(100, ge=1, le=1000, description="Repos per page"),
+):
+    """A job's progress and one page of its repos, in submission order."""
+    store = _job_store()
+    job = await asyncio.to_thread(store.get, job_id) if store is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    job["results"] = await asyncio.to_thread(store.items, job_id, offset, limit)
+    end = offset + len(job["results"])
+    job["next_offset"] = end if end < job["total"] else None
+    return job
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Service metrics in the Prometheus text format: GitHub calls, cache
+    events, rate limit and analysis timings."""
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/health")
@@ -0,0 +1,13 @@
+"""Data sources the extractors can read from besides the GitHub API."""
+
+from repocrunch.backends.bare import BareRepoClient
+from repocrunch.backends.base import RepoBackend
+from repocrunch.backends.git import GitObjectStore
+from repocrunch.backends.local import LocalRepoClient
+
+__all__ = [
+    "BareRepoClient",
+    "GitObjectStore",
+    "LocalRepoClient",
+    "RepoBackend",
+]
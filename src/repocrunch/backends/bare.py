@@ -0,0 +1,87 @@
+"""Bare-repository backend: analyze a mirror straight from its object database."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any
+
+from repocrunch.backends.git import GitObjectStore, commits_payload
+from repocrunch.backends.local import COMMITS_LIMIT, count_languages, primary_language
+from repocrunch.detection import EXTENSION_LANGUAGES
+from repocrunch.pathindex import PathIndex
+
+
+class BareRepoClient:
+    """Serves a bare clone (or any git dir) through the same interface as GitHubClient.
+
+    Reads HEAD's tree, blobs and commit history from loose objects and
+    mmap'd packfiles; there is no checkout and no git subprocess.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]):
+        self.root = Path(path).resolve()
+        if not GitObjectStore.is_git_dir(self.root):
+            raise ValueError(f"Not a git directory: {self.root}")
+        self.owner = "local"
+        self.name = self.root.name.removesuffix(".git")
+        self.store = GitObjectStore(self.root)
+        self.warnings: list[str] = []
+        self._head: str | None = None
+        self._blobs: dict[str, str] = {}
+
+    def _default_branch(self) -> str:
+        ref = self.store.head_ref()
+        return ref.removeprefix("refs/heads/") if ref else "main"
+
+    def scan(self) -> tuple[dict[str, Any], dict[str, int], PathIndex]:
+        """Read HEAD. Returns (repo_data, languages, tree) like the REST path."""
+        repo_data: dict[str, Any] = {
+            "name": self.name,
+            "full_name": self.name,
+            "language": None,
+            "default_branch": self._default_branch(),
+            "archived": False,
+        }
+        self._head = self.store.resolve_head()
+        if self._head is None:  # empty repository
+            return repo_data, {}, PathIndex()
+
+        commit = self.store.read_commit(self._head)
+        entries = self.store.walk_tree(commit.tree)
+        # Only size blobs whose extension counts toward a language
+        sized = [
+            (path, self.store.size(sha))
+            for path, kind, sha in entries
+            if kind == "blob" and os.path.splitext(path)[1].lower() in EXTENSION_LANGUAGES
+        ]
+        languages = count_languages(sized)
+        self._blobs = {path: sha for path, kind, sha in entries if kind == "blob"}
+
+        repo_data["language"] = primary_language(languages)
+        repo_data["pushed_at"] = commit.committed_date
+        return repo_data, languages, PathIndex.from_entries(entries, sha=self._head)
+
+    def close(self) -> None:
+        self.store.close()
+
+    async def get_file_content(self, owner: str, repo: str, path: str) -> str | None:
+        sha = self._blobs.get(path)
+        if sha is None:
+            return None
+        try:
+            _, content = self.store.read(sha)
+        except KeyError:
+            return None
+        return content.decode("utf-8", errors="replace")
+
+    async def get_commits(self, owner: str, repo: str) -> list[dict[str, Any]] | None:
+        if self._head is None:
+            return None
+        return commits_payload(self.store.history(self._head, COMMITS_LIMIT))
+
+    async def get_contributor_count(self, owner: str, repo: str) -> int:
+        return 0
+
+    async def get_branch_protection(self, owner: str, repo: str, branch: str) -> dict | None:
+        return None
@@ -0,0 +1,23 @@
+"""The data-source interface the extractors read through."""
+
+from __future__ import annotations
+
+from typing import Any, Protocol
+
+
+class RepoBackend(Protocol):
+    """What extractors need from a data source.
+
+    GitHubClient implements it over the REST API; the local backends
+    implement it over files and git objects on disk.
+    """
+
+    warnings: list[str]
+
+    async def get_file_content(self, owner: str, repo: str, path: str) -> str | None: ...
+
+    async def get_commits(self, owner: str, repo: str) -> list[dict[str, Any]] | None: ...
+
+    async def get_contributor_count(self, owner: str, repo: str) -> int: ...
+
+    async def get_branch_protection(self, owner: str, repo: str, branch: str) -> dict | None: ...
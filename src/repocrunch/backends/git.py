@@ -0,0 +1,412 @@
+"""Read git objects straight from a repository's object database.
+
+Loose objects are inflated from disk; packfiles and their v2 .idx files are
+memory-mapped, so looking up an object is a binary search over the mapped
+index plus one inflate (and delta application) from the mapped pack. No git
+binary or subprocess is involved.
+"""
+
+from __future__ import annotations
+
+import heapq
+import mmap
+import os
+import struct
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+OBJECT_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+OFS_DELTA = 6
+REF_DELTA = 7
+IDX_MAGIC = b"\377tOc"
+INFLATE_CHUNK = 64 * 1024
+OBJECT_CACHE_MAX = 256
+
+
+@dataclass
+class Commit:
+    tree: str
+    parents: list[str]
+    committed_at: int  # unix timestamp
+
+    @property
+    def committed_date(self) -> str:
+        return datetime.fromtimestamp(self.committed_at, timezone.utc).isoformat()
+
+
+def _inflate(buf: mmap.mmap | bytes, pos: int, max_length: int = 0) -> bytes:
+    """Inflate one zlib stream starting at ``pos``, reading the buffer in chunks."""
+    decompressor = zlib.decompressobj()
+    out: list[bytes] = []
+    produced = 0
+    while not decompressor.eof:
+        chunk = buf[pos : pos + INFLATE_CHUNK]
+        if not chunk:
+            break
+        pos += len(chunk)
+        if max_length:
+            data = decompressor.decompress(chunk, max_length - produced)
+        else:
+            data = decompressor.decompress(chunk)
+        out.append(data)
+        produced += len(data)
+        if max_length and produced >= max_length:
+            break
+    return b"".join(out)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    """Read a little-endian base-128 size as used in delta headers."""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+
+def _apply_delta(base: bytes, delta: bytes) -> bytes:
+    _, pos = _read_varint(delta, 0)  # source size
+    target_size, pos = _read_varint(delta, pos)
+    out = bytearray()
+    while pos < len(delta):
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            offset = size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (1 << (4 + i)):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            out += base[offset : offset + (size or 0x10000)]
+        elif op:
+            out += delta[pos : pos + op]
+            pos += op
+        else:
+            raise ValueError("Invalid delta opcode 0")
+    if len(out) != target_size:
+        raise ValueError("Delta produced an object of the wrong size")
+    return bytes(out)
+
+
+class _Pack:
+    """A memory-mapped packfile plus its v2 index."""
+
+    def __init__(self, idx_path: Path):
+        self._idx_file = open(idx_path, "rb")
+        self._pack_file = open(idx_path.with_suffix(".pack"), "rb")
+        self.idx = mmap.mmap(self._idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = mmap.mmap(self._pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.idx[:4] != IDX_MAGIC or struct.unpack(">I", self.idx[4:8])[0] != 2:
+            self.close()
+            raise ValueError(f"Unsupported pack index: {idx_path}")
+        self.fanout = struct.unpack(">256I", self.idx[8 : 8 + 1024])
+        self.count = self.fanout[255]
+        self._sha_table = 8 + 1024
+        self._offsets = self._sha_table + 24 * self.count  # past shas and crcs
+        self._large_offsets = self._offsets + 4 * self.count
+
+    def find(self, sha: bytes) -> int | None:
+        """Binary-search the index for a 20-byte SHA. Returns its pack offset."""
+        lo = self.fanout[sha[0] - 1] if sha[0] else 0
+        hi = self.fanout[sha[0]]
+        table = self._sha_table
+        while lo < hi:
+            mid = (lo + hi) // 2
+            candidate = self.idx[table + 20 * mid : table + 20 * mid + 20]
+            if candidate < sha:
+                lo = mid + 1
+            elif candidate > sha:
+                hi = mid
+            else:
+                pos = self._offsets + 4 * mid
+                offset = struct.unpack(">I", self.idx[pos : pos + 4])[0]
+                if offset & 0x80000000:
+                    pos = self._large_offsets + 8 * (offset & 0x7FFFFFFF)
+                    offset = struct.unpack(">Q", self.idx[pos : pos + 8])[0]
+                return offset
+        return None
+
+    def header(self, offset: int) -> tuple[int, int, int]:
+        """Parse an entry header. Returns (type number, size, data position)."""
+        byte = self.data[offset]
+        type_num = (byte >> 4) & 7
+        size = byte & 0x0F
+        shift = 4
+        pos = offset + 1
+        while byte & 0x80:
+            byte = self.data[pos]
+            pos += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+        return type_num, size, pos
+
+    def ofs_delta_base(self, pos: int) -> tuple[int, int]:
+        """Decode an OFS_DELTA's negative base offset. Returns (distance, data position)."""
+        byte = self.data[pos]
+        pos += 1
+        distance = byte & 0x7F
+        while byte & 0x80:
+            byte = self.data[pos]
+            pos += 1
+            distance = ((distance + 1) << 7) | (byte & 0x7F)
+        return distance, pos
+
+    def close(self) -> None:
+        self.idx.close()
+        self.data.close()
+        self._idx_file.close()
+        self._pack_file.close()
+
+
+class GitObjectStore:
+    """Object lookup for a git directory (bare repo, a checkout's .git, or a
+    linked worktree's git dir, whose objects and branches live in its
+    ``commondir``)."""
+
+    def __init__(self, git_dir: str | os.PathLike[str]):
+        self.git_dir = Path(git_dir)
+        self.common_dir = self.find_common_dir(self.git_dir)
+        self._objects_dir = self.common_dir / "objects"
+        self._packs: list[_Pack] | None = None
+        self._cache: OrderedDict[tuple[int, int], tuple[str, bytes]] = OrderedDict()
+
+    @staticmethod
+    def find_common_dir(path: str | os.PathLike[str]) -> Path:
+        """The git dir holding objects and shared refs: ``path`` itself, or
+        for a linked worktree the one its ``commondir`` file names."""
+        path = Path(path)
+        try:
+            common = (path / "commondir").read_text().strip()
+        except OSError:
+            return path
+        return (path / common).resolve()
+
+    @staticmethod
+    def is_git_dir(path: str | os.PathLike[str]) -> bool:
+        path = Path(path)
+        return (path / "HEAD").is_file() and (
+            GitObjectStore.find_common_dir(path) / "objects"
+        ).is_dir()
+
+    @property
+    def packs(self) -> list[_Pack]:
+        if self._packs is None:
+            pack_dir = self._objects_dir / "pack"
+            idx_files = sorted(pack_dir.glob("*.idx")) if pack_dir.is_dir() else []
+            self._packs = [_Pack(p) for p in idx_files if p.with_suffix(".pack").is_file()]
+        return self._packs
+
+    def close(self) -> None:
+        for pack in self._packs or []:
+            pack.close()
+        self._packs = None
+        self._cache.clear()
+
+    def __enter__(self) -> GitObjectStore:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    # -- refs ---------------------------------------------------------------
+
+    def head_ref(self) -> str | None:
+        """Branch HEAD points at (e.g. 'refs/heads/main'), or None if detached."""
+        head = (self.git_dir / "HEAD").read_text().strip()
+        return head[5:].strip() if head.startswith("ref:") else None
+
+    def resolve_ref(self, ref: str) -> str | None:
+        # Per-worktree refs first, then the shared ones
+        for git_dir in dict.fromkeys((self.git_dir, self.common_dir)):
+            loose = git_dir / ref
+            if loose.is_file():
+                return loose.read_text().strip()
+        packed = self.common_dir / "packed-refs"
+        if packed.is_file():
+            for line in packed.read_text().splitlines():
+                if line and line[0] not in "#^":
+                    sha, _, name = line.partition(" ")
+                    if name == ref:
+                        return sha
+        return None
+
+    def resolve_head(self) -> str | None:
+        ref = self.head_ref()
+        if ref is None:
+            return (self.git_dir / "HEAD").read_text().strip()
+        return self.resolve_ref(ref)
+
+    # -- objects ------------------------------------------------------------
+
+    def _loose_path(self, sha: str) -> Path:
+        return self._objects_dir / sha[:2] / sha[2:]
+
+    def _locate(self, sha: str) -> tuple[_Pack, int] | None:
+        raw = bytes.fromhex(sha)
+        for pack in self.packs:
+            offset = pack.find(raw)
+            if offset is not None:
+                return pack, offset
+        return None
+
+    def read(self, sha: str) -> tuple[str, bytes]:
+        """Return (type, content) for an object. Raises KeyError if missing."""
+        loose = self._loose_path(sha)
+        if loose.is_file():
+            raw = zlib.decompress(loose.read_bytes())
+            header, _, content = raw.partition(b"\0")
+            return header.split(b" ", 1)[0].decode(), content
+        located = self._locate(sha)
+        if located is None:
+            raise KeyError(sha)
+        return self._read_packed(*located)
+
+    def _read_packed(self, pack: _Pack, offset: int) -> tuple[str, bytes]:
+        # Follow the delta chain down to its base, then apply deltas back up
+        chain: list[tuple[_Pack, int, int]] = []  # (pack, entry offset, delta data position)
+        while True:
+            key = (id(pack), offset)
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                obj_type, content = self._cache[key]
+                break
+            type_num, _, pos = pack.header(offset)
+            if type_num == OFS_DELTA:
+                distance, pos = pack.ofs_delta_base(pos)
+                chain.append((pack, offset, pos))
+                offset -= distance
+            elif type_num == REF_DELTA:
+                base_sha = pack.data[pos : pos + 20]
+                chain.append((pack, offset, pos + 20))
+                located = self._locate(base_sha.hex())
+                if located is None:
+                    obj_type, content = self.read(base_sha.hex())
+                    break
+                pack, offset = located
+            else:
+                obj_type, content = OBJECT_TYPES[type_num], _inflate(pack.data, pos)
+                self._remember(key, obj_type, content)
+                break
+        for delta_pack, delta_offset, pos in reversed(chain):
+            content = _apply_delta(content, _inflate(delta_pack.data, pos))
+            self._remember((id(delta_pack), delta_offset), obj_type, content)
+        return obj_type, content
+
+    def _remember(self, key: tuple[int, int], obj_type: str, content: bytes) -> None:
+        if len(self._cache) >= OBJECT_CACHE_MAX:
+            self._cache.popitem(last=False)
+        self._cache[key] = (obj_type, content)
+
+    def size(self, sha: str) -> int:
+        """Uncompressed object size, without inflating the whole object."""
+        loose = self._loose_path(sha)
+        if loose.is_file():
+            with open(loose, "rb") as f:
+                header = zlib.decompressobj().decompress(f.read(512), 64)
+            return int(header.split(b"\0", 1)[0].split(b" ", 1)[1])
+        located = self._locate(sha)
+        if located is None:
+            raise KeyError(sha)
+        pack, offset = located
+        type_num, size, pos = pack.header(offset)
+        if type_num == OFS_DELTA:
+            _, pos = pack.ofs_delta_base(pos)
+        elif type_num == REF_DELTA:
+            pos += 20
+        else:
+            return size
+        # A delta's header size is the delta's own; the target size leads its data
+        head = _inflate(pack.data, pos, max_length=20)
+        _, varint_pos = _read_varint(head, 0)
+        return _read_varint(head, varint_pos)[0]
+
+    # -- parsed objects -----------------------------------------------------
+
+    def read_commit(self, sha: str) -> Commit:
+        obj_type, content = self.read(sha)
+        while obj_type == "tag":  # peel annotated tags
+            target = content.split(b"\n", 1)[0].split(b" ", 1)[1].decode()
+            obj_type, content = self.read(target)
+        if obj_type != "commit":
+            raise ValueError(f"{sha} is a {obj_type}, not a commit")
+        tree = ""
+        parents: list[str] = []
+        committed_at = 0
+        for line in content.split(b"\n"):
+            if not line:
+                break
+            key, _, value = line.partition(b" ")
+            if key == b"tree":
+                tree = value.decode()
+            elif key == b"parent":
+                parents.append(value.decode())
+            elif key == b"committer":
+                committed_at = int(value.rsplit(b" ", 2)[1])
+        return Commit(tree=tree, parents=parents, committed_at=committed_at)
+
+    def read_tree(self, sha: str) -> list[tuple[str, str, str]]:
+        """Entries of one tree object as (mode, name, sha)."""
+        _, content = self.read(sha)
+        entries: list[tuple[str, str, str]] = []
+        pos = 0
+        while pos < len(content):
+            space = content.index(b" ", pos)
+            nul = content.index(b"\0", space)
+            mode = content[pos:space].decode()
+            name = content[space + 1 : nul].decode("utf-8", "replace")
+            entries.append((mode, name, content[nul + 1 : nul + 21].hex()))
+            pos = nul + 21
+        return entries
+
+    def walk_tree(self, sha: str) -> list[tuple[str, str, str]]:
+        """Recursively list a tree as (path, type, sha), like the recursive tree API."""
+        out: list[tuple[str, str, str]] = []
+        stack = [("", sha)]
+        while stack:
+            prefix, tree_sha = stack.pop()
+            for mode, name, entry_sha in self.read_tree(tree_sha):
+                path = prefix + name
+                if mode == "40000":
+                    out.append((path, "tree", entry_sha))
+                    stack.append((path + "/", entry_sha))
+                elif mode == "160000":
+                    out.append((path, "commit", entry_sha))  # submodule
+                else:
+                    out.append((path, "blob", entry_sha))
+        out.sort()
+        return out
+
+    def history(self, head: str, limit: int = 100) -> list[Commit]:
+        """Newest-first commits reachable from ``head``, like the commits API."""
+        seen = {head}
+        first = self.read_commit(head)
+        heap = [(-first.committed_at, head, first)]
+        commits: list[Commit] = []
+        while heap and len(commits) < limit:
+            _, _, commit = heapq.heappop(heap)
+            commits.append(commit)
+            for parent in commit.parents:
+                if parent in seen:
+                    continue
+                seen.add(parent)
+                try:
+                    parent_commit = self.read_commit(parent)
+                except KeyError:
+                    continue  # shallow clone boundary
+                heapq.heappush(heap, (-parent_commit.committed_at, parent, parent_commit))
+        return commits
+
+
+def commits_payload(commits: list[Commit]) -> list[dict]:
+    """Shape commits like the REST commits endpoint, as the health extractor expects."""
+    return [{"commit": {"committer": {"date": c.committed_date}}} for c in commits]
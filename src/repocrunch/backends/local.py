@@ -0,0 +1,188 @@
+"""Local working-copy backend: analyze a checked-out repo without the network."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Container
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any
+
+from repocrunch.backends.git import GitObjectStore, commits_payload
+from repocrunch.detection import EXTENSION_LANGUAGES, NON_PRIMARY_LANGUAGES
+from repocrunch.pathindex import PathIndex
+
+COMMITS_LIMIT = 100  # matches the page the commits endpoint returns
+
+# Directories that are almost always untracked build/tool output in a checkout.
+# A vendored copy that HEAD tracks is still walked.
+IGNORED_DIRS: frozenset[str] = frozenset({
+    ".git",
+    "node_modules",
+    ".venv",
+    "venv",
+    "__pycache__",
+    ".tox",
+    ".nox",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+})
+
+
+def _scan_dir(
+    root: str, rel: str, tracked_dirs: Container[str] = ()
+) -> tuple[list[tuple[str, int]], list[str]]:
+    """List one directory. Returns ([(file path, size)], [subdir paths]), relative to root."""
+    files: list[tuple[str, int]] = []
+    dirs: list[str] = []
+    prefix = f"{rel}/" if rel else ""
+    try:
+        with os.scandir(os.path.join(root, rel) if rel else root) as it:
+            for entry in it:
+                path = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORED_DIRS or path in tracked_dirs:
+                        dirs.append(path)
+                else:
+                    files.append((path, entry.stat(follow_symlinks=False).st_size))
+    except OSError:
+        pass
+    return files, dirs
+
+
+def walk_tree(
+    root: str | os.PathLike[str],
+    max_workers: int | None = None,
+    tracked_dirs: Container[str] = (),
+) -> tuple[list[tuple[str, int]], list[str]]:
+    """Walk a directory tree with os.scandir fanned out over a thread pool.
+
+    IGNORED_DIRS are skipped unless listed in ``tracked_dirs``. Returns
+    (files with sizes, directories), as sorted '/'-separated paths.
+    """
+    root = os.fspath(root)
+    files: list[tuple[str, int]] = []
+    dirs: list[str] = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending: set[Future] = {pool.submit(_scan_dir, root, "", tracked_dirs)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                found_files, found_dirs = future.result()
+                files.extend(found_files)
+                dirs.extend(found_dirs)
+                pending.update(
+                    pool.submit(_scan_dir, root, d, tracked_dirs) for d in found_dirs
+                )
+    files.sort()
+    dirs.sort()
+    return files, dirs
+
+
+def count_languages(files: list[tuple[str, int]]) -> dict[str, int]:
+    """Bytes per language by file extension, like GitHub's languages endpoint."""
+    languages: dict[str, int] = {}
+    for path, size in files:
+        lang = EXTENSION_LANGUAGES.get(os.path.splitext(path)[1].lower())
+        if lang:
+            languages[lang] = languages.get(lang, 0) + size
+    return languages
+
+
+def primary_language(languages: dict[str, int]) -> str | None:
+    ranked = sorted(
+        (lang for lang in languages if lang not in NON_PRIMARY_LANGUAGES),
+        key=lambda lang: -languages[lang],
+    )
+    return ranked[0] if ranked else None
+
+
+class LocalRepoClient:
+    """Serves a working copy on disk through the same interface as GitHubClient."""
+
+    def __init__(self, path: str | os.PathLike[str], max_workers: int | None = None):
+        self.root = Path(path).resolve()
+        if not self.root.is_dir():
+            raise ValueError(f"Not a directory: {self.root}")
+        self.owner = "local"
+        self.name = self.root.name
+        self.max_workers = max_workers
+        self.warnings: list[str] = []
+        git_dir = self._git_dir()
+        self.store = GitObjectStore(git_dir) if git_dir else None
+
+    def _git_dir(self) -> Path | None:
+        dot_git = self.root / ".git"
+        # Linked worktrees and submodules point elsewhere; GitObjectStore
+        # follows a worktree's commondir to the shared objects
+        if dot_git.is_file():
+            target = dot_git.read_text().strip().removeprefix("gitdir:").strip()
+            dot_git = (self.root / target).resolve()
+        return dot_git if GitObjectStore.is_git_dir(dot_git) else None
+
+    def _default_branch(self) -> str:
+        if self.store:
+            ref = self.store.head_ref()
+            return ref.removeprefix("refs/heads/") if ref else "main"
+        try:
+            head = (self.root / ".git" / "HEAD").read_text().strip()
+        except OSError:
+            return "main"
+        return head.removeprefix("ref: refs/heads/") if head.startswith("ref: ") else "main"
+
+    def scan(self) -> tuple[dict[str, Any], dict[str, int], PathIndex]:
+        """Walk the checkout. Returns (repo_data, languages, tree) like the REST path.
+
+        With a git history, only paths tracked in HEAD's tree count, so
+        untracked and ignored files (a local .env, build output) are left
+        out just as they are on GitHub, while tracked vendored directories
+        are walked.
+        """
+        head = self.store.resolve_head() if self.store else None
+        commit = self.store.read_commit(head) if head else None
+        tracked = self.store.walk_tree(commit.tree) if commit is not None else []
+        kinds = {path: kind for path, kind, _ in tracked}
+        tracked_dirs = {path for path, kind in kinds.items() if kind == "tree"}
+        files, dirs = walk_tree(self.root, self.max_workers, tracked_dirs)
+        if commit is not None:
+            files = [(path, size) for path, size in files if kinds.get(path) == "blob"]
+            on_disk = {path for path, _ in files}.union(dirs)
+            tree = PathIndex.from_entries(
+                (entry for entry in tracked if entry[0] in on_disk), sha=head
+            )
+        else:
+            tree = PathIndex(blobs=(p for p, _ in files), dirs=dirs)
+        languages = count_languages(files)
+        repo_data = {
+            "name": self.name,
+            "full_name": self.name,
+            "language": primary_language(languages),
+            "default_branch": self._default_branch(),
+            "archived": False,
+        }
+        if commit is not None:
+            repo_data["pushed_at"] = commit.committed_date
+        return repo_data, languages, tree
+
+    async def get_file_content(self, owner: str, repo: str, path: str) -> str | None:
+        try:
+            return (self.root / path).read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return None
+
+    def close(self) -> None:
+        if self.store:
+            self.store.close()
+
+    async def get_commits(self, owner: str, repo: str) -> list[dict[str, Any]] | None:
+        head = self.store.resolve_head() if self.store else None
+        if not head:
+            return None
+        return commits_payload(self.store.history(head, COMMITS_LIMIT))
+
+    async def get_contributor_count(self, owner: str, repo: str) -> int:
+        return 0
+
+    async def get_branch_protection(self, owner: str, repo: str, branch: str) -> dict | None:
+        return None
@@ -0,0 +1,228 @@
+"""Persistent HTTP response cache shared across processes."""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+DEFAULT_TTL = 7 * 24 * 3600  # seconds
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+EVICT_EVERY = 32  # writes between size-eviction passes
+# Calls run on the event loop, so never wait long on another process's write
+# lock; a write that can't get it is skipped instead
+BUSY_TIMEOUT = 0.1  # seconds
+
+
+@dataclass
+class CacheEntry:
+    etag: str
+    data: Any
+    headers: dict[str, str] = field(default_factory=dict)
+    stored_at: float = field(default_factory=time.time)
+
+
+class ResponseCache(Protocol):
+    """Storage tier behind GitHubClient's in-memory ETag cache."""
+
+    def get(self, key: str) -> CacheEntry | None: ...
+
+    def set(self, key: str, entry: CacheEntry) -> None: ...
+
+    def touch(self, key: str, headers: dict[str, str]) -> None: ...
+
+    def get_object(self, key: str) -> Any | None: ...
+
+    def set_object(self, key: str, data: Any) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class SQLiteCache:
+    """SQLite-backed response cache with TTL and size-based eviction.
+
+    Uses WAL journaling so several processes (CLI runs, API workers) can read
+    and write the same file concurrently. Content-addressed objects (trees and
+    blobs keyed by SHA) live in a separate table that is never revalidated or
+    expired, only evicted by size.
+
+    WAL readers never wait on writers, and writes wait at most BUSY_TIMEOUT
+    for another process's lock before being dropped, which only costs a
+    refetch later.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS http_cache (
+                key TEXT PRIMARY KEY,
+                etag TEXT NOT NULL,
+                headers TEXT NOT NULL,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS http_cache_accessed ON http_cache (accessed_at)"
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS objects (
+                key TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS objects_accessed ON objects (accessed_at)"
+        )
+
+    def get(self, key: str) -> CacheEntry | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, headers, body, stored_at FROM http_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            etag, headers, body, stored_at = row
+            if now - stored_at > self.ttl:
+                self._try("DELETE FROM http_cache WHERE key = ?", (key,))
+                return None
+            self._try("UPDATE http_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return CacheEntry(
+            etag=etag,
+            data=json.loads(body),
+            headers=json.loads(headers),
+            stored_at=stored_at,
+        )
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        body = json.dumps(entry.data, separators=(",", ":"))
+        now = time.time()
+        self._write(
+            """
+            INSERT INTO http_cache (key, etag, headers, body, size, stored_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                etag = excluded.etag,
+                headers = excluded.headers,
+                body = excluded.body,
+                size = excluded.size,
+                stored_at = excluded.stored_at,
+                accessed_at = excluded.accessed_at
+            """,
+            (key, entry.etag, json.dumps(entry.headers), body, len(body), entry.stored_at, now),
+        )
+
+    def touch(self, key: str, headers: dict[str, str]) -> None:
+        """Restart an entry's TTL after a 304, keeping its body as is."""
+        now = time.time()
+        with self._lock:
+            self._try(
+                "UPDATE http_cache SET headers = ?, stored_at = ?, accessed_at = ? WHERE key = ?",
+                (json.dumps(headers), now, now, key),
+            )
+
+    def get_object(self, key: str) -> Any | None:
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM objects WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._try("UPDATE objects SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def set_object(self, key: str, data: Any) -> None:
+        body = json.dumps(data, separators=(",", ":"))
+        self._write(
+            "INSERT OR REPLACE INTO objects (key, body, size, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, body, len(body), time.time()),
+        )
+
+    def _write(self, sql: str, params: tuple[Any, ...]) -> None:
+        """Run one upsert, and an eviction pass every EVICT_EVERY writes."""
+        with self._lock:
+            if not self._try(sql, params):
+                return
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                try:
+                    self._evict(time.time())
+                except sqlite3.OperationalError:
+                    pass  # the next pass catches up
+
+    def _try(self, sql: str, params: tuple[Any, ...]) -> bool:
+        """Execute a write, giving up if another process holds the lock."""
+        try:
+            self._conn.execute(sql, params)
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def evict(self) -> None:
+        """Drop expired entries, then least-recently-used ones over the size budget."""
+        with self._lock:
+            self._evict(time.time())
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM http_cache WHERE stored_at < ?", (now - self.ttl,))
+        # One LRU order across both tables, so max_bytes bounds the whole file
+        over_budget = self._conn.execute(
+            """
+            SELECT tbl, key FROM (
+                SELECT tbl, key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running
+                FROM (
+                    SELECT 'http_cache' AS tbl, key, size, accessed_at FROM http_cache
+                    UNION ALL
+                    SELECT 'objects' AS tbl, key, size, accessed_at FROM objects
+                )
+            ) WHERE running > ?
+            """,
+            (self.max_bytes,),
+        ).fetchall()
+        for table in ("http_cache", "objects"):
+            keys = [(key,) for tbl, key in over_budget if tbl == table]
+            if keys:
+                self._conn.executemany(f"DELETE FROM {table} WHERE key = ?", keys)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def cache_from_env() -> SQLiteCache | None:
+    """Build the persistent cache named by REPOCRUNCH_CACHE, if set."""
+    path = os.environ.get("REPOCRUNCH_CACHE")
+    if not path:
+        return None
+    return SQLiteCache(path)
@@ -0,0 +1,148 @@
+"""Record and replay GitHub HTTP traffic for offline, deterministic runs.
+
+A cassette is a gzip'd NDJSON file with one request/response interaction per
+line, including status, headers (ETags, rate-limit headers, Link) and body.
+RecordingTransport writes one while passing traffic through to the network;
+ReplayTransport serves it back with no network at all, optionally adding
+latency so profiles resemble real runs.
+
+Request headers are never recorded, so tokens sent in Authorization stay
+out. Signed URLs (tarball redirects carry ``?token=``) are recorded without
+the token, and Set-Cookie is dropped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict, deque
+from typing import Any
+
+import httpx
+
+
+# Query parameters that carry credentials
+SECRET_PARAMS = frozenset({"token"})
+# httpx already decoded the body
+DECODING_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+class CassetteMiss(LookupError):
+    """A replayed request has no recorded interaction."""
+
+
+def _redact_url(url: str) -> str:
+    """``url`` without its SECRET_PARAMS; other URLs come back unchanged."""
+    parsed = httpx.URL(url)
+    if not SECRET_PARAMS.intersection(parsed.params):
+        return url
+    for name in SECRET_PARAMS:
+        parsed = parsed.copy_remove_param(name)
+    return str(parsed)
+
+
+def _match_key(request: httpx.Request) -> str:
+    """Identify a request by method, URL (sorted query, less SECRET_PARAMS),
+    Accept and body. Signed URLs change between runs, so they match without
+    their tokens."""
+    url = request.url.copy_with(query=None)
+    query = sorted(
+        (k, v) for k, v in request.url.params.multi_items() if k not in SECRET_PARAMS
+    )
+    accept = request.headers.get("accept", "")
+    body = hashlib.sha1(request.content).hexdigest() if request.content else ""
+    return f"{request.method} {url}?{query} {accept} {body}"
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Pass requests through to ``transport`` and append each exchange to a cassette."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.path = path
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()  # redirected requests arrive unread
+        start = time.monotonic()
+        response = await self._transport.handle_async_request(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        elapsed = time.monotonic() - start
+        # The caller still gets the real Location and cookies; the cassette doesn't
+        headers = [
+            (k, v) for k, v in response.headers.multi_items() if k.lower() not in DECODING_HEADERS
+        ]
+
+        record = {
+            "key": _match_key(request),
+            "method": request.method,
+            "url": _redact_url(str(request.url)),
+            "status": response.status_code,
+            "headers": [
+                [k, _redact_url(v) if k.lower() == "location" else v]
+                for k, v in headers
+                if k.lower() != "set-cookie"
+            ],
+            "body": base64.b64encode(content).decode("ascii"),
+            "elapsed": round(elapsed, 4),
+        }
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            content=content,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        self._file.close()
+        await self._transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serve responses from a cassette, in recorded order per request.
+
+    ``latency`` seconds are added to every response. Once a request's
+    recordings are used up, the last one is served again. Unrecorded
+    requests raise CassetteMiss.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], latency: float = 0.0):
+        self.latency = latency
+        self._recorded: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._recorded[record["key"]].append(record)
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._recorded.values())
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        queue = self._recorded.get(_match_key(request))
+        if not queue:
+            raise CassetteMiss(f"No recorded response for {request.method} {request.url}")
+        record = queue.popleft() if len(queue) > 1 else queue[0]
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return httpx.Response(
+            record["status"],
+            headers=record["headers"],
+            content=base64.b64decode(record["body"]),
+            request=request,
+        )
@@ -2,11 +2,26 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import os
+import sys
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from functools import partial
+from pathlib import Path
+from typing import TextIO
 
 import typer
 
-from repocrunch import __version__, analyze_sync
+from repocrunch import __version__, analyze_local, analyze_sync
+from repocrunch.analyzer import analyze_many, analyze_owner, analyze_repo
+from repocrunch.client import GitHubClient
+from repocrunch.fleet import DEFAULT_CHUNK_SIZE, scan_dir
+from repocrunch.models import BatchResult
+from repocrunch.planner import plan_analysis
+from repocrunch.results import ResultCache
+from repocrunch.scheduler import RateLimitScheduler
 
 app = typer.Typer(
     name="repocrunch",
@@ -14,17 +29,45 @@ app = typer.Typer(
     no_args_is_help=True,
 )
 
+PROGRESS_EVERY = 1000  # scan-dir reports throughput every this many repos
+
 
 @app.command()
 def analyze(
-    repo: str = typer.Argument(help="GitHub repo as 'owner/repo' or URL"),
+    repo: str = typer.Argument(help="GitHub repo as 'owner/repo' or URL (a directory with --local)"),
     pretty: bool = typer.Option(False, "--pretty", "-p", help="Pretty-print JSON output"),
-    field: str | None = typer.Option(None, "--field", "-f", help="Extract a single top-level field"),
+    field: list[str] | None = typer.Option(
+        None, "--field", "-f",
+        help="Only compute this section or 'section.field' (repeatable); skips unneeded API calls",
+    ),
     token: str | None = typer.Option(None, "--token", "-t", help="GitHub token (or set GITHUB_TOKEN)"),
+    graphql: bool = typer.Option(False, "--graphql", help="Fetch metadata in one GraphQL query (needs a token)"),
+    tarball: bool = typer.Option(False, "--tarball", help="Read the tree and manifests from one tarball download"),
+    local: bool = typer.Option(False, "--local", help="Analyze a checked-out repo on disk, offline"),
+    record: Path | None = typer.Option(None, "--record", help="Save all HTTP traffic to this cassette"),
+    replay: Path | None = typer.Option(None, "--replay", help="Serve HTTP traffic from this cassette, offline"),
+    latency: float = typer.Option(0.0, "--latency", help="Seconds of delay per replayed response"),
 ) -> None:
     """Analyze a GitHub repository."""
     try:
-        result = analyze_sync(repo, token=token)
+        plan = plan_analysis(field)
+        if local:
+            result = asyncio.run(analyze_local(repo))
+        elif record or replay:
+            result = asyncio.run(
+                _analyze_cassette(repo, token, graphql, tarball, record, replay, latency, field)
+            )
+        else:
+            # Finished analyses are only worth keeping in a persistent cache
+            result_cache = ResultCache.from_env() if os.environ.get("REPOCRUNCH_CACHE") else None
+            try:
+                result = analyze_sync(
+                    repo, token=token, graphql=graphql, tarball=tarball, fields=field,
+                    result_cache=result_cache,
+                )
+            finally:
+                if result_cache is not None:
+                    result_cache.close()
     except ValueError as e:
         typer.echo(f"Error: {e}", err=True)
         raise typer.Exit(1)
@@ -32,18 +75,265 @@ def analyze(
         typer.echo(f"Error: {e}", err=True)
         raise typer.Exit(1)
 
-    data = result.model_dump(mode="json")
-
-    if field:
-        if field not in data:
-            typer.echo(f"Unknown field: {field}. Available: {', '.join(data.keys())}", err=True)
-            raise typer.Exit(1)
-        data = data[field]
+    data = plan.select(result.model_dump(mode="json"))
+    if field and len(field) == 1:
+        # A single field prints just its value
+        section, _, name = field[0].partition(".")
+        data = data[section][name] if name else data[section]
 
     indent = 2 if pretty else None
     typer.echo(json.dumps(data, indent=indent, default=str))
 
 
+async def _analyze_cassette(
+    repo: str,
+    token: str | None,
+    graphql: bool,
+    tarball: bool,
+    record: Path | None,
+    replay: Path | None,
+    latency: float,
+    fields: list[str] | None = None,
+):
+    async with GitHubClient(
+        token=token, record=record, replay=replay, replay_latency=latency
+    ) as client:
+        return await analyze_repo(
+            repo, client=client, graphql=graphql, tarball=tarball, fields=fields
+        )
+
+
+@app.command("scan-dir")
+def scan_dir_command(
+    directory: Path = typer.Argument(help="Directory of local repos (bare clones or checkouts)"),
+    workers: int | None = typer.Option(None, "--workers", "-w", help="Worker processes (default: CPU count)"),
+    chunk_size: int = typer.Option(DEFAULT_CHUNK_SIZE, "--chunk-size", help="Repos sent to a worker at a time"),
+    output: Path | None = typer.Option(None, "--output", "-o", help="Write NDJSON here instead of stdout"),
+) -> None:
+    """Analyze every repo under a directory in parallel, streaming NDJSON."""
+    out = open(output, "w") if output else sys.stdout
+    count = failed = 0
+    start = time.monotonic()
+    try:
+        for item in scan_dir(directory, workers=workers, chunk_size=chunk_size):
+            out.write(item.model_dump_json() + "\n")
+            out.flush()
+            count += 1
+            failed += item.error is not None
+            if count % PROGRESS_EVERY == 0:
+                rate = count / (time.monotonic() - start)
+                typer.echo(f"{count} repos, {rate:.1f} repos/sec", err=True)
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+    finally:
+        if output:
+            out.close()
+
+    elapsed = time.monotonic() - start
+    rate = count / elapsed if elapsed else 0.0
+    typer.echo(
+        f"Scanned {count} repos ({failed} failed) in {elapsed:.1f}s: {rate:.1f} repos/sec",
+        err=True,
+    )
+
+
+def _pending_repos(lines: Iterable[str], finished: set[str]) -> Iterator[str]:
+    for line in lines:
+        repo = line.strip()
+        if repo and repo not in finished:
+            finished.add(repo)  # a repo listed twice runs once
+            yield repo
+
+
+def _drop_superseded(output: Path, finished: set[str]) -> int:
+    """Rewrite a resumed run's output, keeping only checkpointed results.
+
+    Failed repos, and any written after the last checkpoint, run again on
+    resume; their old lines would otherwise be duplicated. So would a line
+    cut off by the interruption. Returns the number of lines dropped.
+    """
+    kept = output.with_name(output.name + ".tmp")
+    dropped = 0
+    with open(output) as src, open(kept, "w") as dst:
+        for line in src:
+            try:
+                data = json.loads(line)
+            except ValueError:
+                data = {}
+            if data.get("error") is None and data.get("repo") in finished:
+                dst.write(line)
+            else:
+                dropped += 1
+    os.replace(kept, output)
+    return dropped
+
+
+async def _run_batch(
+    analyze: Callable[..., AsyncIterator[BatchResult]],
+    out: TextIO,
+    checkpoint: TextIO | None,
+    concurrency: int,
+    token: str | None,
+    graphql: bool,
+    tarball: bool,
+    fields: list[str] | None,
+    total: int | None = None,
+) -> tuple[int, int]:
+    """Stream the results of ``analyze`` (analyze_many or analyze_owner with
+    their repos bound) to ``out``. Returns (count, failed).
+
+    ``total``, when known up front, lets the scheduler skip pacing whenever
+    the whole batch fits in the remaining rate limit.
+    """
+    plan = plan_analysis(fields)
+    result_cache = ResultCache.from_env() if os.environ.get("REPOCRUNCH_CACHE") else None
+    scheduler = RateLimitScheduler()
+    if total:
+        scheduler.plan(total, graphql=graphql)
+    count = failed = 0
+    start = time.monotonic()
+    try:
+        async with GitHubClient(token=token, scheduler=scheduler) as client:
+            async for item in analyze(
+                concurrency=concurrency, client=client, graphql=graphql,
+                tarball=tarball, fields=plan.fields, result_cache=result_cache,
+            ):
+                data = item.model_dump(mode="json")
+                if data["analysis"] is not None:
+                    data["analysis"] = plan.select(data["analysis"])
+                out.write(json.dumps(data, default=str) + "\n")
+                out.flush()
+                # Checkpoint successes once safely written; failures retry on resume
+                if checkpoint is not None and item.error is None:
+                    checkpoint.write(item.repo + "\n")
+                    checkpoint.flush()
+                count += 1
+                failed += item.error is not None
+                if count % PROGRESS_EVERY == 0:
+                    rate = count / (time.monotonic() - start)
+                    typer.echo(f"{count} repos, {rate:.1f} repos/sec", err=True)
+    finally:
+        if result_cache is not None:
+            result_cache.close()
+    return count, failed
+
+
+@app.command()
+def batch(
+    input_file: Path | None = typer.Argument(
+        None, metavar="FILE", help="File with one repo per line (default: stdin)"
+    ),
+    output: Path | None = typer.Option(None, "--output", "-o", help="Write NDJSON here instead of stdout"),
+    checkpoint: Path | None = typer.Option(
+        None, "--checkpoint",
+        help="Record analyzed repos here and skip them on the next run (default: OUTPUT.checkpoint)",
+    ),
+    concurrency: int = typer.Option(8, "--concurrency", "-c", help="Analyses run at once"),
+    field: list[str] | None = typer.Option(
+        None, "--field", "-f", help="Only compute this section or 'section.field' (repeatable)",
+    ),
+    token: str | None = typer.Option(None, "--token", "-t", help="GitHub token (or set GITHUB_TOKEN)"),
+    graphql: bool = typer.Option(False, "--graphql", help="Fetch metadata in one GraphQL query (needs a token)"),
+    tarball: bool = typer.Option(False, "--tarball", help="Read the tree and manifests from one tarball download"),
+) -> None:
+    """Analyze many GitHub repos over one client, streaming NDJSON.
+
+    Rerunning with the same checkpoint resumes an interrupted run: repos
+    analyzed successfully are skipped, failed ones are tried again, and new
+    results are appended to the output in place of the old error lines.
+    """
+    try:
+        plan_analysis(field)
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+    if checkpoint is None and output is not None:
+        checkpoint = output.with_name(output.name + ".checkpoint")
+
+    finished: set[str] = set()
+    if checkpoint is not None and checkpoint.exists():
+        finished = {line.strip() for line in checkpoint.read_text().splitlines() if line.strip()}
+        typer.echo(f"Resuming: skipping {len(finished)} analyzed repos", err=True)
+        if output is not None and output.exists():
+            dropped = _drop_superseded(output, finished)
+            if dropped:
+                typer.echo(f"Dropped {dropped} superseded lines from {output}", err=True)
+    total = None
+    if input_file:
+        with open(input_file) as lines:
+            total = sum(1 for _ in _pending_repos(lines, set(finished)))
+    source = open(input_file) if input_file else sys.stdin
+    out = open(output, "a") if output else sys.stdout
+    checkpoint_file = open(checkpoint, "a") if checkpoint else None
+    start = time.monotonic()
+    try:
+        count, failed = asyncio.run(
+            _run_batch(
+                partial(analyze_many, _pending_repos(source, finished)), out, checkpoint_file,
+                concurrency, token, graphql, tarball, field, total,
+            )
+        )
+    finally:
+        if input_file:
+            source.close()
+        if output:
+            out.close()
+        if checkpoint_file is not None:
+            checkpoint_file.close()
+
+    elapsed = time.monotonic() - start
+    rate = count / elapsed if elapsed else 0.0
+    typer.echo(
+        f"Analyzed {count} repos ({failed} failed) in {elapsed:.1f}s: {rate:.1f} repos/sec",
+        err=True,
+    )
+
+
+@app.command()
+def org(
+    name: str = typer.Argument(help="GitHub organization or user"),
+    output: Path | None = typer.Option(None, "--output", "-o", help="Write NDJSON here instead of stdout"),
+    concurrency: int = typer.Option(8, "--concurrency", "-c", help="Analyses run at once"),
+    field: list[str] | None = typer.Option(
+        None, "--field", "-f", help="Only compute this section or 'section.field' (repeatable)",
+    ),
+    forks: bool = typer.Option(True, "--forks/--no-forks", help="Include forked repos"),
+    archived: bool = typer.Option(True, "--archived/--no-archived", help="Include archived repos"),
+    token: str | None = typer.Option(None, "--token", "-t", help="GitHub token (or set GITHUB_TOKEN)"),
+    graphql: bool = typer.Option(False, "--graphql", help="Fetch metadata in one GraphQL query (needs a token)"),
+    tarball: bool = typer.Option(False, "--tarball", help="Read the tree and manifests from one tarball download"),
+) -> None:
+    """Analyze every repo of a GitHub organization or user, streaming NDJSON."""
+    out = open(output, "w") if output else sys.stdout
+    start = time.monotonic()
+    try:
+        plan_analysis(field)
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        count, failed = asyncio.run(
+            _run_batch(
+                partial(analyze_owner, name, forks=forks, archived=archived), out, None,
+                concurrency, token, graphql, tarball, field,
+            )
+        )
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1)
+    finally:
+        if output:
+            out.close()
+
+    elapsed = time.monotonic() - start
+    rate = count / elapsed if elapsed else 0.0
+    typer.echo(
+        f"Analyzed {count} repos ({failed} failed) in {elapsed:.1f}s: {rate:.1f} repos/sec",
+        err=True,
+    )
+
+
 @app.command()
 def serve(
     host: str = typer.Option("0.0.0.0", help="Host to bind to"),
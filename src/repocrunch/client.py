@@ -2,24 +2,47 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import hashlib
 import logging
 import os
+import time
 from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
 from typing import Any
+from urllib.parse import parse_qs, urlsplit
 
 import httpx
 
+from repocrunch.cache import CacheEntry, ResponseCache, cache_from_env
+from repocrunch.cassette import RecordingTransport, ReplayTransport
+from repocrunch.metrics import (
+    CACHE_EVENTS,
+    GITHUB_LATENCY,
+    GITHUB_REQUESTS,
+    RATE_REMAINING,
+    endpoint_template,
+)
+from repocrunch.pathindex import PathIndex, TreeStreamParser
+from repocrunch.scheduler import DEFAULT_BACKOFF, RateLimitScheduler
+from repocrunch.tokens import RateLimitError, TokenBudget, TokenPool
+
 logger = logging.getLogger(__name__)
 
 GITHUB_API = "https://api.github.com"
 CACHE_MAX = 200
+SHA_MEDIA_TYPE = "application/vnd.github.sha"
+COMPARE_MAX_FILES = 300  # GitHub's cap on files listed by the compare API
+LISTING_PAGE_SIZE = 100  # the most GitHub returns per page
+
+# GET fetches in flight across every client in the process, keyed by
+# (credentials, cache key). The API server builds a client per request, so
+# concurrent requests for the same repo still share each upstream call.
+_INFLIGHT: dict[tuple[str, str], asyncio.Task[Any]] = {}
 
 
-class RateLimitError(Exception):
-    def __init__(self, reset_at: int | None = None):
-        self.reset_at = reset_at
-        super().__init__("GitHub API rate limit exhausted")
+__all__ = ["GitHubClient", "RateLimitError"]
 
 
 class GitHubClient:
@@ -27,128 +50,589 @@ class GitHubClient:
         self,
         token: str | None = None,
         client: httpx.AsyncClient | None = None,
+        cache: ResponseCache | None = None,
+        tokens: Sequence[str] | TokenPool | None = None,
+        scheduler: RateLimitScheduler | None = None,
+        record: str | os.PathLike[str] | None = None,
+        replay: str | os.PathLike[str] | None = None,
+        replay_latency: float = 0.0,
     ):
-        self.token = token or os.environ.get("GITHUB_TOKEN")
+        if record and replay:
+            raise ValueError("Pass either record or replay, not both")
+        transport: httpx.AsyncBaseTransport | None = None
+        if record:
+            transport = RecordingTransport(record)
+        elif replay:
+            transport = ReplayTransport(replay, latency=replay_latency)
+
+        if isinstance(tokens, TokenPool):
+            self.pool = tokens
+        elif tokens:
+            self.pool = TokenPool(tokens)
+        else:
+            self.pool = TokenPool.from_env(token)
+        self.token = next((t for t in self.pool.tokens if t), None)
+        self.scheduler = scheduler
         self._external_client = client is not None
-        self._client = client or self._make_client()
+        self._client = client or self._make_client(transport)
         self._etag_cache: OrderedDict[str, tuple[str, Any]] = OrderedDict()
-        self.rate_remaining: int | None = None
-        self.rate_limit: int | None = None
+        self._external_cache = cache is not None
+        if cache is None and transport is None:
+            cache = cache_from_env()
+        # A persistent cache would make recorded runs depend on earlier runs
+        self.cache = cache
+        self._prefetched: dict[str, Any] = {}
+        self._inflight = _INFLIGHT
+        # Clients with their own transport (cassettes, custom clients) never share
+        if client is not None or transport is not None:
+            self._identity = f"client:{id(self)}"
+        else:
+            tokens = "\n".join(t or "" for t in self.pool.tokens)
+            self._identity = hashlib.sha256(tokens.encode()).hexdigest()
+        self._owned: set[asyncio.Task[Any]] = set()
+        # Immutable, content-addressed objects (trees and blobs keyed by SHA)
+        self._objects: OrderedDict[str, Any] = OrderedDict()
+        self._blob_shas: dict[tuple[str, str], dict[str, str]] = {}
         self.warnings: list[str] = []
 
-    def _make_client(self) -> httpx.AsyncClient:
+    def _make_client(self, transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
         headers = {
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28",
         }
-        if self.token:
-            headers["Authorization"] = f"Bearer {self.token}"
         return httpx.AsyncClient(
             base_url=GITHUB_API,
             headers=headers,
             timeout=30.0,
+            transport=transport,
         )
 
-    def _update_rate_info(self, response: httpx.Response) -> None:
-        remaining = response.headers.get("X-RateLimit-Remaining")
-        if remaining is not None:
-            self.rate_remaining = int(remaining)
-        limit = response.headers.get("X-RateLimit-Limit")
-        if limit is not None:
-            self.rate_limit = int(limit)
+    @property
+    def rate_remaining(self) -> int | None:
+        """Core REST calls left across all pooled tokens."""
+        return self.pool.remaining
+
+    @property
+    def rate_limit(self) -> int | None:
+        return self.pool.limit
+
+    def _update_rate_info(self, budget: TokenBudget, response: httpx.Response) -> None:
+        self.pool.update(budget, response.headers)
+        if self.rate_remaining is not None:
+            RATE_REMAINING.set(self.rate_remaining)
         if self.rate_remaining is not None and self.rate_remaining < 5:
             self.warnings.append(
                 f"GitHub API rate limit low: {self.rate_remaining}/{self.rate_limit} remaining"
             )
 
     def _cache_set(self, url: str, etag: str, data: Any) -> None:
-        if len(self._etag_cache) >= CACHE_MAX:
+        if url in self._etag_cache:
+            self._etag_cache.move_to_end(url)
+        elif len(self._etag_cache) >= CACHE_MAX:
             self._etag_cache.popitem(last=False)
+            CACHE_EVENTS.inc("etag", "eviction")
         self._etag_cache[url] = (etag, data)
 
-    async def get(self, path: str, params: dict | None = None) -> Any:
-        """GET a GitHub API endpoint. Returns parsed JSON or None on 404."""
-        if self.rate_remaining is not None and self.rate_remaining <= 0:
-            raise RateLimitError()
+    def _cache_lookup(self, key: str) -> tuple[str, Any] | None:
+        """Find a cached (etag, data) pair in memory, then in the persistent tier."""
+        if key in self._etag_cache:
+            return self._etag_cache[key]
+        if self.cache is None:
+            return None
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        self._cache_set(key, entry.etag, entry.data)
+        return entry.etag, entry.data
+
+    def _object_lookup(
+        self, key: str, decode: Callable[[Any], Any] | None = None
+    ) -> Any | None:
+        if key in self._objects:
+            self._objects.move_to_end(key)
+            CACHE_EVENTS.inc("objects", "hit")
+            return self._objects[key]
+        data = self.cache.get_object(key) if self.cache is not None else None
+        if data is None:
+            CACHE_EVENTS.inc("objects", "miss")
+            return None
+        CACHE_EVENTS.inc("objects", "hit")
+        if decode is not None:
+            data = decode(data)
+        self._object_set(key, data, persist=False)
+        return data
 
-        url = path
-        headers: dict[str, str] = {}
+    def _object_set(
+        self,
+        key: str,
+        data: Any,
+        persist: bool = True,
+        encode: Callable[[Any], Any] | None = None,
+    ) -> None:
+        if key not in self._objects and len(self._objects) >= CACHE_MAX:
+            self._objects.popitem(last=False)
+            CACHE_EVENTS.inc("objects", "eviction")
+        self._objects[key] = data
+        if persist and self.cache is not None:
+            self.cache.set_object(key, encode(data) if encode is not None else data)
+
+    @staticmethod
+    def _cache_key(path: str, params: dict | None = None, accept: str | None = None) -> str:
+        key = f"{path}?{params}" if params else path
+        return f"{key}#{accept}" if accept else key
+
+    def prime(
+        self, path: str, data: Any, params: dict | None = None, accept: str | None = None
+    ) -> None:
+        """Pre-seed the response for a GET so callers skip the HTTP round trip."""
+        self._prefetched[self._cache_key(path, params, accept)] = data
+
+    def prime_file(self, owner: str, repo: str, path: str, text: str | None) -> None:
+        """Pre-seed get_file_content for a path (None marks it as missing)."""
+        data = None
+        if text is not None:
+            data = {"content": base64.b64encode(text.encode()).decode(), "encoding": "base64"}
+        self.prime(f"/repos/{owner}/{repo}/contents/{path}", data)
+
+    def prime_blob(self, sha: str, text: str) -> None:
+        """Store blob content fetched elsewhere (e.g. GraphQL) in the object cache."""
+        self._object_set(f"blob:{sha}", text)
+
+    def release(self, owner: str, repo: str) -> None:
+        """Drop primed responses and blob SHAs for a repo once its analysis is done."""
+        prefix = f"/repos/{owner}/{repo}"
+        for key in [k for k in self._prefetched if k == prefix or k.startswith(prefix + "/")]:
+            del self._prefetched[key]
+        self._blob_shas.pop((owner, repo), None)
 
-        cache_key = f"{path}?{params}" if params else path
-        if cache_key in self._etag_cache:
-            etag, cached_data = self._etag_cache[cache_key]
-            headers["If-None-Match"] = etag
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        headers: dict[str, str] | None = None,
+        json: Any = None,
+        stream: bool = False,
+        follow_redirects: bool = False,
+    ) -> httpx.Response:
+        """Send a request on the pooled token with the most budget left.
+
+        Retries transport errors, and moves on to the next token when one hits
+        its rate limit. Raises RateLimitError once every token is exhausted or
+        on a secondary rate limit, unless a scheduler is set, in which case it
+        waits for the reset (or Retry-After) and carries on.
 
-        retries = 2
-        for attempt in range(retries + 1):
+        With ``stream=True`` a successful response is returned unread; the
+        caller must consume and close it. With ``follow_redirects=True``
+        rate-limit headers are read from the API's redirect response, not
+        from where it points.
+        """
+        limited: list[TokenBudget] = []
+        while True:
             try:
-                response = await self._client.get(url, params=params, headers=headers)
-                break
-            except httpx.TransportError:
-                if attempt == retries:
+                budget = self.pool.acquire(exclude=limited)
+            except RateLimitError as e:
+                if self.scheduler is None:
                     raise
+                await self.scheduler.wait_for_reset(e.reset_at)
+                limited.clear()
                 continue
+            if self.scheduler is not None:
+                await self.scheduler.before_request(self.pool)
 
-        self._update_rate_info(response)
+            request_headers = dict(headers or {})
+            if budget.token:
+                request_headers["Authorization"] = f"Bearer {budget.token}"
 
-        if response.status_code == 304:
-            self._etag_cache.move_to_end(cache_key)
-            return self._etag_cache[cache_key][1]
+            endpoint = endpoint_template(path)
+            retries = 2
+            for attempt in range(retries + 1):
+                started = time.monotonic()
+                try:
+                    request = self._client.build_request(
+                        method, path, params=params, headers=request_headers, json=json
+                    )
+                    response = await self._client.send(
+                        request, stream=stream, follow_redirects=follow_redirects
+                    )
+                    api_response = response.history[0] if response.history else response
+                    _record_call(method, endpoint, api_response.status_code, started)
+                    break
+                except httpx.TransportError:
+                    _record_call(method, endpoint, "error", started)
+                    if attempt == retries:
+                        raise
+                    continue
+
+            self._update_rate_info(budget, api_response)
+            if self.scheduler is not None:
+                self.scheduler.record()
+            if stream and response.status_code >= 400:
+                await response.aread()  # error bodies are small; the checks below read them
+
+            if _is_rate_limited(response):
+                budget.remaining = 0
+                limited.append(budget)
+                continue
 
-        if response.status_code in (401, 404):
+            delay = _secondary_limit_delay(response)
+            if delay is None:
+                return response
+            if self.scheduler is None:
+                raise RateLimitError(int(time.time() + delay))
+            await self.scheduler.backoff(delay)
+
+    async def get(self, path: str, params: dict | None = None, accept: str | None = None) -> Any:
+        """GET a GitHub API endpoint. Returns parsed JSON or None on 404.
+
+        With a custom ``accept`` media type the body is returned as text.
+        """
+        cache_key = self._cache_key(path, params, accept)
+        if cache_key in self._prefetched:
+            return self._prefetched[cache_key]
+        return await self._coalesce(cache_key, lambda: self._fetch(path, params, cache_key, accept))
+
+    async def _coalesce(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fetch`` once for concurrent callers sharing ``key`` and credentials,
+        whichever client they call through."""
+        inflight_key = (self._identity, key)
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[inflight_key] = task
+            self._owned.add(task)
+            task.add_done_callback(lambda t: self._inflight_done(inflight_key, t))
+        return await asyncio.shield(task)
+
+    def _inflight_done(self, inflight_key: tuple[str, str], task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(inflight_key) is task:
+            del self._inflight[inflight_key]
+        self._owned.discard(task)
+        if not task.cancelled():
+            task.exception()  # mark retrieved if every waiter was cancelled
+
+    async def _fetch(
+        self, path: str, params: dict | None, cache_key: str, accept: str | None = None
+    ) -> Any:
+        headers: dict[str, str] = {}
+        if accept:
+            headers["Accept"] = accept
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+
+        response = await self._request("GET", path, params=params, headers=headers)
+
+        if response.status_code == 304 and cached is not None:
+            CACHE_EVENTS.inc("etag", "hit")
+            etag, cached_data = cached
+            self._cache_set(cache_key, etag, cached_data)
+            if self.cache is not None:
+                self.cache.touch(cache_key, dict(response.headers))
+            return cached_data
+
+        CACHE_EVENTS.inc("etag", "miss")
+
+        # 409: the repository is empty
+        if response.status_code in (401, 404, 409):
             return None
 
         if response.status_code == 403:
-            if self.rate_remaining is not None and self.rate_remaining <= 0:
-                reset = response.headers.get("X-RateLimit-Reset")
-                raise RateLimitError(int(reset) if reset else None)
             # Permission denied (e.g. branch protection without admin access)
             return None
 
         response.raise_for_status()
 
-        data = response.json()
+        data = response.text.strip() if accept else response.json()
         etag = response.headers.get("ETag")
         if etag:
             self._cache_set(cache_key, etag, data)
+            if self.cache is not None:
+                self.cache.set(cache_key, CacheEntry(etag, data, dict(response.headers)))
 
         return data
 
+    async def graphql(self, query: str, variables: dict[str, Any] | None = None) -> dict | None:
+        """POST a GraphQL query. Returns the response payload or None if unavailable."""
+        if not self.token:
+            return None  # GraphQL requires authentication
+        response = await self._request(
+            "POST", "/graphql", json={"query": query, "variables": variables or {}}
+        )
+        if response.status_code != 200:
+            return None
+        return response.json()
+
+    async def get_repo(self, owner: str, repo: str) -> dict | None:
+        return await self.get(f"/repos/{owner}/{repo}")
+
+    async def get_languages(self, owner: str, repo: str) -> dict | None:
+        return await self.get(f"/repos/{owner}/{repo}/languages")
+
+    async def get_commits(self, owner: str, repo: str) -> list | None:
+        """Get the latest 100 commits on the default branch."""
+        return await self.get(f"/repos/{owner}/{repo}/commits", params={"per_page": 100})
+
+    async def get_branch_protection(self, owner: str, repo: str, branch: str) -> dict | None:
+        """Get protection for a branch. None if unprotected or not visible to this token."""
+        return await self.get(f"/repos/{owner}/{repo}/branches/{branch}/protection")
+
+    async def resolve_head(self, owner: str, repo: str) -> str | None:
+        """Resolve the default branch HEAD to a commit SHA. None for empty or missing repos.
+
+        Conditional on the cached ETag, so an unchanged HEAD costs no rate limit.
+        """
+        return await self.get(f"/repos/{owner}/{repo}/commits/HEAD", accept=SHA_MEDIA_TYPE)
+
+    async def _get_object(
+        self,
+        key: str,
+        path: str,
+        params: dict | None = None,
+        transform: Callable[[Any], Any] | None = None,
+    ) -> Any:
+        """Fetch an immutable object once; later lookups never hit the network."""
+        data = self._object_lookup(key)
+        if data is not None:
+            return data
+        return await self._coalesce(key, lambda: self._fetch_object(key, path, params, transform))
+
+    async def _fetch_object(
+        self,
+        key: str,
+        path: str,
+        params: dict | None,
+        transform: Callable[[Any], Any] | None,
+    ) -> Any:
+        response = await self._request("GET", path, params=params)
+        if response.status_code in (401, 403, 404, 409, 422):
+            return None
+        response.raise_for_status()
+        data = response.json()
+        if transform is not None:
+            data = transform(data)
+        if data is not None:
+            self._object_set(key, data)
+        return data
+
+    async def get_tree(
+        self,
+        owner: str,
+        repo: str,
+        sha: str,
+        recursive: bool = True,
+        subtree: bool = False,
+    ) -> PathIndex | None:
+        """Get a git tree by commit or tree SHA from the content-addressed cache.
+
+        The response is streamed straight into a PathIndex. For the root tree,
+        also remembers the repo's root-level blob SHAs so get_file_content can
+        read manifests as immutable blobs. Pass ``subtree=True`` when fetching
+        a directory below the root.
+        """
+        key = f"tree:{sha}:r" if recursive else f"tree:{sha}"
+        params = {"recursive": "1"} if recursive else None
+        index = self._object_lookup(key, decode=PathIndex.from_dict)
+        if index is None:
+            index = await self._coalesce(
+                key, lambda: self._stream_tree(key, f"/repos/{owner}/{repo}/git/trees/{sha}", params)
+            )
+        if index is not None and not subtree:
+            self._blob_shas[(owner, repo)] = index.root_blobs
+        return index
+
+    async def _stream_tree(self, key: str, path: str, params: dict | None) -> PathIndex | None:
+        response = await self._request("GET", path, params=params, stream=True)
+        try:
+            if response.status_code in (401, 403, 404, 409, 422):
+                return None
+            response.raise_for_status()
+            parser = TreeStreamParser()
+            async for chunk in response.aiter_bytes():
+                parser.feed(chunk)
+            index = parser.close()
+        finally:
+            await response.aclose()
+        self._object_set(key, index, encode=PathIndex.to_dict)
+        return index
+
+    def prime_tree(self, owner: str, repo: str, sha: str, index: PathIndex) -> None:
+        """Store a complete tree read elsewhere as the recursive tree of ``sha``.
+
+        The tree is cached as immutable content under ``sha``, so it must be
+        the real one; for a derived tree use ``prime_root_blobs``.
+        """
+        self._object_set(f"tree:{sha}:r", index, encode=PathIndex.to_dict)
+        self.prime_root_blobs(owner, repo, index)
+
+    def prime_root_blobs(self, owner: str, repo: str, index: PathIndex) -> None:
+        """Let get_file_content read a tree's root files as blobs, without caching the tree."""
+        self._blob_shas[(owner, repo)] = index.root_blobs
+
+    async def compare(self, owner: str, repo: str, base: str, head: str) -> dict | None:
+        """Files changed between two commits, from the content-addressed cache.
+
+        Returns ``status`` ("ahead", "behind", "diverged" or "identical") and
+        ``files``, each with ``filename``, ``status``, blob ``sha`` and, for
+        renames, ``previous_filename``. GitHub lists at most COMPARE_MAX_FILES.
+        """
+        return await self._get_object(
+            f"compare:{base}...{head}",
+            f"/repos/{owner}/{repo}/compare/{base}...{head}",
+            transform=_compare_summary,
+        )
+
+    async def get_blob(self, owner: str, repo: str, sha: str) -> str | None:
+        """Get decoded blob content by SHA from the content-addressed cache."""
+        return await self._get_object(
+            f"blob:{sha}", f"/repos/{owner}/{repo}/git/blobs/{sha}", transform=_decode_content
+        )
+
     async def get_file_content(self, owner: str, repo: str, path: str) -> str | None:
         """Get decoded file content from a repo. Returns None if not found."""
+        sha = self._blob_shas.get((owner, repo), {}).get(path)
+        if sha is not None:
+            return await self.get_blob(owner, repo, sha)
         data = await self.get(f"/repos/{owner}/{repo}/contents/{path}")
-        if data is None:
-            return None
-        if isinstance(data, dict) and data.get("encoding") == "base64":
-            return base64.b64decode(data["content"]).decode("utf-8", errors="replace")
-        return None
+        return _decode_content(data)
+
+    async def iter_tarball(self, owner: str, repo: str, ref: str) -> AsyncIterator[bytes]:
+        """Stream the gzip'd tarball of a ref chunk by chunk (one API call).
+
+        The download goes through ``_request``, so it rotates tokens, retries
+        and waits out rate limits like any other call.
+        """
+        response = await self._request(
+            "GET", f"/repos/{owner}/{repo}/tarball/{ref}", stream=True, follow_redirects=True
+        )
+        try:
+            if response.status_code in (401, 403, 404, 409):
+                return
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                yield chunk
+        finally:
+            await response.aclose()
 
     async def get_contributor_count(self, owner: str, repo: str) -> int:
         """Get total contributor count using the Link header pagination trick."""
-        response = await self._client.get(
+        response = await self._request(
+            "GET",
             f"/repos/{owner}/{repo}/contributors",
             params={"per_page": 1, "anon": "true"},
         )
-        self._update_rate_info(response)
         if response.status_code != 200:
             return 0
 
-        link = response.headers.get("Link", "")
-        if 'rel="last"' in link:
-            for part in link.split(","):
-                if 'rel="last"' in part:
-                    url_part = part.split(";")[0].strip().strip("<>")
-                    if "page=" in url_part:
-                        page = url_part.split("page=")[-1].split("&")[0]
-                        return int(page)
+        last = _last_page(response.headers.get("Link", ""))
+        if last is not None:
+            return last
         return len(response.json()) if isinstance(response.json(), list) else 0
 
+    async def iter_owner_repos(self, owner: str, concurrency: int = 8) -> AsyncIterator[dict]:
+        """Yield the repo listing entries of an org, or of a user if no org has the name.
+
+        The first page's Link header gives the last page number, so the
+        remaining pages are fetched ``concurrency`` at a time and yielded as
+        they arrive. Raises ValueError if there is no such org or user.
+        """
+        for path in (f"/orgs/{owner}/repos", f"/users/{owner}/repos"):
+            response = await self._request(
+                "GET", path, params={"per_page": LISTING_PAGE_SIZE, "page": 1}
+            )
+            if response.status_code != 404:
+                break
+        else:
+            raise ValueError(f"No GitHub organization or user named {owner!r}")
+        response.raise_for_status()
+        for repo in response.json():
+            yield repo
+
+        last = _last_page(response.headers.get("Link", "")) or 1
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(page: int) -> list[dict]:
+            async with semaphore:
+                response = await self._request(
+                    "GET", path, params={"per_page": LISTING_PAGE_SIZE, "page": page}
+                )
+            response.raise_for_status()
+            return response.json()
+
+        tasks = [asyncio.ensure_future(fetch(page)) for page in range(2, last + 1)]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                for repo in await next_page:
+                    yield repo
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     async def close(self) -> None:
+        # Other clients may be waiting on fetches this one started
+        if self._owned:
+            await asyncio.gather(*self._owned, return_exceptions=True)
         if not self._external_client:
             await self._client.aclose()
+        if self.cache is not None and not self._external_cache:
+            self.cache.close()
 
     async def __aenter__(self) -> GitHubClient:
         return self
 
     async def __aexit__(self, *args: Any) -> None:
         await self.close()
+
+
+def _compare_summary(data: Any) -> dict[str, Any]:
+    """Keep only what incremental analysis reads from a compare response."""
+    return {
+        "status": data.get("status"),
+        "files": [
+            {k: f[k] for k in ("filename", "status", "sha", "previous_filename") if k in f}
+            for f in data.get("files", [])
+        ],
+    }
+
+
+def _last_page(link: str) -> int | None:
+    """The page number of the rel="last" URL in a Link header, if any."""
+    for part in link.split(","):
+        if 'rel="last"' in part:
+            url_part = part.split(";")[0].strip().strip("<>")
+            page = parse_qs(urlsplit(url_part).query).get("page")
+            if page:
+                return int(page[0])
+    return None
+
+
+def _decode_content(data: Any) -> str | None:
+    """Decode a base64 contents/blob API payload."""
+    if isinstance(data, dict) and data.get("encoding") == "base64":
+        return base64.b64decode(data["content"]).decode("utf-8", errors="replace")
+    return None
+
+
+def _record_call(method: str, endpoint: str, status: int | str, started: float) -> None:
+    GITHUB_REQUESTS.inc(method, endpoint, str(status))
+    GITHUB_LATENCY.observe(time.monotonic() - started, endpoint)
+
+
+def _is_rate_limited(response: httpx.Response) -> bool:
+    return (
+        response.status_code in (403, 429)
+        and response.headers.get("X-RateLimit-Remaining") == "0"
+    )
+
+
+def _secondary_limit_delay(response: httpx.Response) -> float | None:
+    """Seconds to wait if this is a secondary (abuse) rate limit, else None."""
+    if response.status_code not in (403, 429):
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None and retry_after.isdigit():
+        return float(retry_after)
+    if "secondary rate limit" in response.text.lower():
+        return float(DEFAULT_BACKOFF)
+    return None
@@ -115,3 +115,111 @@ TEST_FILE_PATTERNS: dict[str, str] = {
     "setup.cfg": "pytest",  # often contains [tool:pytest]
     "conftest.py": "pytest",
 }
+
+# Files that mean the repo builds a container image
+DOCKER_FILES: tuple[str, ...] = (
+    "Dockerfile",
+    "*/Dockerfile",
+    "docker-compose.yml",
+    "docker-compose.yaml",
+    "compose.yml",
+    "compose.yaml",
+)
+
+# CI system label → files that configure it
+CI_FILES: dict[str, tuple[str, ...]] = {
+    "GitHub Actions": (".github/workflows/*",),
+    "GitLab CI": (".gitlab-ci.yml",),
+    "Jenkins": ("Jenkinsfile",),
+    "CircleCI": (".circleci/config.yml", ".circleci/config.yaml"),
+    "Travis CI": (".travis.yml",),
+    "Azure Pipelines": ("azure-pipelines*",),
+    "Bitbucket Pipelines": ("bitbucket-pipelines.yml",),
+}
+
+# Package manager → lockfiles and wrappers, in priority order
+PACKAGE_MANAGER_FILES: dict[str, tuple[str, ...]] = {
+    "pnpm": ("pnpm-lock.yaml",),
+    "yarn": ("yarn.lock",),
+    "bun": ("bun.lockb", "bun.lock"),
+    "npm": ("package-lock.json",),
+    "poetry": ("poetry.lock",),
+    "pipenv": ("Pipfile.lock",),
+    "pdm": ("pdm.lock",),
+    "uv": ("uv.lock",),
+    "cargo": ("Cargo.lock",),
+    "go": ("go.sum",),
+    "bundler": ("Gemfile.lock",),
+    "gradle": ("gradlew", "gradlew.bat"),
+    "maven": (".mvn", ".mvn/*"),
+}
+
+# Paths that mean the repo has tests
+TEST_PATH_PATTERNS: tuple[str, ...] = (
+    "tests/*", "test/*", "__tests__/*",
+    "*/tests/*", "*/test/*", "*/__tests__/*",
+    "*_test.py", "*_test.go", "*_test.rs",
+    "*.test.js", "*.test.ts", "*.test.tsx",
+    "*.spec.js", "*.spec.ts", "*.spec.tsx",
+)
+
+# Every file-path signal, matched in a single pass over the tree.
+# Patterns: "path" is exact, "prefix*" and "*suffix" anchor one end,
+# and "*/name/*" is a directory called name below the root.
+TREE_RULES: dict[str, tuple[str, ...]] = {
+    "docker": DOCKER_FILES,
+    "monorepo_workspace": ("lerna.json", "pnpm-workspace.yaml"),
+    "nested_package_json": ("*/package.json",),
+    "tests": TEST_PATH_PATTERNS,
+    "go_tests": ("*_test.go",),
+    "rust_tests": ("*_test.rs",),
+    "env_file": (".env",),
+    "dependabot": (".github/dependabot.yml", ".github/dependabot.yaml"),
+    "security_policy": ("SECURITY.md", "security.md", ".github/SECURITY.md"),
+    **{f"ci:{name}": files for name, files in CI_FILES.items()},
+    **{f"pm:{name}": files for name, files in PACKAGE_MANAGER_FILES.items()},
+    **{f"test_config:{name}": (f"*{name}",) for name in TEST_FILE_PATTERNS},
+}
+
+# File extension → language, for backends that have no GitHub language stats
+EXTENSION_LANGUAGES: dict[str, str] = {
+    ".py": "Python",
+    ".pyi": "Python",
+    ".js": "JavaScript",
+    ".mjs": "JavaScript",
+    ".cjs": "JavaScript",
+    ".jsx": "JavaScript",
+    ".ts": "TypeScript",
+    ".tsx": "TypeScript",
+    ".mts": "TypeScript",
+    ".rs": "Rust",
+    ".go": "Go",
+    ".java": "Java",
+    ".kt": "Kotlin",
+    ".kts": "Kotlin",
+    ".rb": "Ruby",
+    ".php": "PHP",
+    ".cs": "C#",
+    ".swift": "Swift",
+    ".dart": "Dart",
+    ".c": "C",
+    ".h": "C",
+    ".cc": "C++",
+    ".cpp": "C++",
+    ".cxx": "C++",
+    ".hpp": "C++",
+    ".hh": "C++",
+    ".scala": "Scala",
+    ".ex": "Elixir",
+    ".exs": "Elixir",
+    ".sh": "Shell",
+    ".bash": "Shell",
+    ".html": "HTML",
+    ".css": "CSS",
+    ".scss": "SCSS",
+    ".vue": "Vue",
+    ".svelte": "Svelte",
+}
+
+# Languages that never count as a repo's primary language
+NON_PRIMARY_LANGUAGES: frozenset[str] = frozenset({"Shell", "HTML", "CSS", "SCSS"})
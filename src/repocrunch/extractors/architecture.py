@@ -2,63 +2,35 @@
 
 from __future__ import annotations
 
-from typing import Any
-
-from repocrunch.detection import TEST_FILE_PATTERNS, TEST_FRAMEWORK_MAP
+from repocrunch.detection import CI_FILES, TEST_FILE_PATTERNS, TEST_FRAMEWORK_MAP
 from repocrunch.models import Architecture
+from repocrunch.pathindex import PathIndex
+from repocrunch.rules import tree_signals
 
 
-def _get_tree_paths(tree_data: dict[str, Any]) -> set[str]:
-    return {item["path"] for item in tree_data.get("tree", []) if item.get("type") == "blob"}
-
-
-def _detect_monorepo(paths: set[str], tree_data: dict[str, Any]) -> bool:
-    dirs = {item["path"] for item in tree_data.get("tree", []) if item.get("type") == "tree"}
-
+def _detect_monorepo(tree: PathIndex, signals: dict[str, int]) -> bool:
     # Workspace indicators
-    if "lerna.json" in paths or "pnpm-workspace.yaml" in paths:
+    if "monorepo_workspace" in signals:
         return True
 
     # Multiple package.json at different levels
-    pkg_jsons = [p for p in paths if p.endswith("package.json") and "/" in p]
-    if len(pkg_jsons) >= 2:
+    if signals.get("nested_package_json", 0) >= 2:
         return True
 
     # packages/ or apps/ directories
-    if any(d.startswith("packages/") for d in dirs) or any(d.startswith("apps/") for d in dirs):
+    if tree.has_dir_under("packages/") or tree.has_dir_under("apps/"):
         return True
 
     return False
 
 
-def _detect_docker(paths: set[str]) -> bool:
-    return any(
-        p == "Dockerfile" or p == "docker-compose.yml" or p == "docker-compose.yaml"
-        or p.endswith("/Dockerfile") or p == "compose.yml" or p == "compose.yaml"
-        for p in paths
-    )
+def _detect_ci_cd(signals: dict[str, int]) -> list[str]:
+    return [name for name in CI_FILES if f"ci:{name}" in signals]
 
 
-def _detect_ci_cd(paths: set[str]) -> list[str]:
-    ci: list[str] = []
-    if any(p.startswith(".github/workflows/") for p in paths):
-        ci.append("GitHub Actions")
-    if ".gitlab-ci.yml" in paths:
-        ci.append("GitLab CI")
-    if "Jenkinsfile" in paths:
-        ci.append("Jenkins")
-    if ".circleci/config.yml" in paths or ".circleci/config.yaml" in paths:
-        ci.append("CircleCI")
-    if ".travis.yml" in paths:
-        ci.append("Travis CI")
-    if any(p.startswith("azure-pipelines") for p in paths):
-        ci.append("Azure Pipelines")
-    if "bitbucket-pipelines.yml" in paths:
-        ci.append("Bitbucket Pipelines")
-    return ci
-
-
-def _detect_test_framework(paths: set[str], deps: list[str] | None = None) -> tuple[str | None, bool]:
+def _detect_test_framework(
+    signals: dict[str, int], deps: list[str] | None = None
+) -> tuple[str | None, bool]:
     """Detect test framework and whether tests exist. Returns (framework, has_tests)."""
     framework = None
 
@@ -73,41 +45,36 @@ def _detect_test_framework(paths: set[str], deps: list[str] | None = None) -> tu
     # Check config files in tree
     if not framework:
         for filename, fw in TEST_FILE_PATTERNS.items():
-            if any(p.endswith(filename) or p == filename for p in paths):
+            if f"test_config:{filename}" in signals:
                 framework = fw
                 break
 
-    # Check for test directories
-    has_tests = any(
-        p.startswith("tests/") or p.startswith("test/") or p.startswith("__tests__/")
-        or "/tests/" in p or "/test/" in p or "/__tests__/" in p
-        or p.endswith("_test.py") or p.endswith("_test.go") or p.endswith("_test.rs")
-        or p.endswith(".test.js") or p.endswith(".test.ts") or p.endswith(".test.tsx")
-        or p.endswith(".spec.js") or p.endswith(".spec.ts") or p.endswith(".spec.tsx")
-        for p in paths
-    )
+    # Check for test directories and test file suffixes
+    has_tests = "tests" in signals
 
     # Rust/Go have built-in test frameworks
     if has_tests and not framework:
-        if any(p.endswith("_test.go") for p in paths):
+        if "go_tests" in signals:
             framework = "go test"
-        elif any(p.endswith("_test.rs") or p.endswith("/tests/") for p in paths):
+        elif "rust_tests" in signals:
             framework = "cargo test"
 
     return framework, has_tests
 
 
 def extract_architecture(
-    tree_data: dict[str, Any],
+    tree: PathIndex,
     deps: list[str] | None = None,
+    signals: dict[str, int] | None = None,
 ) -> Architecture:
-    paths = _get_tree_paths(tree_data)
-    test_framework, has_tests = _detect_test_framework(paths, deps)
+    if signals is None:
+        signals = tree_signals(tree)
+    test_framework, has_tests = _detect_test_framework(signals, deps)
 
     return Architecture(
-        monorepo=_detect_monorepo(paths, tree_data),
-        docker=_detect_docker(paths),
-        ci_cd=_detect_ci_cd(paths),
+        monorepo=_detect_monorepo(tree, signals),
+        docker="docker" in signals,
+        ci_cd=_detect_ci_cd(signals),
         test_framework=test_framework,
         has_tests=has_tests,
     )
@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any
 
-from repocrunch.client import GitHubClient
+from repocrunch.backends import RepoBackend
 from repocrunch.models import CommitFrequency, Health, MaintenanceStatus
 
 
@@ -72,20 +72,19 @@ def _classify_maintenance(
 
 
 async def extract_health(
-    client: GitHubClient,
+    client: RepoBackend,
     owner: str,
     repo: str,
     repo_data: dict[str, Any],
+    commits: bool = True,
+    contributors: bool = True,
 ) -> Health:
-    commits = await client.get(
-        f"/repos/{owner}/{repo}/commits",
-        params={"per_page": 100},
-    )
-    commits = commits or []
+    """Pass ``commits=False`` or ``contributors=False`` to skip those calls."""
+    commit_list = (await client.get_commits(owner, repo) if commits else None) or []
 
-    contributor_count = await client.get_contributor_count(owner, repo)
+    contributor_count = await client.get_contributor_count(owner, repo) if contributors else 0
 
-    freq = _classify_commit_frequency(commits)
+    freq = _classify_commit_frequency(commit_list)
 
     pushed_at = repo_data.get("pushed_at")
     last_commit = None
@@ -100,7 +99,8 @@ async def extract_health(
 
     return Health(
         open_issues=repo_data.get("open_issues_count", 0),
-        open_prs=0,  # open_issues_count includes PRs; we'd need separate API call
+        # open_issues_count includes PRs; only the GraphQL path reports them separately
+        open_prs=repo_data.get("open_pull_requests_count", 0),
         contributors=contributor_count,
         commit_frequency=freq,
         maintenance_status=status,
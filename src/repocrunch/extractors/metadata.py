@@ -8,15 +8,19 @@ from typing import Any
 from repocrunch.models import RepoSummary
 
 
+def age_in_days(created_at: str | None) -> int:
+    """Days since an ISO-8601 creation timestamp (0 if unknown)."""
+    if not created_at:
+        return 0
+    created = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    return (datetime.now(timezone.utc) - created).days
+
+
 def extract_metadata(
     repo_data: dict[str, Any],
     languages: dict[str, int] | None,
 ) -> RepoSummary:
-    created_at = repo_data.get("created_at")
-    age_days = 0
-    if created_at:
-        created = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-        age_days = (datetime.now(timezone.utc) - created).days
+    age_days = age_in_days(repo_data.get("created_at"))
 
     pushed_at = repo_data.get("pushed_at")
     last_commit = None
@@ -4,51 +4,43 @@ from __future__ import annotations
 
 from typing import Any
 
-from repocrunch.client import GitHubClient
+from repocrunch.backends import RepoBackend
 from repocrunch.models import Security
-
-
-def _get_tree_paths(tree_data: dict[str, Any]) -> set[str]:
-    return {item["path"] for item in tree_data.get("tree", []) if item.get("type") == "blob"}
+from repocrunch.pathindex import PathIndex
+from repocrunch.rules import tree_signals
 
 
 async def extract_security(
-    client: GitHubClient,
+    client: RepoBackend,
     owner: str,
     repo: str,
-    tree_data: dict[str, Any],
+    tree: PathIndex,
     repo_data: dict[str, Any],
     warnings: list[str],
+    signals: dict[str, int] | None = None,
+    check_protection: bool = True,
 ) -> Security:
-    paths = _get_tree_paths(tree_data)
+    if signals is None:
+        signals = tree_signals(tree)
 
-    has_env = ".env" in paths
+    has_env = "env_file" in signals
     if has_env:
         warnings.append(".env file committed to repository")
 
-    dependabot = (
-        ".github/dependabot.yml" in paths
-        or ".github/dependabot.yaml" in paths
-    )
-
-    security_policy = (
-        "SECURITY.md" in paths
-        or "security.md" in paths
-        or ".github/SECURITY.md" in paths
-    )
+    dependabot = "dependabot" in signals
+    security_policy = "security_policy" in signals
 
     # Branch protection — may 404 without admin access
     branch_protection = False
-    default_branch = repo_data.get("default_branch", "main")
-    protection_data = await client.get(
-        f"/repos/{owner}/{repo}/branches/{default_branch}/protection"
-    )
-    if protection_data is not None:
-        branch_protection = True
-    else:
-        warnings.append(
-            "Branch protection status unknown (requires admin access or authenticated request)"
-        )
+    if check_protection:
+        default_branch = repo_data.get("default_branch", "main")
+        protection_data = await client.get_branch_protection(owner, repo, default_branch)
+        if protection_data is not None:
+            branch_protection = True
+        else:
+            warnings.append(
+                "Branch protection status unknown (requires admin access or authenticated request)"
+            )
 
     return Security(
         has_env_file=has_env,
@@ -2,11 +2,11 @@
 
 from __future__ import annotations
 
-from typing import Any
-
-from repocrunch.client import GitHubClient
-from repocrunch.detection import FRAMEWORK_MAP
+from repocrunch.backends import RepoBackend
+from repocrunch.detection import FRAMEWORK_MAP, PACKAGE_MANAGER_FILES
 from repocrunch.models import TechStack
+from repocrunch.pathindex import PathIndex
+from repocrunch.rules import tree_signals
 from repocrunch.parsers.build_gradle import parse_build_gradle
 from repocrunch.parsers.cargo_toml import parse_cargo_toml
 from repocrunch.parsers.cmakelists import parse_cmakelists
@@ -35,9 +35,19 @@ LANGUAGE_RUNTIME: dict[str, str] = {
     "C++": "C++",
 }
 
-
-def _get_tree_paths(tree_data: dict[str, Any]) -> set[str]:
-    return {item["path"] for item in tree_data.get("tree", []) if item.get("type") == "blob"}
+# Root-level manifests the extractor knows how to parse
+MANIFEST_FILES: tuple[str, ...] = (
+    "package.json",
+    "pyproject.toml",
+    "requirements.txt",
+    "Cargo.toml",
+    "go.mod",
+    "pom.xml",
+    "build.gradle",
+    "build.gradle.kts",
+    "Gemfile",
+    "CMakeLists.txt",
+)
 
 
 def _detect_framework(deps: list[str]) -> str | None:
@@ -50,45 +60,22 @@ def _detect_framework(deps: list[str]) -> str | None:
     return None
 
 
-def _detect_pm_from_tree(paths: set[str], language: str | None) -> str | None:
+def _detect_pm_from_tree(signals: dict[str, int]) -> str | None:
     """Detect package manager from lockfiles in the tree."""
-    if "pnpm-lock.yaml" in paths:
-        return "pnpm"
-    if "yarn.lock" in paths:
-        return "yarn"
-    if "bun.lockb" in paths or "bun.lock" in paths:
-        return "bun"
-    if "package-lock.json" in paths:
-        return "npm"
-    if "poetry.lock" in paths:
-        return "poetry"
-    if "Pipfile.lock" in paths:
-        return "pipenv"
-    if "pdm.lock" in paths:
-        return "pdm"
-    if "uv.lock" in paths:
-        return "uv"
-    if "Cargo.lock" in paths:
-        return "cargo"
-    if "go.sum" in paths:
-        return "go"
-    if "Gemfile.lock" in paths:
-        return "bundler"
-    if "gradlew" in paths or "gradlew.bat" in paths:
-        return "gradle"
-    if ".mvn" in paths or any(p.startswith(".mvn/") for p in paths):
-        return "maven"
-    return None
+    return next((pm for pm in PACKAGE_MANAGER_FILES if f"pm:{pm}" in signals), None)
 
 
 async def extract_tech_stack(
-    client: GitHubClient,
+    client: RepoBackend,
     owner: str,
     repo: str,
-    tree_data: dict[str, Any],
+    tree: PathIndex,
     primary_language: str | None,
+    signals: dict[str, int] | None = None,
+    read_manifests: bool = True,
 ) -> TechStack:
-    paths = _get_tree_paths(tree_data)
+    """With ``read_manifests=False`` only the runtime is filled in, at no API cost."""
+    paths = tree.blobs if read_manifests else frozenset()
     runtime = LANGUAGE_RUNTIME.get(primary_language or "")
     all_direct: list[str] = []
     all_dev: list[str] = []
@@ -201,8 +188,8 @@ async def extract_tech_stack(
                     parsed = True
                     break
 
-    if not pm:
-        pm = _detect_pm_from_tree(paths, primary_language)
+    if not pm and read_manifests:
+        pm = _detect_pm_from_tree(signals if signals is not None else tree_signals(tree))
 
     framework = _detect_framework(all_direct)
 
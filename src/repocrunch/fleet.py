@@ -0,0 +1,103 @@
+"""Analyze a whole directory of local repos across a process pool.
+
+Tree indexing, manifest parsing and detection are CPU-bound Python, so one
+event loop tops out on one core. Here repos are handed to worker processes
+in chunks, each chunk analyzed with the local backends, and results streamed
+back as chunks finish.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+
+from repocrunch.analyzer import analyze_local
+from repocrunch.backends import GitObjectStore
+from repocrunch.backends.local import IGNORED_DIRS
+from repocrunch.models import BatchResult
+
+DEFAULT_CHUNK_SIZE = 16
+MAX_DEPTH = 3  # e.g. mirrors/<host>/<org>/<repo>.git
+
+
+def is_repo_dir(path: Path) -> bool:
+    """A bare clone, or a working copy with a .git."""
+    return GitObjectStore.is_git_dir(path) or (path / ".git").exists()
+
+
+def discover_repos(root: str | os.PathLike[str], max_depth: int = MAX_DEPTH) -> Iterator[Path]:
+    """Yield repos under ``root`` in sorted order, without descending into them."""
+    root = Path(root)
+    if not root.is_dir():
+        raise ValueError(f"Not a directory: {root}")
+    stack = [(root, 0)]
+    while stack:
+        path, depth = stack.pop()
+        if is_repo_dir(path):
+            yield path
+            continue
+        if depth >= max_depth:
+            continue
+        try:
+            children = sorted(
+                (p for p in path.iterdir() if p.is_dir() and p.name not in IGNORED_DIRS),
+                reverse=True,
+            )
+        except OSError:
+            continue
+        stack.extend((child, depth + 1) for child in children)
+
+
+async def _analyze_paths(paths: list[str]) -> list[BatchResult]:
+    results = []
+    for path in paths:
+        try:
+            # Processes already provide the parallelism; keep each tree walk single-threaded
+            analysis = await analyze_local(path, max_workers=1)
+            results.append(BatchResult(repo=path, analysis=analysis))
+        except Exception as e:
+            results.append(BatchResult(repo=path, error=str(e) or type(e).__name__))
+    return results
+
+
+def _analyze_chunk(paths: list[str]) -> list[BatchResult]:
+    """Worker-process entry point: analyze one chunk of repos."""
+    return asyncio.run(_analyze_paths(paths))
+
+
+def scan_dir(
+    root: str | os.PathLike[str],
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[BatchResult]:
+    """Analyze every repo under ``root`` on ``workers`` processes.
+
+    Repos are discovered lazily and sent out ``chunk_size`` at a time, with at
+    most two chunks queued per worker, so memory stays flat for huge mirror
+    directories. Results are yielded as chunks complete, not in input order.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    repos = (str(p) for p in discover_repos(root))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: set[Future[list[BatchResult]]] = set()
+
+        def submit_more() -> None:
+            while len(pending) < workers * 2:
+                chunk = list(islice(repos, chunk_size))
+                if not chunk:
+                    return
+                pending.add(pool.submit(_analyze_chunk, chunk))
+
+        submit_more()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            submit_more()
+            for future in done:
+                yield from future.result()
@@ -0,0 +1,145 @@
+"""Single-round-trip GraphQL prefetch that primes the client's REST responses."""
+
+from __future__ import annotations
+
+import fnmatch
+from typing import Any
+
+from repocrunch.client import SHA_MEDIA_TYPE, GitHubClient
+from repocrunch.extractors.tech_stack import MANIFEST_FILES
+
+REPO_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    name
+    nameWithOwner
+    createdAt
+    pushedAt
+    isArchived
+    isPrivate
+    stargazerCount
+    forkCount
+    watchers { totalCount }
+    issues(states: OPEN) { totalCount }
+    pullRequests(states: OPEN) { totalCount }
+    primaryLanguage { name }
+    licenseInfo { spdxId }
+    languages(first: 100, orderBy: {field: SIZE, direction: DESC}) {
+      edges { size node { name } }
+    }
+    defaultBranchRef {
+      name
+      target {
+        ... on Commit {
+          oid
+          history(first: 100) { nodes { committedDate } }
+        }
+      }
+    }
+    branchProtectionRules(first: 100) { nodes { pattern } }
+%(manifests)s
+  }
+}
+"""
+
+MANIFEST_FIELD = '    m%d: object(expression: "HEAD:%s") { ... on Blob { oid text } }'
+
+
+def _build_query() -> str:
+    fields = "\n".join(MANIFEST_FIELD % (i, name) for i, name in enumerate(MANIFEST_FILES))
+    return REPO_QUERY % {"manifests": fields}
+
+
+def _to_rest_repo(node: dict[str, Any]) -> dict[str, Any]:
+    """Map the GraphQL repository node onto the REST fields the extractors read."""
+    branch = node.get("defaultBranchRef") or {}
+    license_info = node.get("licenseInfo") or {}
+    open_issues = (node.get("issues") or {}).get("totalCount", 0)
+    open_prs = (node.get("pullRequests") or {}).get("totalCount", 0)
+    return {
+        "name": node.get("name"),
+        "full_name": node.get("nameWithOwner"),
+        "created_at": node.get("createdAt"),
+        "pushed_at": node.get("pushedAt"),
+        "archived": node.get("isArchived", False),
+        "private": node.get("isPrivate"),
+        "stargazers_count": node.get("stargazerCount", 0),
+        "forks_count": node.get("forkCount", 0),
+        "subscribers_count": (node.get("watchers") or {}).get("totalCount", 0),
+        # REST counts PRs as issues; keep that contract and expose PRs separately
+        "open_issues_count": open_issues + open_prs,
+        "open_pull_requests_count": open_prs,
+        "language": (node.get("primaryLanguage") or {}).get("name"),
+        "license": {"spdx_id": license_info["spdxId"]} if license_info.get("spdxId") else None,
+        "default_branch": branch.get("name", "main"),
+    }
+
+
+def _not_found(payload: dict[str, Any]) -> bool:
+    """Whether a GraphQL error payload says the repository doesn't exist."""
+    return any(
+        error.get("type") == "NOT_FOUND"
+        and (error.get("path") or ["repository"])[0] == "repository"
+        for error in payload.get("errors") or ()
+    )
+
+
+async def prefetch_repo(client: GitHubClient, owner: str, repo: str) -> bool:
+    """Fetch repo metadata, languages, commits, protection and root manifests in one query.
+
+    Results are primed into the client as REST-shaped responses (and manifest
+    blobs into its content-addressed cache), so the extractors read them
+    through the usual client methods. Returns False (and primes nothing) if
+    GraphQL is unavailable or the query fails for any reason but a missing
+    repo (e.g. FORBIDDEN or SAML enforcement), leaving the REST path intact.
+    """
+    payload = await client.graphql(_build_query(), {"owner": owner, "name": repo})
+    if payload is None or "data" not in payload:
+        return False
+
+    base = f"/repos/{owner}/{repo}"
+    node = (payload.get("data") or {}).get("repository")
+    if node is None:
+        if not _not_found(payload):
+            return False
+        client.prime(base, None)
+        return True
+
+    repo_data = _to_rest_repo(node)
+    client.prime(base, repo_data)
+    client.prime(
+        f"{base}/languages",
+        {e["node"]["name"]: e["size"] for e in (node.get("languages") or {}).get("edges", [])},
+    )
+
+    target = (node.get("defaultBranchRef") or {}).get("target") or {}
+    if target.get("oid"):
+        client.prime(f"{base}/commits/HEAD", target["oid"], accept=SHA_MEDIA_TYPE)
+    history = (target.get("history") or {}).get("nodes", [])
+    client.prime(
+        f"{base}/commits",
+        [{"commit": {"committer": {"date": c["committedDate"]}}} for c in history],
+        params={"per_page": 100},
+    )
+
+    # A non-null connection: a token that can't read the rules fails the whole
+    # repository (the REST fallback above). No matching rule reads like REST's 404.
+    rules = node.get("branchProtectionRules") or {}
+    branch = repo_data["default_branch"]
+    matched = next(
+        (r for r in rules.get("nodes", []) if fnmatch.fnmatchcase(branch, r["pattern"])),
+        None,
+    )
+    client.prime(f"{base}/branches/{branch}/protection", matched)
+
+    for i, name in enumerate(MANIFEST_FILES):
+        blob = node.get(f"m{i}")
+        if blob is None:
+            client.prime_file(owner, repo, name, None)
+        elif blob.get("text") is not None:
+            if blob.get("oid"):
+                client.prime_blob(blob["oid"], blob["text"])
+            client.prime_file(owner, repo, name, blob["text"])
+        # Binary or oversized blobs have no text; fall back to the contents API
+
+    return True
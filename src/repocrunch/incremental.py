@@ -0,0 +1,201 @@
+"""Incremental re-analysis: bring a previous analysis up to date from a diff.
+
+Between two runs most repos change a handful of files. Instead of listing
+the tree and reading every manifest again, ask the compare API which files
+changed since the commit the previous analysis saw, apply that to the old
+tree, and re-read only manifests that changed. Health and summary come from
+live data as usual; branch protection isn't tied to commits and is kept.
+
+Anything the diff can't describe (a force push, more files than the compare
+API lists, a truncated base tree) falls back to a full analysis.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from repocrunch.analyzer import _skip, analyze_repo, parse_repo_input
+from repocrunch.client import COMPARE_MAX_FILES, SHA_MEDIA_TYPE, GitHubClient
+from repocrunch.detection import PACKAGE_MANAGER_FILES
+from repocrunch.extractors.architecture import extract_architecture
+from repocrunch.extractors.health import extract_health
+from repocrunch.extractors.metadata import extract_metadata
+from repocrunch.extractors.security import extract_security
+from repocrunch.extractors.tech_stack import MANIFEST_FILES, extract_tech_stack
+from repocrunch.models import RepoAnalysis
+from repocrunch.pathindex import PathIndex, PathIndexBuilder
+from repocrunch.rules import RuleSet, tree_signals
+
+# Files whose change can alter the tech stack without touching a manifest
+_LOCKFILES = RuleSet({f"pm:{name}": files for name, files in PACKAGE_MANAGER_FILES.items()})
+
+
+@dataclass
+class Reanalysis:
+    """An up-to-date analysis and the HEAD commit it reflects.
+
+    Pass ``sha`` as the base of the next re-analysis. ``incremental`` is
+    False when the diff couldn't be used and a full analysis ran instead.
+    """
+
+    analysis: RepoAnalysis
+    sha: str | None
+    incremental: bool
+
+
+def _ancestors(path: str) -> Iterable[str]:
+    parts = path.split("/")[:-1]
+    return ("/".join(parts[: i + 1]) for i in range(len(parts)))
+
+
+def apply_changes(tree: PathIndex, files: list[dict[str, Any]]) -> PathIndex:
+    """Apply compare API file changes to ``tree``.
+
+    Directories on a changed path lose their (now stale) tree SHA, and
+    directories left without files are dropped.
+    """
+    builder = PathIndexBuilder.from_index(tree)
+    emptied: set[str] = set()
+    for change in files:
+        path = change["filename"]
+        removed = [change.get("previous_filename")] if change["status"] == "renamed" else []
+        if change["status"] == "removed":
+            removed.append(path)
+        for old in filter(None, removed):
+            builder.remove(old)
+            emptied.update(_ancestors(old))
+        if change["status"] != "removed":
+            for parent in _ancestors(path):
+                builder.add(parent, "tree", None)
+            builder.add(path, "blob", change.get("sha"))
+        for parent in _ancestors(path):
+            builder.dirs[parent] = None
+
+    index = builder.build(sha=None)
+    empty = [d for d in emptied if d in index.dirs and not index.has_file_under(d + "/")]
+    if empty:
+        for d in empty:
+            del builder.dirs[d]
+        index = builder.build(sha=None)
+    return index
+
+
+def _kept_warnings(previous: RepoAnalysis, tree_kept: bool) -> list[str]:
+    """Warnings about the parts of ``previous`` that carry over unchanged."""
+    prefixes = ("Branch protection",) + ((".env file", "File tree") if tree_kept else ())
+    return [w for w in previous.warnings if w.startswith(prefixes)]
+
+
+async def reanalyze_repo(
+    previous: RepoAnalysis,
+    base_sha: str,
+    token: str | None = None,
+    client: GitHubClient | None = None,
+) -> Reanalysis:
+    """Update ``previous``, an analysis of the repo at commit ``base_sha``.
+
+    Costs the repo metadata, HEAD and compare calls, one tree call unless
+    the base tree is cached, reads of changed manifests, and the health
+    calls, instead of a full analysis.
+    """
+    owner, repo = parse_repo_input(previous.repo)
+
+    owns_client = client is None
+    if owns_client:
+        client = GitHubClient(token=token)
+    client_warnings_start = len(client.warnings)
+
+    async def full() -> Reanalysis:
+        # Reuse what was already fetched
+        client.prime(f"/repos/{owner}/{repo}", repo_data)
+        client.prime(f"/repos/{owner}/{repo}/commits/HEAD", head, accept=SHA_MEDIA_TYPE)
+        analysis = await analyze_repo(previous.repo, client=client)
+        return Reanalysis(analysis, head, incremental=False)
+
+    try:
+        repo_data, head = await asyncio.gather(
+            client.get_repo(owner, repo), client.resolve_head(owner, repo)
+        )
+        if repo_data is None:
+            raise ValueError(f"Repository not found: {owner}/{repo}")
+        if head is None:
+            return await full()
+
+        files: list[dict[str, Any]] = []
+        if head != base_sha:
+            diff = await client.compare(owner, repo, base_sha, head)
+            if (
+                diff is None
+                or diff["status"] not in ("ahead", "identical")
+                or len(diff["files"]) >= COMPARE_MAX_FILES
+            ):
+                return await full()
+            files = diff["files"]
+
+        warnings = _kept_warnings(previous, tree_kept=not files)
+        language = repo_data.get("language")
+        tech_stack = previous.tech_stack
+        architecture = previous.architecture
+        security = previous.security
+        languages = None
+
+        if not files:
+            health = await extract_health(client, owner, repo, repo_data)
+        else:
+            base_tree = await client.get_tree(owner, repo, base_sha)
+            if base_tree is None or base_tree.truncated:
+                return await full()
+            tree = apply_changes(base_tree, files)
+            # Derived trees lack directory SHAs and submodules; never cache one as HEAD's
+            client.prime_root_blobs(owner, repo, tree)
+            signals = tree_signals(tree)
+
+            changed = {f["filename"] for f in files}
+            changed.update(f["previous_filename"] for f in files if f.get("previous_filename"))
+            stack_changed = (
+                language != previous.summary.primary_language
+                or any(path in MANIFEST_FILES for path in changed)
+                or bool(_LOCKFILES.match(changed))
+            )
+            new_stack, health, languages = await asyncio.gather(
+                extract_tech_stack(client, owner, repo, tree, language, signals)
+                if stack_changed else _skip(),
+                extract_health(client, owner, repo, repo_data),
+                client.get_languages(owner, repo),
+            )
+            if new_stack is not None:
+                tech_stack = new_stack
+            architecture = extract_architecture(tree, tech_stack.key_deps, signals)
+            security = await extract_security(
+                client, owner, repo, tree, repo_data, warnings, signals, check_protection=False
+            )
+            security.branch_protection = previous.security.branch_protection
+
+        summary = extract_metadata(repo_data, languages)
+        if languages is None:
+            summary.languages = previous.summary.languages
+
+        for warning in client.warnings[client_warnings_start:]:
+            if warning not in warnings:
+                warnings.append(warning)
+
+        analysis = RepoAnalysis(
+            repo=f"{owner}/{repo}",
+            url=f"https://github.com/{owner}/{repo}",
+            analyzed_at=datetime.now(timezone.utc),
+            summary=summary,
+            tech_stack=tech_stack,
+            architecture=architecture,
+            health=health,
+            security=security,
+            warnings=warnings,
+        )
+        return Reanalysis(analysis, head, incremental=True)
+    finally:
+        client.release(owner, repo)
+        if owns_client:
+            await client.close()
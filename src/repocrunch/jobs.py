@@ -0,0 +1,323 @@
+"""Durable batch jobs: a SQLite-backed queue of repos and the workers that drain it.
+
+A job is a list of repos submitted at once. Every repo is a row that starts
+``pending`` and becomes ``done`` or ``failed`` when its analysis finishes,
+so a restarted server simply picks up the rows still pending. Analyses in
+flight when the process died are pending too and run again.
+
+Store calls can wait up to 30s for another process's write lock, so the
+runner makes them from a worker thread rather than the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Collection, Sequence
+from pathlib import Path
+from typing import Any
+
+from repocrunch.analyzer import analyze_repo
+from repocrunch.client import GitHubClient
+from repocrunch.planner import plan_analysis
+from repocrunch.results import ResultCache
+from repocrunch.scheduler import RateLimitScheduler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOBS_PATH = "~/.cache/repocrunch/jobs.db"
+FEED_BATCH = 100  # pending rows read from the store at a time
+
+PENDING, DONE, FAILED = "pending", "done", "failed"
+
+
+class JobStore:
+    """SQLite storage for jobs and their per-repo results (WAL, thread-safe)."""
+
+    def __init__(self, path: str | os.PathLike[str]):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path,
+            timeout=30.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                fields TEXT,
+                total INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_items (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                repo TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                finished_at REAL,
+                PRIMARY KEY (job_id, position)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS job_items_status ON job_items (status)"
+        )
+
+    def create(self, repos: Sequence[str], fields: Sequence[str] | None = None) -> str:
+        """Queue ``repos`` as a new job and return its id."""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO jobs (id, fields, total, created_at) VALUES (?, ?, ?, ?)",
+                    (job_id, json.dumps(list(fields)) if fields else None, len(repos), time.time()),
+                )
+                self._conn.executemany(
+                    "INSERT INTO job_items (job_id, position, repo, status) VALUES (?, ?, ?, ?)",
+                    ((job_id, i, repo, PENDING) for i, repo in enumerate(repos)),
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return job_id
+
+    def pending(
+        self, limit: int, exclude: Collection[tuple[str, int]] = ()
+    ) -> list[tuple[str, int, str, list[str] | None]]:
+        """Up to ``limit`` pending (job_id, position, repo, fields), oldest job first,
+        skipping the (job_id, position) pairs in ``exclude``."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT i.job_id, i.position, i.repo, j.fields
+                FROM job_items i JOIN jobs j ON j.id = i.job_id
+                WHERE i.status = ?
+                ORDER BY j.created_at, i.job_id, i.position
+                LIMIT ?
+                """,
+                (PENDING, limit + len(exclude)),
+            ).fetchall()
+        items = [
+            (job_id, position, repo, json.loads(fields) if fields else None)
+            for job_id, position, repo, fields in rows
+            if (job_id, position) not in exclude
+        ]
+        return items[:limit]
+
+    def count_pending(self) -> int:
+        """Repos still pending across all jobs."""
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM job_items WHERE status = ?", (PENDING,)
+            ).fetchone()
+        return count
+
+    def finish(
+        self,
+        job_id: str,
+        position: int,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Record one repo's analysis (or the error that stopped it)."""
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE job_items SET status = ?, result = ?, error = ?, finished_at = ?
+                WHERE job_id = ? AND position = ?
+                """,
+                (
+                    FAILED if error is not None else DONE,
+                    json.dumps(result, separators=(",", ":")) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                    position,
+                ),
+            )
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        """A job's progress: total, counts by status, and overall status."""
+        with self._lock:
+            job = self._conn.execute(
+                "SELECT total, fields, created_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status",
+                (job_id,),
+            ).fetchall())
+        total, fields, created_at = job
+        done, failed = counts.get(DONE, 0), counts.get(FAILED, 0)
+        if done + failed == total:
+            status = "finished"
+        elif done + failed:
+            status = "running"
+        else:
+            status = "queued"
+        return {
+            "id": job_id,
+            "status": status,
+            "total": total,
+            "done": done,
+            "failed": failed,
+            "pending": counts.get(PENDING, 0),
+            "fields": json.loads(fields) if fields else None,
+            "created_at": created_at,
+        }
+
+    def items(self, job_id: str, offset: int = 0, limit: int = 100) -> list[dict[str, Any]]:
+        """One page of a job's repos in submission order, finished or not."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT repo, status, result, error FROM job_items
+                WHERE job_id = ? AND position >= ?
+                ORDER BY position LIMIT ?
+                """,
+                (job_id, offset, limit),
+            ).fetchall()
+        return [
+            {
+                "repo": repo,
+                "status": status,
+                "analysis": json.loads(result) if result is not None else None,
+                "error": error,
+            }
+            for repo, status, result, error in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def job_store_path() -> Path:
+    """The job store named by REPOCRUNCH_JOBS (default ~/.cache/repocrunch/jobs.db)."""
+    return Path(os.environ.get("REPOCRUNCH_JOBS") or DEFAULT_JOBS_PATH).expanduser()
+
+
+class JobRunner:
+    """Drains pending job items with ``concurrency`` workers over one shared client.
+
+    The client waits out rate limits rather than failing items. Queue jobs
+    with ``submit()`` so idle workers pick them up and the scheduler plans
+    for them.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        concurrency: int = 8,
+        client: GitHubClient | None = None,
+        result_cache: ResultCache | None = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.store = store
+        self.concurrency = concurrency
+        self._client = client
+        self._owns_client = client is None
+        self.result_cache = result_cache
+        self._claimed: set[tuple[str, int]] = set()
+        self._wakeup = asyncio.Event()
+        self._queue: asyncio.Queue[tuple[str, int, str, list[str] | None]] = asyncio.Queue(
+            maxsize=concurrency
+        )
+        self._tasks: list[asyncio.Task[None]] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Start the workers (idempotent). Items left pending by an earlier run resume."""
+        if self._tasks:
+            return
+        if self._client is None:
+            self._client = GitHubClient(scheduler=RateLimitScheduler())
+        self._plan(self.store.count_pending())
+        self._tasks = [asyncio.create_task(self._feed())]
+        self._tasks += [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    def _plan(self, repos: int) -> None:
+        # Lets the scheduler run unpaced while the queued work fits the budget
+        scheduler = getattr(self._client, "scheduler", None)
+        if scheduler is not None and repos:
+            scheduler.plan(repos)
+
+    async def submit(self, repos: Sequence[str], fields: Sequence[str] | None = None) -> str:
+        """Queue ``repos`` as a new job and wake the workers. Returns the job id."""
+        job_id = await asyncio.to_thread(self.store.create, repos, fields)
+        self._plan(len(repos))
+        self.notify()
+        return job_id
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Cancel the workers; unfinished items stay pending for the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._claimed.clear()
+        self._queue = asyncio.Queue(maxsize=self.concurrency)
+        if self._owns_client and self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def _feed(self) -> None:
+        while True:
+            self._wakeup.clear()
+            batch = await asyncio.to_thread(
+                self.store.pending, FEED_BATCH, exclude=set(self._claimed)
+            )
+            if not batch:
+                await self._wakeup.wait()
+                continue
+            for item in batch:
+                self._claimed.add((item[0], item[1]))
+                await self._queue.put(item)
+
+    async def _work(self) -> None:
+        assert self._client is not None
+        while True:
+            job_id, position, repo, fields = await self._queue.get()
+            try:
+                plan = plan_analysis(fields)
+                analysis = await analyze_repo(
+                    repo, client=self._client, fields=plan.fields, result_cache=self.result_cache
+                )
+                result, error = plan.select(analysis.model_dump(mode="json")), None
+            except Exception as e:
+                result, error = None, str(e) or type(e).__name__
+            try:
+                await asyncio.to_thread(self.store.finish, job_id, position, result, error)
+            except Exception:
+                # Still pending in the store, so the next start runs it again;
+                # it stays claimed so this run doesn't retry it in a loop
+                logger.warning("Could not record %s in job %s", repo, job_id, exc_info=True)
+            else:
+                self._claimed.discard((job_id, position))
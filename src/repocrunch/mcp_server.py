@@ -5,6 +5,7 @@ from __future__ import annotations
 from fastmcp import FastMCP
 
 from repocrunch.analyzer import analyze_repo
+from repocrunch.planner import plan_analysis
 
 mcp = FastMCP("RepoCrunch", description="Analyze GitHub repos into structured JSON.")
 
@@ -13,15 +14,18 @@ mcp = FastMCP("RepoCrunch", description="Analyze GitHub repos into structured JS
 async def analyze_repo_tool(
     repo: str,
     github_token: str | None = None,
+    fields: list[str] | None = None,
 ) -> dict:
     """Analyze a public GitHub repository and return structured JSON with tech stack, dependencies, architecture, health, and security signals.
 
     Args:
         repo: GitHub repo as 'owner/repo' or full URL
         github_token: Optional GitHub token for higher rate limits
+        fields: Optional sections (e.g. 'security') or 'section.field' names to compute; only the API calls they need are made
     """
-    result = await analyze_repo(repo, token=github_token)
-    return result.model_dump(mode="json")
+    plan = plan_analysis(fields)
+    result = await analyze_repo(repo, token=github_token, fields=plan.fields)
+    return plan.select(result.model_dump(mode="json"))
 
 
 if __name__ == "__main__":
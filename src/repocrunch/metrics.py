@@ -0,0 +1,197 @@
+"""Process-wide service metrics in the Prometheus text format.
+
+A few counters, gauges and histograms are enough here, so this is a small
+dependency-free implementation rather than a client library. The API serves
+``render()`` at ``/metrics``.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Iterator, Sequence
+
+# Seconds; covers a 304 revalidation up to a large tarball or full analysis
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+_registry: list[_Metric] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Sequence[str]) -> tuple[str, ...]:
+        if len(labels) != len(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(label) for label in labels)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> (per-bucket counts, sum)
+        self._values: dict[tuple[str, ...], tuple[list[int], float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * len(self.buckets), 0.0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def count(self, *labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(
+                (key, (list(counts), total)) for key, (counts, total) in self._values.items()
+            )
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}"
+            labels = _format_labels(self.labels, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    lines: list[str] = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+# GitHub paths → endpoint templates, so label values stay few
+_ENDPOINT_PATTERNS: tuple[tuple[re.Pattern[str], str], ...] = tuple(
+    (re.compile(pattern), template)
+    for pattern, template in (
+        (r"^/repos/[^/]+/[^/]+", "/repos/{owner}/{repo}"),
+        (r"^/orgs/[^/]+", "/orgs/{org}"),
+        (r"^/users/[^/]+", "/users/{user}"),
+        (r"/git/(trees|blobs)/[^/]+$", r"/git/\1/{sha}"),
+        (r"/commits/[^/]+$", "/commits/{ref}"),
+        (r"/compare/.+$", "/compare/{basehead}"),
+        (r"/contents/.+$", "/contents/{path}"),
+        (r"/branches/.+/protection$", "/branches/{branch}/protection"),
+        (r"/tarball/.+$", "/tarball/{ref}"),
+    )
+)
+
+
+def endpoint_template(path: str) -> str:
+    """'/repos/pallets/flask/git/trees/abc' → '/repos/{owner}/{repo}/git/trees/{sha}'."""
+    for pattern, template in _ENDPOINT_PATTERNS:
+        path = pattern.sub(template, path, count=1)
+    return path
+
+
+GITHUB_REQUESTS = Counter(
+    "repocrunch_github_requests_total",
+    "GitHub API requests by endpoint template and HTTP status.",
+    ("method", "endpoint", "status"),
+)
+GITHUB_LATENCY = Histogram(
+    "repocrunch_github_request_duration_seconds",
+    "GitHub API response time by endpoint template.",
+    ("endpoint",),
+)
+CACHE_EVENTS = Counter(
+    "repocrunch_cache_events_total",
+    "GitHubClient cache hits, misses and evictions, for the etag and objects caches.",
+    ("cache", "event"),
+)
+RATE_REMAINING = Gauge(
+    "repocrunch_github_rate_remaining",
+    "Core GitHub API calls left across pooled tokens, as last reported.",
+)
+ANALYSES_IN_FLIGHT = Gauge(
+    "repocrunch_analyses_in_flight",
+    "analyze_repo calls currently running.",
+)
+ANALYSIS_LATENCY = Histogram(
+    "repocrunch_analysis_duration_seconds",
+    "End-to-end analyze_repo time, by outcome (ok, cached or error).",
+    ("outcome",),
+)
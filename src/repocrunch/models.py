@@ -80,3 +80,11 @@ class RepoAnalysis(BaseModel):
     health: Health = Field(default_factory=Health)
     security: Security = Field(default_factory=Security)
     warnings: list[str] = Field(default_factory=list)
+
+
+class BatchResult(BaseModel):
+    """One entry of a batch run: the analysis, or the error that stopped it."""
+
+    repo: str
+    analysis: RepoAnalysis | None = None
+    error: str | None = None
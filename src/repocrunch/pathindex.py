@@ -0,0 +1,279 @@
+"""Compact path index for repo trees, and a streaming parser for the trees API.
+
+A recursive tree response for a large repo is tens of MB of JSON, most of it
+per-entry ``mode``/``size``/``url`` fields nothing reads. TreeStreamParser
+decodes the response one entry at a time as it downloads and keeps only the
+path strings (plus the SHAs needed to fetch subtrees and root manifests), so
+neither the raw body nor the per-entry dicts are ever held in full.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from bisect import bisect_left
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+
+# Sorts after any character that appears in a path, to bound prefix ranges
+_MAX_CHAR = "\U0010ffff"
+
+
+def _prefix_range(items: list[str], prefix: str) -> tuple[int, int]:
+    return bisect_left(items, prefix), bisect_left(items, prefix + _MAX_CHAR)
+
+
+class PathIndex:
+    """Read-only set of a repo's file and directory paths.
+
+    ``blobs`` holds file paths, ``dirs`` maps directory paths to their tree
+    SHA (None when the source has no SHAs, e.g. a working copy), and
+    ``root_blobs`` maps root-level file names to blob SHAs. ``tail`` is the
+    last path in listing order, which is where a truncated listing stopped.
+
+    Exact lookups are set membership. Prefix queries binary-search sorted
+    lists built on first use; pattern matching over the whole tree lives in
+    rules.py.
+    """
+
+    __slots__ = (
+        "sha", "truncated", "blobs", "dirs", "root_blobs", "tail",
+        "_sorted_blobs", "_sorted_dirs",
+    )
+
+    def __init__(
+        self,
+        blobs: Iterable[str] = (),
+        dirs: Mapping[str, str | None] | Iterable[str] = (),
+        sha: str | None = None,
+        truncated: bool = False,
+        root_blobs: Mapping[str, str] | None = None,
+        tail: str | None = None,
+    ):
+        self.sha = sha
+        self.truncated = truncated
+        self.blobs: frozenset[str] = frozenset(blobs)
+        self.dirs: dict[str, str | None] = (
+            dict(dirs) if isinstance(dirs, Mapping) else dict.fromkeys(dirs)
+        )
+        self.root_blobs: dict[str, str] = dict(root_blobs or {})
+        self.tail = tail
+        self._sorted_blobs: list[str] | None = None
+        self._sorted_dirs: list[str] | None = None
+
+    @classmethod
+    def from_entries(
+        cls,
+        entries: Iterable[tuple[str, str, str | None]],
+        sha: str | None = None,
+        truncated: bool = False,
+    ) -> PathIndex:
+        """Build from (path, type, sha) tuples in listing order."""
+        builder = PathIndexBuilder()
+        for path, kind, entry_sha in entries:
+            builder.add(path, kind, entry_sha)
+        return builder.build(sha=sha, truncated=truncated)
+
+    @classmethod
+    def from_tree_data(cls, tree_data: dict[str, Any]) -> PathIndex:
+        """Build from an already-parsed trees API response."""
+        return cls.from_entries(
+            ((item["path"], item.get("type", ""), item.get("sha")) for item in tree_data.get("tree", [])),
+            sha=tree_data.get("sha"),
+            truncated=bool(tree_data.get("truncated")),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-serializable form, for the persistent object cache."""
+        return {
+            "sha": self.sha,
+            "truncated": self.truncated,
+            "blobs": sorted(self.blobs),
+            "dirs": self.dirs,
+            "root_blobs": self.root_blobs,
+            "tail": self.tail,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PathIndex:
+        return cls(
+            blobs=data["blobs"],
+            dirs=data["dirs"],
+            sha=data.get("sha"),
+            truncated=data.get("truncated", False),
+            root_blobs=data.get("root_blobs"),
+            tail=data.get("tail"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.blobs) + len(self.dirs)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self.blobs or path in self.dirs
+
+    def has_file_under(self, prefix: str) -> bool:
+        """Whether any file path starts with ``prefix``."""
+        if self._sorted_blobs is None:
+            self._sorted_blobs = sorted(self.blobs)
+        lo, hi = _prefix_range(self._sorted_blobs, prefix)
+        return lo < hi
+
+    def has_dir_under(self, prefix: str) -> bool:
+        """Whether any listed directory path starts with ``prefix``."""
+        if self._sorted_dirs is None:
+            self._sorted_dirs = sorted(self.dirs)
+        lo, hi = _prefix_range(self._sorted_dirs, prefix)
+        return lo < hi
+
+
+class PathIndexBuilder:
+    """Accumulates tree entries one at a time into a PathIndex."""
+
+    def __init__(self) -> None:
+        self.blobs: set[str] = set()
+        self.dirs: dict[str, str | None] = {}
+        self.root_blobs: dict[str, str] = {}
+        self.tail: str | None = None
+
+    @classmethod
+    def from_index(cls, index: PathIndex) -> PathIndexBuilder:
+        builder = cls()
+        builder.blobs.update(index.blobs)
+        builder.dirs.update(index.dirs)
+        builder.root_blobs.update(index.root_blobs)
+        builder.tail = index.tail
+        return builder
+
+    def add(self, path: str, kind: str, sha: str | None = None) -> None:
+        if kind == "tree":
+            self.dirs[path] = sha
+        elif kind == "blob":
+            self.blobs.add(path)
+            if sha and "/" not in path:
+                self.root_blobs[path] = sha
+        # Submodules ("commit" entries) are neither files nor directories here
+        self.tail = path
+
+    def remove(self, path: str) -> None:
+        """Drop a file (directories are left for the caller to prune)."""
+        self.blobs.discard(path)
+        self.root_blobs.pop(path, None)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self.blobs or path in self.dirs
+
+    def build(self, sha: str | None = None, truncated: bool = False) -> PathIndex:
+        return PathIndex(
+            self.blobs, self.dirs, sha=sha, truncated=truncated,
+            root_blobs=self.root_blobs, tail=self.tail,
+        )
+
+
+# Parser states
+_START, _KEY, _COLON, _VALUE, _ENTRIES, _DONE = range(6)
+_WHITESPACE = " \t\n\r"
+
+
+class TreeStreamParser:
+    """Incremental parser for a trees API response: feed() bytes, then close().
+
+    Top-level scalars (``sha``, ``truncated``) are decoded normally; the
+    ``tree`` array is decoded one entry at a time and each entry goes
+    straight into a PathIndexBuilder.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._state = _START
+        self._key: str | None = None
+        self._meta: dict[str, Any] = {}
+        self._builder = PathIndexBuilder()
+
+    def feed(self, data: bytes) -> None:
+        self._buffer += self._decoder.decode(data)
+        self._parse(final=False)
+
+    def close(self) -> PathIndex:
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._parse(final=True)
+        if self._state != _DONE:
+            raise ValueError("Incomplete git tree response")
+        return self._builder.build(
+            sha=self._meta.get("sha"), truncated=bool(self._meta.get("truncated"))
+        )
+
+    def _decode(self, pos: int, final: bool) -> tuple[Any, int] | None:
+        """Decode one JSON value at ``pos``, or None if it isn't all here yet."""
+        try:
+            value, end = self._json.raw_decode(self._buffer, pos)
+        except json.JSONDecodeError as e:
+            if final:
+                raise ValueError(f"Malformed git tree response: {e}") from None
+            return None
+        # A number at the very end of the buffer may continue in the next chunk
+        if end == len(self._buffer) and not final and not isinstance(value, (str, dict, list)):
+            return None
+        return value, end
+
+    def _parse(self, final: bool) -> None:
+        buf = self._buffer
+        pos = 0
+        try:
+            while self._state != _DONE:
+                while pos < len(buf) and buf[pos] in _WHITESPACE:
+                    pos += 1
+                if pos == len(buf):
+                    return
+                ch = buf[pos]
+                if self._state == _START:
+                    if ch != "{":
+                        raise ValueError("Git tree response is not a JSON object")
+                    self._state = _KEY
+                    pos += 1
+                elif self._state == _KEY:
+                    if ch == ",":
+                        pos += 1
+                    elif ch == "}":
+                        self._state = _DONE
+                        pos += 1
+                    else:
+                        decoded = self._decode(pos, final)
+                        if decoded is None:
+                            return
+                        self._key, pos = decoded
+                        self._state = _COLON
+                elif self._state == _COLON:
+                    if ch != ":":
+                        raise ValueError("Malformed git tree response")
+                    self._state = _VALUE
+                    pos += 1
+                elif self._state == _VALUE:
+                    if self._key == "tree" and ch == "[":
+                        self._state = _ENTRIES
+                        pos += 1
+                        continue
+                    decoded = self._decode(pos, final)
+                    if decoded is None:
+                        return
+                    value, pos = decoded
+                    if self._key in ("sha", "truncated"):
+                        self._meta[self._key] = value
+                    self._state = _KEY
+                elif self._state == _ENTRIES:
+                    if ch == ",":
+                        pos += 1
+                    elif ch == "]":
+                        self._state = _KEY
+                        pos += 1
+                    else:
+                        decoded = self._decode(pos, final)
+                        if decoded is None:
+                            return
+                        item, pos = decoded
+                        self._builder.add(item["path"], item.get("type", ""), item.get("sha"))
+        finally:
+            # Keep only the unconsumed tail (at most one partial entry)
+            self._buffer = buf[pos:]
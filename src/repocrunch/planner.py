@@ -0,0 +1,123 @@
+"""Plan the GitHub calls an analysis needs for the fields asked for.
+
+Every analysis fetches the repo metadata (it confirms the repo exists and
+carries the primary language and default branch). Everything else is only
+fetched when a requested field depends on it: ``summary`` needs just the
+languages call, ``security.branch_protection`` just the protection call.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+# Data sources, beyond the repo metadata call every analysis makes
+LANGUAGES = "languages"
+TREE = "tree"
+MANIFESTS = "manifests"  # root manifest contents; implies the tree
+COMMITS = "commits"
+CONTRIBUTORS = "contributors"
+BRANCH_PROTECTION = "branch_protection"
+
+SECTIONS: tuple[str, ...] = ("summary", "tech_stack", "architecture", "health", "security")
+
+# Top-level RepoAnalysis fields that come with every analysis
+TOP_LEVEL_FIELDS: tuple[str, ...] = ("schema_version", "repo", "url", "analyzed_at", "warnings")
+
+_DEPS = frozenset({TREE, MANIFESTS})
+
+# "section.field" → data sources it needs
+FIELD_NEEDS: dict[str, frozenset[str]] = {
+    "summary.stars": frozenset(),
+    "summary.forks": frozenset(),
+    "summary.watchers": frozenset(),
+    "summary.last_commit": frozenset(),
+    "summary.age_days": frozenset(),
+    "summary.license": frozenset(),
+    "summary.primary_language": frozenset(),
+    "summary.languages": frozenset({LANGUAGES}),
+    "tech_stack.runtime": frozenset(),
+    "tech_stack.framework": _DEPS,
+    "tech_stack.package_manager": _DEPS,
+    "tech_stack.dependencies": _DEPS,
+    "tech_stack.key_deps": _DEPS,
+    "architecture.monorepo": frozenset({TREE}),
+    "architecture.docker": frozenset({TREE}),
+    "architecture.ci_cd": frozenset({TREE}),
+    # Dependencies name the test framework before config files do
+    "architecture.test_framework": _DEPS,
+    "architecture.has_tests": frozenset({TREE}),
+    "health.open_issues": frozenset(),
+    "health.open_prs": frozenset(),
+    "health.contributors": frozenset({CONTRIBUTORS}),
+    "health.commit_frequency": frozenset({COMMITS}),
+    "health.maintenance_status": frozenset({COMMITS}),
+    "security.has_env_file": frozenset({TREE}),
+    "security.dependabot_enabled": frozenset({TREE}),
+    "security.branch_protection": frozenset({BRANCH_PROTECTION}),
+    "security.security_policy": frozenset({TREE}),
+}
+
+
+def _section_needs(section: str) -> frozenset[str]:
+    return frozenset().union(
+        *(needs for field, needs in FIELD_NEEDS.items() if field.startswith(f"{section}."))
+    )
+
+
+@dataclass(frozen=True)
+class AnalysisPlan:
+    """Which sections to run and which calls to make. ``fields`` None means everything."""
+
+    fields: tuple[str, ...] | None
+    sections: frozenset[str]
+    needs: frozenset[str]
+
+    def wants(self, source: str) -> bool:
+        return source in self.needs
+
+    def select(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Trim a dumped RepoAnalysis down to the requested fields."""
+        if self.fields is None:
+            return data
+        selected: dict[str, Any] = {}
+        for field in self.fields:
+            section, _, name = field.partition(".")
+            if not name or section in self.fields:
+                selected[section] = data[section]
+            else:
+                selected.setdefault(section, {})[name] = data[section][name]
+        return selected
+
+
+def plan_analysis(fields: Iterable[str] | None = None) -> AnalysisPlan:
+    """Plan an analysis for ``fields``: section names, 'section.field' names, or
+    top-level fields like 'repo'. None (or empty) plans the full analysis.
+
+    Raises ValueError for an unknown field.
+    """
+    requested = tuple(dict.fromkeys(f.strip() for f in fields or () if f.strip()))
+    if not requested:
+        return AnalysisPlan(None, frozenset(SECTIONS), frozenset().union(*FIELD_NEEDS.values()))
+
+    sections: set[str] = set()
+    needs: set[str] = set()
+    for field in requested:
+        if field in SECTIONS:
+            sections.add(field)
+            needs |= _section_needs(field)
+        elif field in FIELD_NEEDS:
+            sections.add(field.partition(".")[0])
+            needs |= FIELD_NEEDS[field]
+        elif field not in TOP_LEVEL_FIELDS:
+            available = ", ".join((*TOP_LEVEL_FIELDS, *SECTIONS))
+            raise ValueError(
+                f"Unknown field: {field}. Available: {available}, or 'section.field'"
+            )
+    if "architecture" in sections and MANIFESTS in needs:
+        sections.add("tech_stack")  # its dependencies feed test framework detection
+    return AnalysisPlan(requested, frozenset(sections), frozenset(needs))
+
+
+FULL_PLAN = plan_analysis()
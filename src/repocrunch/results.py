@@ -0,0 +1,145 @@
+"""Cache of finished analyses, keyed by repo and default-branch HEAD SHA.
+
+A repo whose HEAD hasn't moved analyzes to the same result, so a hit costs
+one conditional HEAD lookup (usually a free 304) instead of a full analysis.
+Entries live in an in-memory LRU backed by the persistent object cache, and
+the schema version is part of the key so a release that changes the output
+never serves old results.
+
+Stored analyses age: ``summary.age_days`` and ``health.maintenance_status``
+depend on the current date, so both are recomputed on every hit.
+
+Each repo also has a pointer to its most recent analysis and when that was
+last confirmed to match HEAD. ``latest()`` reads it with no network call at
+all, for callers that accept slightly stale results. Since that skips any
+access check, it only ever returns analyses of public repos.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+from repocrunch.cache import ResponseCache, cache_from_env
+from repocrunch.extractors.health import _classify_maintenance
+from repocrunch.extractors.metadata import age_in_days
+from repocrunch.models import SCHEMA_VERSION, MaintenanceStatus, RepoAnalysis
+
+DEFAULT_MAX_ENTRIES = 512
+
+
+class ResultCache:
+    """Two-tier cache of RepoAnalysis results: memory LRU, then ``store``."""
+
+    def __init__(
+        self,
+        store: ResponseCache | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.store = store
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> ResultCache:
+        """Memory-only, or persistent too when REPOCRUNCH_CACHE names a file."""
+        return cls(cache_from_env())
+
+    @staticmethod
+    def key(owner: str, repo: str, sha: str | None = None) -> str:
+        """Key of the analysis at ``sha``, or of the repo's latest pointer."""
+        # GitHub owner and repo names are case-insensitive
+        key = f"analysis:{SCHEMA_VERSION}:{owner.lower()}/{repo.lower()}"
+        return f"{key}@{sha}" if sha else key
+
+    def _remember(self, key: str, entry: dict[str, Any]) -> None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        elif len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+        self._entries[key] = entry
+
+    def _lookup(self, key: str) -> dict[str, Any] | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        elif self.store is not None:
+            entry = self.store.get_object(key)
+            if entry is not None:
+                self._remember(key, entry)
+        return entry
+
+    def _store(self, key: str, entry: dict[str, Any]) -> None:
+        self._remember(key, entry)
+        if self.store is not None:
+            self.store.set_object(key, entry)
+
+    def _confirm(self, owner: str, repo: str, sha: str) -> None:
+        """Record that the analysis at ``sha`` is current as of now."""
+        self._store(self.key(owner, repo), {"sha": sha, "checked_at": time.time()})
+
+    def get(self, owner: str, repo: str, sha: str) -> RepoAnalysis | None:
+        """The stored analysis of ``owner/repo`` at ``sha``, with its
+        time-dependent fields brought up to date, or None on a miss.
+
+        A hit means ``sha`` is the current HEAD, so it also refreshes the
+        repo's latest pointer.
+        """
+        entry = self._lookup(self.key(owner, repo, sha))
+        if entry is None:
+            return None
+        self._confirm(owner, repo, sha)
+        return _refresh(entry)
+
+    def latest(self, owner: str, repo: str) -> tuple[RepoAnalysis, float] | None:
+        """The most recent analysis of ``owner/repo`` at any commit, and the
+        seconds since it was last confirmed to match HEAD.
+
+        None for private repos (and entries not known to be public): the
+        caller's credentials are never checked here, so serving those could
+        hand one caller's private data to another.
+        """
+        pointer = self._lookup(self.key(owner, repo))
+        if pointer is None:
+            return None
+        entry = self._lookup(self.key(owner, repo, pointer["sha"]))
+        if entry is None or entry.get("private", True):
+            return None
+        return _refresh(entry), max(time.time() - pointer["checked_at"], 0.0)
+
+    def set(
+        self,
+        owner: str,
+        repo: str,
+        sha: str,
+        analysis: RepoAnalysis,
+        repo_data: dict[str, Any],
+    ) -> None:
+        """Store a full analysis of ``owner/repo`` at ``sha``.
+
+        ``repo_data`` supplies the creation timestamp that ``age_days`` is
+        recomputed from, and whether the repo is private.
+        """
+        entry = {
+            "analysis": analysis.model_dump(mode="json"),
+            "created_at": repo_data.get("created_at"),
+            "private": repo_data.get("private") is not False,
+        }
+        self._store(self.key(owner, repo, sha), entry)
+        self._confirm(owner, repo, sha)
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+
+
+def _refresh(entry: dict[str, Any]) -> RepoAnalysis:
+    analysis = RepoAnalysis.model_validate(entry["analysis"])
+    analysis.summary.age_days = age_in_days(entry.get("created_at"))
+    health = analysis.health
+    archived = health.maintenance_status == MaintenanceStatus.archived
+    health.maintenance_status = _classify_maintenance(
+        health.commit_frequency, archived, analysis.summary.last_commit
+    )
+    return analysis
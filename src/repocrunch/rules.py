@@ -0,0 +1,105 @@
+"""Compiled path rules: every tree-based signal from one pass over the files.
+
+Rules are data (see ``TREE_RULES`` in detection.py). RuleSet compiles all
+patterns into three regex alternations, anchored at the start, at the end
+and on a directory name, that reject non-matching paths in C. The few paths
+that get through are resolved to their signals with hash tables keyed by
+exact path, by prefix and suffix length, and by directory name. Adding a
+rule adds an alternative, not another scan.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Mapping
+
+from repocrunch.detection import TREE_RULES
+from repocrunch.pathindex import PathIndex
+
+
+def _alternation(alternatives: Iterable[str], template: str = "(?:{})") -> re.Pattern[str] | None:
+    """Compile regex alternatives (longest first), or None if there are none."""
+    alternatives = sorted(set(alternatives), key=len, reverse=True)
+    if not alternatives:
+        return None
+    return re.compile(template.format("|".join(alternatives)))
+
+
+class RuleSet:
+    """Signal → path patterns, compiled for single-pass matching."""
+
+    def __init__(self, rules: Mapping[str, Iterable[str]]):
+        self._exact: dict[str, list[str]] = {}
+        self._prefixes: dict[int, dict[str, list[str]]] = {}
+        self._suffixes: dict[int, dict[str, list[str]]] = {}
+        self._dir_names: dict[str, list[str]] = {}
+        for signal, patterns in rules.items():
+            for pattern in patterns:
+                self._add(signal, pattern)
+
+        # Exact paths and prefixes both anchor at the start
+        self._head = _alternation([
+            *(re.escape(path) + r"\Z" for path in self._exact),
+            *(re.escape(key) for table in self._prefixes.values() for key in table),
+        ])
+        # Suffixes are matched as prefixes of the reversed path
+        self._tail = _alternation(
+            re.escape(key[::-1]) for table in self._suffixes.values() for key in table
+        )
+        self._dir = _alternation(map(re.escape, self._dir_names), "/(?:{})/")
+        self._prefix_tables = sorted(self._prefixes.items())
+        self._suffix_tables = sorted(self._suffixes.items())
+
+    def _add(self, signal: str, pattern: str) -> None:
+        if pattern.startswith("*/") and pattern.endswith("/*") and len(pattern) > 4:
+            key = pattern[2:-2]
+            table = self._dir_names
+        elif pattern.startswith("*"):
+            key = pattern[1:]
+            table = self._suffixes.setdefault(len(key), {})
+        elif pattern.endswith("*"):
+            key = pattern[:-1]
+            table = self._prefixes.setdefault(len(key), {})
+        else:
+            key = pattern
+            table = self._exact
+        if not key or "*" in key:
+            raise ValueError(f"Unsupported path pattern: {pattern!r}")
+        table.setdefault(key, []).append(signal)
+
+    def _signals_for(self, path: str) -> set[str]:
+        hits = set(self._exact.get(path, ()))
+        for length, table in self._prefix_tables:
+            hits.update(table.get(path[:length], ()))
+        for length, table in self._suffix_tables:
+            hits.update(table.get(path[-length:], ()))
+        if self._dir is not None:
+            for part in path.split("/")[1:-1]:
+                hits.update(self._dir_names.get(part, ()))
+        return hits
+
+    def match(self, paths: Iterable[str]) -> dict[str, int]:
+        """Count the paths matching each signal. Signals with no match are absent."""
+        head = self._head.match if self._head else None
+        tail = self._tail.match if self._tail else None
+        in_dir = self._dir.search if self._dir else None
+        counts: dict[str, int] = {}
+        for path in paths:
+            if not (
+                (head and head(path))
+                or (tail and tail(path[::-1]))
+                or (in_dir and in_dir(path))
+            ):
+                continue
+            # A path counts once per signal, however many of its patterns match
+            for signal in self._signals_for(path):
+                counts[signal] = counts.get(signal, 0) + 1
+        return counts
+
+
+_TREE_RULES = RuleSet(TREE_RULES)
+
+
+def tree_signals(tree: PathIndex) -> dict[str, int]:
+    """Match every rule in ``TREE_RULES`` against the tree's files in one pass."""
+    return _TREE_RULES.match(tree.blobs)
@@ -0,0 +1,126 @@
+"""Rate-limit-aware request scheduling: pacing, pause/resume and ETA."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections.abc import Awaitable, Callable
+
+from repocrunch.tokens import TokenPool
+
+logger = logging.getLogger(__name__)
+
+# Core REST calls per analysis: repo, languages, tree, commits, contributors,
+# branch protection and ~2 manifest reads
+CALLS_PER_REPO = 8
+# GraphQL covers everything but the tree, contributors and oversized manifests
+CALLS_PER_REPO_GRAPHQL = 2
+RESET_WINDOW = 3600  # seconds; GitHub's primary rate limit window
+DEFAULT_BACKOFF = 60  # seconds to wait on a secondary limit without Retry-After
+RESET_MARGIN = 1  # seconds past X-RateLimit-Reset before resuming
+# With no plan to size against, pace only once this fraction of the limit is left
+UNPLANNED_PACE_BELOW = 0.1
+
+
+class RateLimitScheduler:
+    """Waits out rate limits instead of failing, and paces requests across the window.
+
+    Opt in by passing ``scheduler=RateLimitScheduler()`` to GitHubClient.
+    """
+
+    def __init__(
+        self,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._sleep = sleep
+        self._clock = clock
+        self._next_slot = 0.0
+        self.started_at = clock()
+        self.planned_calls = 0
+        self.completed_calls = 0
+        self.paused_until: float | None = None
+
+    def plan(self, repos: int, graphql: bool = False) -> int:
+        """Add a batch of repos to the plan. Returns the predicted number of calls."""
+        calls = repos * (CALLS_PER_REPO_GRAPHQL if graphql else CALLS_PER_REPO)
+        self.planned_calls += calls
+        return calls
+
+    def record(self) -> None:
+        self.completed_calls += 1
+
+    @property
+    def outstanding_calls(self) -> int:
+        return max(self.planned_calls - self.completed_calls, 0)
+
+    def _interval(self, pool: TokenPool) -> float:
+        """Seconds between requests that spread the remaining budget to the reset."""
+        remaining, reset_at = pool.remaining, pool.reset_at
+        if remaining is None or reset_at is None:
+            return 0.0
+        if self.planned_calls:
+            if self.outstanding_calls <= remaining:
+                return 0.0  # the whole plan fits in the budget; no need to slow down
+        elif pool.limit and remaining > pool.limit * UNPLANNED_PACE_BELOW:
+            return 0.0  # unknown workload; run at full speed until the budget runs low
+        window = reset_at - self._clock()
+        if window <= 0:
+            return 0.0
+        return window / max(remaining, 1)
+
+    async def before_request(self, pool: TokenPool) -> None:
+        """Delay the next request to its paced slot."""
+        interval = self._interval(pool)
+        if interval <= 0:
+            return
+        now = self._clock()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + interval
+        if slot > now:
+            await self._sleep(slot - now)
+
+    async def wait_for_reset(self, reset_at: int | None) -> None:
+        """Pause until the rate limit resets, then resume."""
+        now = self._clock()
+        resume = (reset_at + RESET_MARGIN) if reset_at else now + DEFAULT_BACKOFF
+        self.paused_until = max(resume, now)
+        logger.info("Rate limit exhausted; pausing for %.0fs", self.paused_until - now)
+        try:
+            await self._sleep(self.paused_until - now)
+        finally:
+            self.paused_until = None
+            self._next_slot = 0.0
+
+    async def backoff(self, retry_after: float | None) -> None:
+        """Wait out a secondary rate limit."""
+        delay = retry_after if retry_after is not None else DEFAULT_BACKOFF
+        logger.info("Secondary rate limit hit; backing off for %.0fs", delay)
+        self.paused_until = self._clock() + delay
+        try:
+            await self._sleep(delay)
+        finally:
+            self.paused_until = None
+
+    def eta(self, pool: TokenPool) -> float | None:
+        """Estimated seconds until the planned calls finish, or None before any progress."""
+        outstanding = self.outstanding_calls
+        if outstanding == 0:
+            return 0.0
+        now = self._clock()
+        elapsed = now - self.started_at
+        if not self.completed_calls or elapsed <= 0:
+            return None
+        estimate = outstanding / (self.completed_calls / elapsed)
+
+        # Calls beyond the current budget have to wait for reset windows
+        remaining = pool.remaining
+        limit = pool.limit
+        if remaining is not None and limit and outstanding > remaining:
+            windows = math.ceil((outstanding - remaining) / limit)
+            reset_at = pool.reset_at or now + RESET_WINDOW
+            budget_bound = max(reset_at - now, 0) + (windows - 1) * RESET_WINDOW
+            estimate = max(estimate, budget_bound)
+        return estimate
@@ -0,0 +1,191 @@
+"""Single-pass streaming reader for GitHub repo tarballs.
+
+Walks the gzip'd tar stream as it downloads, recording every path and keeping
+only the contents of the files asked for. Nothing is written to disk and
+memory stays bounded by the wanted files plus one network chunk.
+"""
+
+from __future__ import annotations
+
+import zlib
+from collections.abc import AsyncIterable, Callable
+from dataclasses import dataclass, field
+
+from repocrunch.pathindex import PathIndex
+
+BLOCK = 512
+MAX_FILE_BYTES = 1024 * 1024  # wanted files larger than this are skipped
+
+# tar typeflags
+_REGULAR = (b"0", b"\0", b"7")
+_SYMLINK = b"2"
+_DIRECTORY = b"5"
+_PAX_HEADER = b"x"
+_PAX_GLOBAL = b"g"
+_GNU_LONGNAME = b"L"
+
+
+@dataclass
+class TarballContents:
+    commit_sha: str | None = None
+    paths: list[tuple[str, str]] = field(default_factory=list)  # (path, "blob" | "tree")
+    files: dict[str, str] = field(default_factory=dict)
+    skipped: set[str] = field(default_factory=set)  # wanted, but over MAX_FILE_BYTES
+
+    def to_index(self) -> PathIndex:
+        """Index the paths like a recursive git tree response."""
+        return PathIndex.from_entries(
+            ((path, kind, None) for path, kind in self.paths), sha=self.commit_sha
+        )
+
+
+def _parse_octal(raw: bytes) -> int:
+    raw = raw.strip(b"\0 ")
+    return int(raw, 8) if raw else 0
+
+
+def _parse_pax(data: bytes) -> dict[str, str]:
+    """Parse 'LEN key=value\\n' records."""
+    records: dict[str, str] = {}
+    pos = 0
+    while pos < len(data):
+        space = data.find(b" ", pos)
+        if space == -1:
+            break
+        length = int(data[pos:space])
+        key, _, value = data[space + 1 : pos + length - 1].partition(b"=")
+        records[key.decode("utf-8", "replace")] = value.decode("utf-8", "replace")
+        pos += length
+    return records
+
+
+class TarStreamParser:
+    """Incremental tar parser: feed() decompressed bytes, read results at the end."""
+
+    def __init__(self, wanted: Callable[[str], bool]):
+        self.wanted = wanted
+        self.result = TarballContents()
+        self._buffer = bytearray()
+        self._done = False
+        # Current entry being consumed
+        self._remaining = 0
+        self._padding = 0
+        self._capture: bytearray | None = None
+        self._entry: tuple[bytes, str] | None = None  # (typeflag, path)
+        # Overrides carried from pax / GNU headers to the next entry
+        self._next_path: str | None = None
+
+    def feed(self, data: bytes) -> None:
+        self._buffer += data
+        while not self._done:
+            if self._remaining or self._padding:
+                if not self._consume_data():
+                    return
+            elif len(self._buffer) >= BLOCK:
+                header = bytes(self._buffer[:BLOCK])
+                del self._buffer[:BLOCK]
+                self._start_entry(header)
+            else:
+                return
+
+    def _consume_data(self) -> bool:
+        if self._remaining:
+            take = min(self._remaining, len(self._buffer))
+            if take == 0:
+                return False
+            if self._capture is not None:
+                self._capture += self._buffer[:take]
+            del self._buffer[:take]
+            self._remaining -= take
+            if self._remaining:
+                return False
+            self._finish_entry()
+        if self._padding:
+            take = min(self._padding, len(self._buffer))
+            del self._buffer[:take]
+            self._padding -= take
+            if self._padding:
+                return False
+        return True
+
+    def _start_entry(self, header: bytes) -> None:
+        if header == b"\0" * BLOCK:
+            self._done = True
+            return
+        name = header[0:100].split(b"\0", 1)[0].decode("utf-8", "replace")
+        if header[257:262] == b"ustar":
+            prefix = header[345:500].split(b"\0", 1)[0].decode("utf-8", "replace")
+            if prefix:
+                name = f"{prefix}/{name}"
+        typeflag = header[156:157]
+        size = _parse_octal(header[124:136])
+
+        path = self._next_path or name
+        if typeflag not in (_PAX_HEADER, _PAX_GLOBAL, _GNU_LONGNAME):
+            self._next_path = None
+
+        self._entry = (typeflag, path)
+        self._remaining = size
+        self._padding = (-size) % BLOCK
+        self._capture = None
+        if typeflag in (_PAX_HEADER, _PAX_GLOBAL, _GNU_LONGNAME):
+            self._capture = bytearray()
+        elif typeflag in _REGULAR:
+            rel = _strip_root(path)
+            if rel and self.wanted(rel):
+                if size <= MAX_FILE_BYTES:
+                    self._capture = bytearray()
+                else:
+                    self.result.skipped.add(rel)
+        if size == 0:
+            self._finish_entry()
+
+    def _finish_entry(self) -> None:
+        assert self._entry is not None
+        typeflag, path = self._entry
+        captured = self._capture is not None
+        data = bytes(self._capture) if captured else b""
+        self._capture = None
+        self._entry = None
+
+        if typeflag == _PAX_GLOBAL:
+            # GitHub puts the commit SHA in the global header's comment
+            self.result.commit_sha = _parse_pax(data).get("comment") or self.result.commit_sha
+            return
+        if typeflag == _PAX_HEADER:
+            self._next_path = _parse_pax(data).get("path", self._next_path)
+            return
+        if typeflag == _GNU_LONGNAME:
+            self._next_path = data.split(b"\0", 1)[0].decode("utf-8", "replace")
+            return
+
+        rel = _strip_root(path)
+        if not rel:
+            return
+        if typeflag == _DIRECTORY:
+            self.result.paths.append((rel.rstrip("/"), "tree"))
+        elif typeflag == _SYMLINK:
+            self.result.paths.append((rel, "blob"))  # the tree API lists symlinks as blobs
+        elif typeflag in _REGULAR:
+            self.result.paths.append((rel, "blob"))
+            if captured:
+                self.result.files[rel] = data.decode("utf-8", errors="replace")
+
+
+def _strip_root(path: str) -> str:
+    """Drop GitHub's 'owner-repo-sha/' top-level directory."""
+    _, _, rel = path.partition("/")
+    return rel
+
+
+async def read_tarball(
+    chunks: AsyncIterable[bytes],
+    wanted: Callable[[str], bool],
+) -> TarballContents:
+    """Decompress and parse a .tar.gz byte stream in one pass."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    parser = TarStreamParser(wanted)
+    async for chunk in chunks:
+        parser.feed(decompressor.decompress(chunk))
+    parser.feed(decompressor.flush())
+    return parser.result
@@ -0,0 +1,114 @@
+"""Pool of GitHub tokens with per-token rate budgets."""
+
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+
+class RateLimitError(Exception):
+    def __init__(self, reset_at: int | None = None):
+        self.reset_at = reset_at
+        super().__init__("GitHub API rate limit exhausted")
+
+
+@dataclass
+class TokenBudget:
+    """Last-known core rate-limit state for one token (None = anonymous)."""
+
+    token: str | None
+    remaining: int | None = None
+    limit: int | None = None
+    reset_at: int | None = None
+
+    def reset_passed(self, now: float) -> bool:
+        return self.reset_at is not None and now >= self.reset_at
+
+    def available(self, now: float) -> bool:
+        return self.remaining is None or self.remaining > 0 or self.reset_passed(now)
+
+    def headroom(self, now: float) -> int:
+        """Calls this token can still make. Unknown budgets sort first so they get probed."""
+        if self.remaining is None or self.reset_passed(now):
+            return self.limit or 1_000_000
+        return self.remaining
+
+
+class TokenPool:
+    """Routes each request to the token with the most rate budget left."""
+
+    def __init__(self, tokens: Iterable[str | None]):
+        unique = list(dict.fromkeys(tokens))
+        self.budgets = [TokenBudget(t) for t in unique] or [TokenBudget(None)]
+
+    @classmethod
+    def from_env(cls, token: str | None = None) -> TokenPool:
+        """Build a pool from an explicit token, GITHUB_TOKENS, GITHUB_TOKENS_FILE or GITHUB_TOKEN."""
+        if token:
+            return cls([token])
+        raw = os.environ.get("GITHUB_TOKENS", "")
+        tokens = [t for t in raw.replace(",", " ").split() if t]
+        tokens_file = os.environ.get("GITHUB_TOKENS_FILE")
+        if tokens_file:
+            tokens.extend(read_tokens_file(tokens_file))
+        if not tokens and os.environ.get("GITHUB_TOKEN"):
+            tokens.append(os.environ["GITHUB_TOKEN"])
+        return cls(tokens or [None])
+
+    @property
+    def tokens(self) -> list[str | None]:
+        return [b.token for b in self.budgets]
+
+    @property
+    def remaining(self) -> int | None:
+        known = [b.remaining for b in self.budgets if b.remaining is not None]
+        return sum(known) if known else None
+
+    @property
+    def limit(self) -> int | None:
+        known = [b.limit for b in self.budgets if b.limit is not None]
+        return sum(known) if known else None
+
+    @property
+    def reset_at(self) -> int | None:
+        """Earliest time an exhausted token gets its budget back."""
+        resets = [b.reset_at for b in self.budgets if b.reset_at is not None]
+        return min(resets) if resets else None
+
+    def acquire(self, exclude: Iterable[TokenBudget] = ()) -> TokenBudget:
+        """Pick the token with the most headroom. Raises RateLimitError if all are spent."""
+        now = time.time()
+        skip = {id(b) for b in exclude}
+        candidates = [b for b in self.budgets if id(b) not in skip and b.available(now)]
+        if not candidates:
+            raise RateLimitError(self.reset_at)
+        budget = max(candidates, key=lambda b: b.headroom(now))
+        if budget.reset_passed(now):
+            budget.remaining = budget.reset_at = None
+        # Reserve a call so concurrent requests spread out before headers come back
+        if budget.remaining is not None:
+            budget.remaining -= 1
+        return budget
+
+    def update(self, budget: TokenBudget, headers: Mapping[str, str]) -> None:
+        # GraphQL and search have their own budgets; only track the core REST one
+        if headers.get("X-RateLimit-Resource", "core") != "core":
+            return
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            budget.remaining = int(remaining)
+        limit = headers.get("X-RateLimit-Limit")
+        if limit is not None:
+            budget.limit = int(limit)
+        reset = headers.get("X-RateLimit-Reset")
+        if reset is not None:
+            budget.reset_at = int(reset)
+
+
+def read_tokens_file(path: str | os.PathLike[str]) -> list[str]:
+    """Read one token per line, skipping blanks and # comments."""
+    lines = Path(path).expanduser().read_text().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
@@ -0,0 +1,148 @@
+"""Complete recursive git trees that GitHub truncated.
+
+For very large repos the recursive tree endpoint stops after ~100k entries
+and sets ``truncated: true``. Git lists trees depth-first with each
+directory's entries sorted, so the only directories that can be missing
+children are the root and the directories enclosing the last listed entry.
+Those are re-listed one level at a time. Any subtree found missing is then
+fetched recursively, which is one call unless it is itself truncated.
+Fetches run concurrently in bounded waves, with the directories detection
+cares about most going first, and stop at a fixed budget.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+from dataclasses import dataclass
+
+from repocrunch.client import GitHubClient
+from repocrunch.pathindex import PathIndex, PathIndexBuilder
+
+SUBTREE_CONCURRENCY = 8
+MAX_SUBTREE_FETCHES = 100
+
+# Directories whose contents drive detection (CI, containers, security
+# policy, tests, monorepo layout); fetched before anything else.
+PRIORITY_DIRS: frozenset[str] = frozenset({
+    ".github",
+    ".circleci",
+    ".gitlab",
+    "docker",
+    "deploy",
+    "k8s",
+    "helm",
+    "test",
+    "tests",
+    "spec",
+    "__tests__",
+    "packages",
+    "apps",
+    "services",
+    "libs",
+    "src",
+})
+
+
+@dataclass
+class TreeCompletion:
+    index: PathIndex
+    fetches: int = 0
+    skipped: int = 0  # directories left unfetched (budget or errors)
+
+    @property
+    def complete(self) -> bool:
+        return not self.skipped
+
+
+def _priority(path: str) -> tuple[int, int, str]:
+    """Root first, then detection-relevant directories, then shallowest first."""
+    if not path:
+        return (-1, 0, "")
+    name = path.rsplit("/", 1)[-1]
+    return (0 if name in PRIORITY_DIRS else 1, path.count("/"), path)
+
+
+def _open_dirs(listing: PathIndex) -> list[str]:
+    """Directories (relative to the listing) that may be missing children."""
+    if listing.tail is None:
+        return [""]
+    parts = listing.tail.split("/")
+    dirs = [""] + ["/".join(parts[:i]) for i in range(1, len(parts))]
+    if listing.tail in listing.dirs:
+        dirs.append(listing.tail)
+    return dirs
+
+
+async def complete_tree(
+    client: GitHubClient,
+    owner: str,
+    repo: str,
+    index: PathIndex,
+    concurrency: int = SUBTREE_CONCURRENCY,
+    max_fetches: int = MAX_SUBTREE_FETCHES,
+) -> TreeCompletion:
+    """Fill in a truncated recursive tree. Returns it unchanged if not truncated."""
+    if not index.truncated:
+        return TreeCompletion(index)
+
+    builder = PathIndexBuilder.from_index(index)
+    # Jobs are (priority, path, sha, recursive); "" is the root tree
+    jobs: list[tuple[tuple[int, int, str], str, str, bool]] = []
+
+    def queue_open_dirs(listing: PathIndex, prefix: str) -> None:
+        if not listing.truncated:
+            return
+        for rel in _open_dirs(listing):
+            sha = listing.dirs.get(rel) if rel else listing.sha
+            if sha:
+                path = prefix + rel if rel else prefix.rstrip("/")
+                heapq.heappush(jobs, (_priority(path), path, sha, False))
+
+    def add_listing(listing: PathIndex, prefix: str) -> None:
+        for path in listing.blobs:
+            builder.add(prefix + path, "blob")
+        for path, sha in listing.dirs.items():
+            builder.add(prefix + path, "tree", sha)
+        queue_open_dirs(listing, prefix)
+
+    def add_children(listing: PathIndex, prefix: str) -> None:
+        for path in listing.blobs:
+            if prefix + path not in builder:
+                builder.add(prefix + path, "blob", listing.root_blobs.get(path) if not prefix else None)
+        for path, sha in listing.dirs.items():
+            if prefix + path in builder:
+                continue
+            builder.add(prefix + path, "tree", sha)
+            if sha:
+                heapq.heappush(jobs, (_priority(prefix + path), prefix + path, sha, True))
+
+    queue_open_dirs(index, "")
+    result = TreeCompletion(index)
+
+    while jobs and result.fetches < max_fetches:
+        wave = [
+            heapq.heappop(jobs)
+            for _ in range(min(concurrency, len(jobs), max_fetches - result.fetches))
+        ]
+        responses = await asyncio.gather(
+            *(
+                client.get_tree(owner, repo, sha, recursive=recursive, subtree=True)
+                for _, _, sha, recursive in wave
+            ),
+            return_exceptions=True,
+        )
+        result.fetches += len(wave)
+        for (_, path, _, recursive), listing in zip(wave, responses):
+            if not isinstance(listing, PathIndex):
+                result.skipped += 1
+                continue
+            prefix = f"{path}/" if path else ""
+            if recursive:
+                add_listing(listing, prefix)
+            else:
+                add_children(listing, prefix)
+
+    result.skipped += len(jobs)
+    result.index = builder.build(sha=index.sha, truncated=not result.complete)
+    return result
@@ -1,12 +1,13 @@
 """Tests for the analyzer orchestrator."""
 
+import asyncio
 import base64
 
 import httpx
 import pytest
 from pytest_httpx import HTTPXMock
 
-from repocrunch.analyzer import analyze_repo, parse_repo_input
+from repocrunch.analyzer import WATCHERS_UNKNOWN, analyze_repo, parse_repo_input
 
 
 def test_parse_owner_repo():
@@ -38,9 +39,17 @@ async def test_full_analysis(httpx_mock: HTTPXMock, repo_data, tree_data):
     httpx_mock.add_response(url=base, json=repo_data, headers=RATE_HEADERS)
     httpx_mock.add_response(url=f"{base}/languages", json={"Python": 50000, "Shell": 2000}, headers=RATE_HEADERS)
 
-    # Tree endpoint has ?recursive=1 query param
+    # HEAD resolves to a commit SHA; the tree is then fetched by SHA with ?recursive=1
     httpx_mock.add_response(
-        url=httpx.URL(f"{base}/git/trees/HEAD", params={"recursive": "1"}),
+        url=f"{base}/commits/HEAD",
+        text="c0ffee0000000000000000000000000000000000",
+        headers=RATE_HEADERS,
+    )
+    httpx_mock.add_response(
+        url=httpx.URL(
+            f"{base}/git/trees/c0ffee0000000000000000000000000000000000",
+            params={"recursive": "1"},
+        ),
         json=tree_data,
         headers=RATE_HEADERS,
     )
@@ -104,16 +113,99 @@ dev = ["pytest"]
     assert result.security.security_policy is True
 
 
+@pytest.mark.asyncio
+async def test_summary_field_skips_tree_and_health_calls(httpx_mock: HTTPXMock, repo_data):
+    base = "https://api.github.com/repos/testowner/test-repo"
+    httpx_mock.add_response(url=base, json=repo_data, headers=RATE_HEADERS)
+    httpx_mock.add_response(url=f"{base}/languages", json={"Python": 100}, headers=RATE_HEADERS)
+
+    result = await analyze_repo("testowner/test-repo", token="test-token", fields=["summary"])
+
+    assert result.summary.languages == {"Python": 100.0}
+    assert result.security.branch_protection is False
+    assert len(httpx_mock.get_requests()) == 2
+
+
 @pytest.mark.asyncio
 async def test_repo_not_found(httpx_mock: HTTPXMock):
     base = "https://api.github.com/repos/no/exist"
     httpx_mock.add_response(url=base, status_code=404, headers=RATE_HEADERS)
     httpx_mock.add_response(url=f"{base}/languages", status_code=404, headers=RATE_HEADERS)
+    httpx_mock.add_response(url=f"{base}/commits/HEAD", status_code=404, headers=RATE_HEADERS)
+
+    with pytest.raises(ValueError, match="not found"):
+        await analyze_repo("no/exist", token="test-token")
+
+
+@pytest.mark.asyncio
+async def test_analyze_many_streams_results_and_errors(monkeypatch):
+    from datetime import datetime, timezone
+
+    import repocrunch.analyzer as analyzer
+    from repocrunch.analyzer import analyze_many
+    from repocrunch.models import RepoAnalysis
+
+    clients = set()
+    active = 0
+    peak = 0
+
+    async def fake_analyze_repo(repo_input, client=None, **kwargs):
+        nonlocal active, peak
+        clients.add(id(client))
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        owner, repo = parse_repo_input(repo_input)
+        if repo == "missing":
+            raise ValueError(f"Repository not found: {owner}/{repo}")
+        return RepoAnalysis(
+            repo=f"{owner}/{repo}",
+            url=f"https://github.com/{owner}/{repo}",
+            analyzed_at=datetime.now(timezone.utc),
+        )
+
+    monkeypatch.setattr(analyzer, "analyze_repo", fake_analyze_repo)
+    repos = [f"org/repo{i}" for i in range(10)] + ["org/missing", "not-valid"]
+
+    results = [r async for r in analyze_many(repos, concurrency=3, token="test-token")]
+
+    assert len(results) == 12
+    assert sorted(r.repo for r in results if r.analysis) == sorted(repos[:10])
+    errors = {r.repo: r.error for r in results if r.error}
+    assert "not found" in errors["org/missing"]
+    assert "Cannot parse" in errors["not-valid"]
+    assert peak == 3
+    assert len(clients) == 1
+
+
+@pytest.mark.asyncio
+async def test_analyze_owner_reuses_listing_metadata(httpx_mock: HTTPXMock, repo_data):
+    from repocrunch.analyzer import analyze_owner
+
+    # Listing entries carry no watcher count
+    entry = {k: v for k, v in repo_data.items() if k != "subscribers_count"}
+    listing = [
+        dict(entry, full_name="testowner/one", stargazers_count=1),
+        dict(entry, full_name="testowner/fork", stargazers_count=2, fork=True),
+        dict(entry, full_name="testowner/two", stargazers_count=3),
+    ]
     httpx_mock.add_response(
-        url=httpx.URL(f"{base}/git/trees/HEAD", params={"recursive": "1"}),
-        status_code=404,
+        url=httpx.URL("https://api.github.com/orgs/testowner/repos", params={"per_page": "100", "page": "1"}),
+        json=listing,
         headers=RATE_HEADERS,
     )
 
-    with pytest.raises(ValueError, match="not found"):
-        await analyze_repo("no/exist", token="test-token")
+    results = [
+        r async for r in analyze_owner(
+            "testowner", token="test-token", fields=["summary.stars", "summary.watchers"],
+            forks=False,
+        )
+    ]
+
+    stars = {r.repo: r.analysis.summary.stars for r in results}
+    assert stars == {"testowner/one": 1, "testowner/two": 3}
+    assert all(r.analysis.summary.watchers == 0 for r in results)
+    assert all(WATCHERS_UNKNOWN in r.analysis.warnings for r in results)
+    # Only the listing was fetched: no per-repo metadata calls
+    assert len(httpx_mock.get_requests()) == 1
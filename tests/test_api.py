@@ -6,8 +6,11 @@ from unittest.mock import AsyncMock, patch
 import pytest
 from httpx import ASGITransport, AsyncClient
 
+import repocrunch.api as api
 from repocrunch.api import app
+from repocrunch.client import RateLimitError
 from repocrunch.models import RepoAnalysis, RepoSummary
+from repocrunch.results import ResultCache
 
 
 def _mock_result():
@@ -29,6 +32,17 @@ async def test_health():
         assert data["status"] == "ok"
 
 
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE repocrunch_github_requests_total counter" in response.text
+        assert "# TYPE repocrunch_analysis_duration_seconds histogram" in response.text
+
+
 @pytest.mark.asyncio
 @patch("repocrunch.api.analyze_repo", new_callable=AsyncMock)
 async def test_analyze_endpoint(mock_analyze):
@@ -50,3 +64,172 @@ async def test_analyze_not_found(mock_analyze):
     async with AsyncClient(transport=transport, base_url="http://test") as client:
         response = await client.get("/analyze", params={"repo": "bad/repo"})
         assert response.status_code == 400
+
+
+@pytest.fixture
+def result_cache(monkeypatch):
+    cache = ResultCache()
+    monkeypatch.setattr(api, "results", cache)
+    return cache
+
+
+@pytest.mark.asyncio
+@patch("repocrunch.api.analyze_repo", new_callable=AsyncMock)
+async def test_recent_cached_analysis_is_served_without_waiting(mock_analyze, result_cache):
+    result_cache.set("test", "repo", "sha1", _mock_result(), {"private": False})
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/analyze", params={"repo": "test/repo"})
+        assert response.status_code == 200
+        assert response.json()["summary"]["stars"] == 100
+    mock_analyze.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("repocrunch.api.analyze_repo", new_callable=AsyncMock)
+async def test_private_analysis_is_not_served_from_cache(mock_analyze, result_cache):
+    result_cache.set("test", "repo", "sha1", _mock_result(), {"private": True})
+    mock_analyze.side_effect = ValueError("Repository not found: test/repo")
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/analyze", params={"repo": "test/repo"})
+        assert response.status_code == 400
+    mock_analyze.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("repocrunch.api.analyze_repo", new_callable=AsyncMock)
+async def test_rate_limited_serves_stale_analysis(mock_analyze, result_cache, monkeypatch):
+    monkeypatch.setattr(api, "MAX_STALENESS", -1.0)  # everything cached is stale
+    result_cache.set("test", "repo", "sha1", _mock_result(), {"private": False})
+    mock_analyze.side_effect = RateLimitError()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/analyze", params={"repo": "test/repo"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["summary"]["stars"] == 100
+        assert any("rate limit" in w for w in data["warnings"])
+
+        response = await client.get("/analyze", params={"repo": "other/repo"})
+        assert response.status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_concurrent_analyses_share_upstream_calls(httpx_mock, result_cache):
+    import asyncio
+
+    import httpx
+
+    calls: list[str] = []
+
+    async def github(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        await asyncio.sleep(0.05)  # keep the first fetch in flight
+        if request.url.path.endswith("/commits/HEAD"):
+            return httpx.Response(200, text="a" * 40)
+        return httpx.Response(200, json={"full_name": "test/repo", "stargazers_count": 7})
+
+    httpx_mock.add_callback(github, is_reusable=True)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(
+            *(
+                client.get("/analyze", params={"repo": "test/repo", "fields": "summary.stars"})
+                for _ in range(2)
+            )
+        )
+
+    assert [r.json() for r in responses] == [{"summary": {"stars": 7}}] * 2
+    assert sorted(calls) == ["/repos/test/repo", "/repos/test/repo/commits/HEAD"]
+
+
+@pytest.mark.asyncio
+@patch("repocrunch.api.analyze_repo", new_callable=AsyncMock)
+async def test_shutdown_cancels_background_refreshes(
+    mock_analyze, result_cache, tmp_path, monkeypatch
+):
+    import asyncio
+
+    monkeypatch.setenv("REPOCRUNCH_JOBS", str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(api, "_runner", None)
+    monkeypatch.setattr(api, "_store", None)
+    monkeypatch.setattr(api, "REVALIDATE_AFTER", -1.0)  # every hit revalidates
+    mock_analyze.side_effect = lambda *args, **kwargs: asyncio.sleep(60)
+    result_cache.set("test", "repo", "sha1", _mock_result(), {"private": False})
+
+    async with api.lifespan(app):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/analyze", params={"repo": "test/repo"})
+            assert response.status_code == 200
+        (refresh,) = api._refreshing.values()
+    assert refresh.cancelled()
+    assert api._refreshing == {}
+
+
+@pytest.mark.asyncio
+async def test_jobs_endpoints(tmp_path, monkeypatch):
+    from repocrunch.jobs import JobRunner, JobStore
+
+    runner = JobRunner(JobStore(tmp_path / "jobs.db"), client=object())
+    monkeypatch.setattr(runner, "start", lambda: None)  # leave the queue undrained
+    monkeypatch.setattr(api, "_runner", runner)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/jobs", json={"repos": ["a/one", "a/two", "a/three"]})
+        assert response.status_code == 202
+        job = response.json()
+        assert (job["status"], job["total"]) == ("queued", 3)
+
+        response = await client.get(f"/jobs/{job['id']}", params={"limit": 2})
+        data = response.json()
+        assert [item["repo"] for item in data["results"]] == ["a/one", "a/two"]
+        assert data["next_offset"] == 2
+
+        response = await client.post("/jobs", json={"repos": ["a/one"], "fields": ["nope"]})
+        assert response.status_code == 400
+        response = await client.get("/jobs/missing")
+        assert response.status_code == 404
+    runner.store.close()
+
+
+@pytest.mark.asyncio
+async def test_job_lookup_does_not_start_runner(tmp_path, monkeypatch):
+    path = tmp_path / "jobs.db"
+    monkeypatch.setenv("REPOCRUNCH_JOBS", str(path))
+    monkeypatch.setattr(api, "_runner", None)
+    monkeypatch.setattr(api, "_store", None)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/jobs/missing")
+        assert response.status_code == 404
+    assert api._runner is None
+    assert not path.exists()
+
+
+@pytest.mark.asyncio
+async def test_analyze_stream(monkeypatch):
+    import json
+
+    async def fake_analyze_repo(repo_input, client=None, **kwargs):
+        if repo_input == "bad/repo":
+            raise ValueError("Repository not found: bad/repo")
+        return _mock_result()
+
+    monkeypatch.setattr("repocrunch.analyzer.analyze_repo", fake_analyze_repo)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/analyze/stream",
+            params={"fields": "summary.stars", "concurrency": 2},
+            content=b"test/repo\n\nbad/repo\ntest/repo",
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert len(lines) == 3
+    assert sorted(line["repo"] for line in lines) == ["bad/repo", "test/repo", "test/repo"]
+    ok = [line for line in lines if line["error"] is None]
+    assert ok[0]["analysis"] == {"summary": {"stars": 100}}
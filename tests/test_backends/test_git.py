@@ -0,0 +1,141 @@
+"""Tests for the git object reader and the bare-repository backend."""
+
+import shutil
+import subprocess
+
+import pytest
+
+from repocrunch.analyzer import analyze_local
+from repocrunch.backends.git import GitObjectStore
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+def _git(cwd, *args):
+    env = {
+        "GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@example.com",
+        "GIT_COMMITTER_NAME": "t", "GIT_COMMITTER_EMAIL": "t@example.com",
+        "HOME": str(cwd),
+    }
+    return subprocess.run(
+        ["git", *args], cwd=cwd, env=env, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def work(tmp_path):
+    root = tmp_path / "myapp"
+    root.mkdir()
+    _git(root, "init", "-q", "-b", "trunk")
+    lines = [f"def f{i}(): return {i}\n" for i in range(200)]
+    for n in range(5):
+        (root / "pyproject.toml").write_text(
+            f'[project]\nname = "myapp"\nversion = "0.{n}"\ndependencies = ["fastapi", "httpx"]\n'
+        )
+        (root / "src" / "myapp").mkdir(parents=True, exist_ok=True)
+        (root / "src" / "myapp" / "core.py").write_text("".join(lines[: 100 + n * 20]))
+        (root / "tests").mkdir(exist_ok=True)
+        (root / "tests" / "test_core.py").write_text("def test(): pass\n")
+        _git(root, "add", "-A")
+        _git(root, "commit", "-q", "-m", f"c{n}")
+    return root
+
+
+@pytest.fixture
+def bare(work, tmp_path):
+    path = tmp_path / "myapp.git"
+    _git(tmp_path, "clone", "-q", "--bare", str(work), str(path))
+    # Aggressive repack so the pack holds delta chains
+    _git(path, "repack", "-adfq", "--depth=50", "--window=50")
+    return path
+
+
+def test_loose_objects_match_git(work):
+    with GitObjectStore(work / ".git") as store:
+        head = store.resolve_head()
+        assert head == _git(work, "rev-parse", "HEAD")
+        commit = store.read_commit(head)
+        paths = [path for path, _, _ in store.walk_tree(commit.tree)]
+        assert paths == ["pyproject.toml", "src", "src/myapp", "src/myapp/core.py", "tests", "tests/test_core.py"]
+
+
+def test_packed_objects_and_deltas_match_git(bare):
+    assert not list((bare / "objects").glob("??/*"))  # everything is packed
+    idx = next((bare / "objects" / "pack").glob("*.idx"))
+    assert "chain length" in _git(bare, "verify-pack", "-v", str(idx))
+    with GitObjectStore(bare) as store:
+        for sha in _git(bare, "rev-list", "--objects", "--all").split("\n"):
+            sha = sha.split(" ")[0]
+            obj_type, content = store.read(sha)
+            assert obj_type == _git(bare, "cat-file", "-t", sha)
+            assert store.size(sha) == len(content) == int(_git(bare, "cat-file", "-s", sha))
+
+
+def test_history_is_newest_first(bare):
+    with GitObjectStore(bare) as store:
+        commits = store.history(store.resolve_head(), limit=3)
+        assert len(commits) == 3
+        assert [c.committed_at for c in commits] == sorted(
+            (c.committed_at for c in commits), reverse=True
+        )
+
+
+def test_missing_object_raises_key_error(bare):
+    with GitObjectStore(bare) as store, pytest.raises(KeyError):
+        store.read("0" * 40)
+
+
+@pytest.mark.asyncio
+async def test_analyze_bare_repo(bare):
+    result = await analyze_local(bare)
+    assert result.repo == "myapp"
+    assert result.summary.primary_language == "Python"
+    assert result.tech_stack.runtime == "Python"
+    assert result.tech_stack.dependencies["direct"] == 2
+    assert result.architecture.has_tests is True
+    assert result.summary.last_commit is not None
+    assert result.health.commit_frequency == "daily"
+
+
+@pytest.mark.asyncio
+async def test_working_copy_reads_commit_history(work):
+    result = await analyze_local(work)
+    assert result.summary.last_commit is not None
+    assert result.health.commit_frequency == "daily"
+
+
+@pytest.mark.asyncio
+async def test_working_copy_ignores_untracked_files(work):
+    (work / ".gitignore").write_text(".env\ndist/\n")
+    (work / ".env").write_text("SECRET=1\n")
+    (work / "dist").mkdir()
+    (work / "dist" / "Dockerfile").write_text("FROM scratch\n")
+    result = await analyze_local(work)
+    assert result.security.has_env_file is False
+    assert result.architecture.docker is False
+    assert not any(".env" in w for w in result.warnings)
+
+
+@pytest.mark.asyncio
+async def test_working_copy_keeps_tracked_vendored_dirs(work):
+    (work / "node_modules" / "left-pad").mkdir(parents=True)
+    (work / "node_modules" / "left-pad" / "index.js").write_text("module.exports = 1;\n" * 100)
+    _git(work, "add", "-A")
+    _git(work, "commit", "-q", "-m", "vendor")
+    (work / "venv").mkdir()
+    (work / "venv" / "lib.py").write_text("x = 1\n")
+
+    result = await analyze_local(work)
+    assert "JavaScript" in result.summary.languages
+
+
+@pytest.mark.asyncio
+async def test_linked_worktree_reads_shared_objects(work, tmp_path):
+    linked = tmp_path / "linked"
+    _git(work, "worktree", "add", "-q", "-b", "feature", str(linked))
+    (linked / ".env").write_text("SECRET=1\n")  # untracked
+
+    result = await analyze_local(linked)
+    assert result.summary.last_commit is not None
+    assert result.security.has_env_file is False
+    assert result.tech_stack.key_deps == ["fastapi", "httpx"]
@@ -0,0 +1,66 @@
+"""Tests for the local working-copy backend."""
+
+import json
+
+import pytest
+
+from repocrunch.analyzer import analyze_local
+from repocrunch.backends.local import walk_tree
+
+
+@pytest.fixture
+def checkout(tmp_path):
+    root = tmp_path / "myapp"
+    files = {
+        "package.json": json.dumps({
+            "dependencies": {"react": "^18", "next": "^14"},
+            "devDependencies": {"jest": "^29"},
+        }),
+        "pnpm-lock.yaml": "",
+        "src/index.ts": "export const x = 1;\n" * 50,
+        "src/components/App.tsx": "export default () => null;\n",
+        "src/App.test.tsx": "test('x', () => {});\n",
+        "scripts/build.sh": "#!/bin/sh\n",
+        "Dockerfile": "FROM node:20\n",
+        ".github/workflows/ci.yml": "on: push\n",
+        ".github/dependabot.yml": "version: 2\n",
+        "node_modules/react/index.js": "module.exports = {};\n" * 1000,
+        ".git/HEAD": "ref: refs/heads/trunk\n",
+    }
+    for rel, content in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return root
+
+
+def test_walk_tree_skips_git_and_vendored_dirs(checkout):
+    files, dirs = walk_tree(checkout, max_workers=4)
+    paths = [p for p, _ in files]
+    assert "src/components/App.tsx" in paths
+    assert "src/components" in dirs
+    assert not any(p.startswith((".git/", "node_modules/")) for p in paths)
+    assert paths == sorted(paths)
+
+
+@pytest.mark.asyncio
+async def test_analyze_local(checkout):
+    result = await analyze_local(checkout)
+    assert result.repo == "myapp"
+    assert result.url.startswith("file://")
+    assert result.summary.primary_language == "TypeScript"
+    assert result.tech_stack.runtime == "Node.js"
+    assert result.tech_stack.framework == "React"
+    assert result.tech_stack.package_manager == "pnpm"
+    assert result.tech_stack.dependencies == {"direct": 2, "dev": 1}
+    assert result.architecture.docker is True
+    assert result.architecture.ci_cd == ["GitHub Actions"]
+    assert result.architecture.has_tests is True
+    assert result.security.dependabot_enabled is True
+    assert not any("Branch protection" in w for w in result.warnings)
+
+
+@pytest.mark.asyncio
+async def test_analyze_local_rejects_missing_dir(tmp_path):
+    with pytest.raises(ValueError):
+        await analyze_local(tmp_path / "nope")
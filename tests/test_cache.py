@@ -0,0 +1,152 @@
+"""Tests for the persistent response cache."""
+
+import sqlite3
+import time
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from repocrunch.cache import CacheEntry, SQLiteCache
+from repocrunch.client import GitHubClient
+
+RATE_HEADERS = {"X-RateLimit-Remaining": "4999", "X-RateLimit-Limit": "5000"}
+
+
+def test_roundtrip(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db")
+    cache.set("/repos/a/b", CacheEntry('"e1"', {"name": "b"}, {"ETag": '"e1"'}))
+    entry = cache.get("/repos/a/b")
+    assert entry is not None
+    assert entry.etag == '"e1"'
+    assert entry.data == {"name": "b"}
+    assert entry.headers["ETag"] == '"e1"'
+    assert cache.get("/repos/a/missing") is None
+    cache.close()
+
+
+def test_shared_between_connections(tmp_path):
+    path = tmp_path / "cache.db"
+    writer = SQLiteCache(path)
+    reader = SQLiteCache(path)
+    writer.set("key", CacheEntry('"e"', [1, 2, 3]))
+    assert reader.get("key").data == [1, 2, 3]
+    writer.close()
+    reader.close()
+
+
+def test_ttl_expiry(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db", ttl=60)
+    cache.set("old", CacheEntry('"e"', {}, stored_at=time.time() - 120))
+    assert cache.get("old") is None
+    cache.close()
+
+
+def test_touch_restarts_ttl_and_keeps_body(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db", ttl=60)
+    cache.set("k", CacheEntry('"e"', {"name": "b"}, stored_at=time.time() - 50))
+    cache.touch("k", {"ETag": '"e"', "X-RateLimit-Remaining": "4998"})
+    entry = cache.get("k")
+    assert entry.data == {"name": "b"}
+    assert entry.headers["X-RateLimit-Remaining"] == "4998"
+    assert time.time() - entry.stored_at < 5
+    cache.close()
+
+
+def test_locked_database_skips_writes_without_blocking(tmp_path):
+    path = tmp_path / "cache.db"
+    cache = SQLiteCache(path)
+    cache.set("k", CacheEntry('"e"', [1]))
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")  # another process holds the write lock
+    started = time.monotonic()
+    cache.set("k2", CacheEntry('"e"', [2]))
+    cache.set_object("blob:abc", "text")
+    assert time.monotonic() - started < 2
+    assert cache.get("k").data == [1]  # WAL readers still see committed data
+    other.execute("ROLLBACK")
+    other.close()
+    assert cache.get("k2") is None
+    cache.close()
+
+
+def test_size_eviction_drops_least_recently_used(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db", max_bytes=250)
+    for i in range(5):
+        cache.set(f"k{i}", CacheEntry('"e"', "x" * 98))
+    cache.get("k0")
+    cache.evict()
+    assert cache.get("k0") is not None
+    assert cache.get("k4") is not None
+    assert cache.get("k1") is None
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_client_revalidates_from_persistent_cache(httpx_mock: HTTPXMock, tmp_path):
+    path = tmp_path / "cache.db"
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/test/repo",
+        json={"name": "repo"},
+        headers={"ETag": '"abc123"', **RATE_HEADERS},
+    )
+    async with GitHubClient(token="test", cache=SQLiteCache(path)) as client:
+        await client.get("/repos/test/repo")
+
+    # A fresh client (new process) starts with an empty memory cache
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/test/repo",
+        status_code=304,
+        match_headers={"If-None-Match": '"abc123"'},
+        headers=RATE_HEADERS,
+    )
+    cache = SQLiteCache(path)
+    async with GitHubClient(token="test", cache=cache) as client:
+        data = await client.get("/repos/test/repo")
+        assert data == {"name": "repo"}
+    cache.close()
+
+
+def test_object_roundtrip(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db")
+    cache.set_object("blob:abc", "hello")
+    assert cache.get_object("blob:abc") == "hello"
+    assert cache.get_object("blob:missing") is None
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_trees_and_blobs_are_content_addressed(httpx_mock: HTTPXMock, tmp_path):
+    import base64
+
+    sha = "a" * 40
+    tree = {"sha": "t1", "tree": [{"path": "package.json", "type": "blob", "sha": "b1"}]}
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/one/repo/commits/HEAD",
+        text=sha,
+        match_headers={"Accept": "application/vnd.github.sha"},
+        headers=RATE_HEADERS,
+    )
+    httpx_mock.add_response(
+        url=f"https://api.github.com/repos/one/repo/git/trees/{sha}?recursive=1",
+        json=tree,
+        headers=RATE_HEADERS,
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/one/repo/git/blobs/b1",
+        json={"content": base64.b64encode(b'{"name": "x"}').decode(), "encoding": "base64"},
+        headers=RATE_HEADERS,
+    )
+    path = tmp_path / "cache.db"
+    async with GitHubClient(token="test", cache=SQLiteCache(path)) as client:
+        head = await client.resolve_head("one", "repo")
+        assert head == sha
+        assert (await client.get_tree("one", "repo", head)).sha == "t1"
+        assert await client.get_file_content("one", "repo", "package.json") == '{"name": "x"}'
+
+    # A fork in a fresh process: same commit and blob, zero API calls
+    cache = SQLiteCache(path)
+    async with GitHubClient(token="test", cache=cache) as client:
+        assert (await client.get_tree("fork", "repo", sha)).sha == "t1"
+        assert await client.get_file_content("fork", "repo", "package.json") == '{"name": "x"}'
+    cache.close()
+    assert len(httpx_mock.get_requests()) == 3
@@ -0,0 +1,122 @@
+"""Tests for cassette recording and replay."""
+
+import gzip
+import json
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from repocrunch.analyzer import analyze_repo
+from repocrunch.cassette import CassetteMiss, RecordingTransport, ReplayTransport
+from repocrunch.client import GitHubClient
+
+HEAD_SHA = "c0ffee0000000000000000000000000000000000"
+RATE_HEADERS = {"X-RateLimit-Remaining": "4990", "X-RateLimit-Limit": "5000", "ETag": '"abc"'}
+
+
+def _github(httpx_mock: HTTPXMock, repo_data, tree_data):
+    base = "/repos/testowner/test-repo"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers.get("authorization") == "Bearer secret"
+        path = request.url.path
+        if path == base:
+            return httpx.Response(200, json=repo_data, headers=RATE_HEADERS)
+        if path == f"{base}/languages":
+            return httpx.Response(200, json={"Python": 50000}, headers=RATE_HEADERS)
+        if path == f"{base}/commits/HEAD":
+            return httpx.Response(200, text=HEAD_SHA, headers=RATE_HEADERS)
+        if path == f"{base}/git/trees/{HEAD_SHA}":
+            return httpx.Response(200, json=tree_data, headers=RATE_HEADERS)
+        return httpx.Response(404, json={"message": "Not Found"}, headers=RATE_HEADERS)
+
+    httpx_mock.add_callback(handler, is_reusable=True)
+
+
+async def _record(path):
+    async with GitHubClient(token="secret", record=path) as gh:
+        return await analyze_repo("testowner/test-repo", client=gh)
+
+
+@pytest.mark.asyncio
+async def test_replay_reproduces_recorded_analysis(httpx_mock, tmp_path, repo_data, tree_data):
+    cassette = tmp_path / "run.ndjson.gz"
+    _github(httpx_mock, repo_data, tree_data)
+    recorded = await _record(cassette)
+    httpx_mock.reset()  # nothing below may touch the network
+
+    async with GitHubClient(replay=cassette) as gh:
+        replayed = await analyze_repo("testowner/test-repo", client=gh)
+
+    assert replayed.model_dump(exclude={"analyzed_at"}) == recorded.model_dump(exclude={"analyzed_at"})
+
+
+@pytest.mark.asyncio
+async def test_cassette_keeps_headers_but_not_credentials(httpx_mock, tmp_path, repo_data, tree_data):
+    cassette = tmp_path / "run.ndjson.gz"
+    _github(httpx_mock, repo_data, tree_data)
+    await _record(cassette)
+
+    raw = gzip.decompress(cassette.read_bytes()).decode()
+    assert "secret" not in raw
+    first = json.loads(raw.splitlines()[0])
+    headers = {k.lower(): v for k, v in first["headers"]}
+    assert headers["etag"] == '"abc"'
+    assert headers["x-ratelimit-remaining"] == "4990"
+
+
+@pytest.mark.asyncio
+async def test_replay_serves_repeats_in_order_and_misses_loudly(tmp_path):
+    cassette = tmp_path / "run.ndjson.gz"
+    calls = iter([200, 304])
+    inner = httpx.MockTransport(lambda request: httpx.Response(next(calls), json={"n": 1}))
+    async with httpx.AsyncClient(transport=RecordingTransport(cassette, inner)) as client:
+        await client.get("https://api.github.com/x")
+        await client.get("https://api.github.com/x")
+
+    replay = ReplayTransport(cassette, latency=0.01)
+    assert len(replay) == 2
+    async with httpx.AsyncClient(transport=replay) as client:
+        statuses = [(await client.get("https://api.github.com/x")).status_code for _ in range(3)]
+        assert statuses == [200, 304, 304]
+        with pytest.raises(CassetteMiss):
+            await client.get("https://api.github.com/y")
+
+
+@pytest.mark.asyncio
+async def test_cassette_strips_signed_urls_and_cookies(tmp_path):
+    cassette = tmp_path / "run.ndjson.gz"
+    tarball = "https://codeload.github.com/o/r/legacy.tar.gz/main"
+
+    def github(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "codeload.github.com":
+            assert request.url.params["token"] == "SIGNED"
+            return httpx.Response(200, content=b"tar")
+        return httpx.Response(
+            302,
+            headers={"Location": f"{tarball}?token=SIGNED", "Set-Cookie": "session=SIGNED"},
+        )
+
+    transport = RecordingTransport(cassette, httpx.MockTransport(github))
+    async with httpx.AsyncClient(transport=transport, follow_redirects=True) as client:
+        response = await client.get("https://api.github.com/repos/o/r/tarball/main")
+        assert response.content == b"tar"
+
+    raw = gzip.decompress(cassette.read_bytes()).decode()
+    assert "SIGNED" not in raw
+    redirect, download = (json.loads(line) for line in raw.splitlines())
+    assert dict(redirect["headers"])["location"] == tarball
+    assert download["url"] == tarball
+
+    # The replayed redirect has no token, and still finds the download
+    async with httpx.AsyncClient(
+        transport=ReplayTransport(cassette), follow_redirects=True
+    ) as client:
+        response = await client.get("https://api.github.com/repos/o/r/tarball/main")
+        assert response.content == b"tar"
+
+
+def test_record_and_replay_are_exclusive(tmp_path):
+    with pytest.raises(ValueError):
+        GitHubClient(record=tmp_path / "a", replay=tmp_path / "b")
@@ -65,3 +65,51 @@ def test_analyze_error(mock_analyze):
     result = runner.invoke(app, ["analyze", "bad/repo"])
     assert result.exit_code == 1
     assert "not found" in (result.stdout + result.stderr)
+
+
+def test_batch_resumes_from_checkpoint(tmp_path, monkeypatch):
+    import json
+
+    import repocrunch.analyzer as analyzer
+
+    analyzed = []
+
+    async def fake_analyze_repo(repo_input, client=None, **kwargs):
+        analyzed.append(repo_input)
+        if repo_input == "test/missing":
+            raise ValueError("Repository not found: test/missing")
+        return _mock_result()
+
+    monkeypatch.setattr(analyzer, "analyze_repo", fake_analyze_repo)
+    repos = tmp_path / "repos.txt"
+    repos.write_text("test/one\ntest/two\n\ntest/missing\ntest/one\n")
+    out = tmp_path / "out.ndjson"
+    # An earlier run finished test/one before it was interrupted
+    out.write_text(json.dumps({"repo": "test/one", "analysis": {}, "error": None}) + "\n")
+    (tmp_path / "out.ndjson.checkpoint").write_text("test/one\n")
+
+    result = runner.invoke(
+        app, ["batch", str(repos), "-o", str(out), "-c", "2", "-f", "summary.stars"]
+    )
+
+    assert result.exit_code == 0
+    assert sorted(analyzed) == ["test/missing", "test/two"]
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [line["repo"] for line in lines][0] == "test/one"
+    assert sorted(line["repo"] for line in lines[1:]) == ["test/missing", "test/two"]
+    assert {"summary": {"stars": 100}} in [line["analysis"] for line in lines]
+    checkpoint = (tmp_path / "out.ndjson.checkpoint").read_text().split()
+    assert sorted(checkpoint) == ["test/one", "test/two"]
+
+    # Failed repos aren't checkpointed, so the next run retries them. Their
+    # old error lines are replaced rather than duplicated, and so is a line
+    # the interruption cut off
+    with open(out, "a") as f:
+        f.write('{"repo": "test/missi')
+    analyzed.clear()
+    result = runner.invoke(app, ["batch", str(repos), "-o", str(out)])
+    assert result.exit_code == 0
+    assert analyzed == ["test/missing"]
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    assert sorted(line["repo"] for line in lines) == ["test/missing", "test/one", "test/two"]
+    assert [line["repo"] for line in lines if line["error"]] == ["test/missing"]
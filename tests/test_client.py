@@ -102,3 +102,59 @@ async def test_low_rate_limit_warning(httpx_mock: HTTPXMock):
     async with GitHubClient(token="test") as client:
         await client.get("/repos/test/repo")
         assert any("rate limit low" in w for w in client.warnings)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_gets_are_coalesced(httpx_mock: HTTPXMock):
+    import asyncio
+
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/test/repo",
+        json={"name": "repo"},
+        headers={"X-RateLimit-Remaining": "4999", "X-RateLimit-Limit": "5000"},
+    )
+    async with GitHubClient(token="test") as client:
+        results = await asyncio.gather(*(client.get("/repos/test/repo") for _ in range(5)))
+        assert all(r == {"name": "repo"} for r in results)
+        assert len(httpx_mock.get_requests()) == 1
+        assert client._inflight == {}
+
+
+def _listing_page(page: int, names: list[str], last: int | None = None) -> dict:
+    headers = {"X-RateLimit-Remaining": "4999", "X-RateLimit-Limit": "5000"}
+    if last is not None:
+        base = "https://api.github.com/organizations/1/repos?per_page=100"
+        headers["Link"] = f'<{base}&page=2>; rel="next", <{base}&page={last}>; rel="last"'
+    return {
+        "url": httpx.URL(
+            "https://api.github.com/users/someone/repos",
+            params={"per_page": "100", "page": str(page)},
+        ),
+        "json": [{"full_name": f"someone/{name}", "stargazers_count": 1} for name in names],
+        "headers": headers,
+    }
+
+
+@pytest.mark.asyncio
+async def test_iter_owner_repos_falls_back_to_user_and_pages_concurrently(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url=httpx.URL("https://api.github.com/orgs/someone/repos", params={"per_page": "100", "page": "1"}),
+        status_code=404,
+    )
+    httpx_mock.add_response(**_listing_page(1, ["a", "b"], last=3))
+    httpx_mock.add_response(**_listing_page(2, ["c"]))
+    httpx_mock.add_response(**_listing_page(3, ["d"]))
+
+    async with GitHubClient(token="test") as client:
+        names = [repo["full_name"] async for repo in client.iter_owner_repos("someone")]
+
+    assert names[:2] == ["someone/a", "someone/b"]
+    assert sorted(names[2:]) == ["someone/c", "someone/d"]
+
+
+@pytest.mark.asyncio
+async def test_iter_owner_repos_unknown_owner(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(status_code=404, is_reusable=True)
+    async with GitHubClient(token="test") as client:
+        with pytest.raises(ValueError, match="nobody"):
+            [repo async for repo in client.iter_owner_repos("nobody")]
@@ -1,10 +1,11 @@
 """Tests for architecture extractor."""
 
 from repocrunch.extractors.architecture import extract_architecture
+from repocrunch.pathindex import PathIndex
 
 
 def test_basic_extraction(tree_data):
-    result = extract_architecture(tree_data)
+    result = extract_architecture(PathIndex.from_tree_data(tree_data))
     assert result.docker is True
     assert "GitHub Actions" in result.ci_cd
     assert result.has_tests is True
@@ -17,7 +18,7 @@ def test_monorepo_detection():
         {"path": "packages/b/package.json", "type": "blob"},
         {"path": "packages", "type": "tree"},
     ]}
-    result = extract_architecture(tree)
+    result = extract_architecture(PathIndex.from_tree_data(tree))
     assert result.monorepo is True
 
 
@@ -25,7 +26,7 @@ def test_no_docker():
     tree = {"tree": [
         {"path": "src/main.py", "type": "blob"},
     ]}
-    result = extract_architecture(tree)
+    result = extract_architecture(PathIndex.from_tree_data(tree))
     assert result.docker is False
     assert result.ci_cd == []
 
@@ -34,7 +35,7 @@ def test_test_framework_from_deps():
     tree = {"tree": [
         {"path": "tests/test_main.py", "type": "blob"},
     ]}
-    result = extract_architecture(tree, deps=["pytest", "httpx"])
+    result = extract_architecture(PathIndex.from_tree_data(tree), deps=["pytest", "httpx"])
     assert result.test_framework == "pytest"
     assert result.has_tests is True
 
@@ -43,7 +44,7 @@ def test_gitlab_ci():
     tree = {"tree": [
         {"path": ".gitlab-ci.yml", "type": "blob"},
     ]}
-    result = extract_architecture(tree)
+    result = extract_architecture(PathIndex.from_tree_data(tree))
     assert "GitLab CI" in result.ci_cd
 
 
@@ -52,6 +53,6 @@ def test_multiple_ci():
         {"path": ".github/workflows/test.yml", "type": "blob"},
         {"path": ".travis.yml", "type": "blob"},
     ]}
-    result = extract_architecture(tree)
+    result = extract_architecture(PathIndex.from_tree_data(tree))
     assert "GitHub Actions" in result.ci_cd
     assert "Travis CI" in result.ci_cd
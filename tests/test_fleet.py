@@ -0,0 +1,54 @@
+"""Tests for the process-pool directory scanner."""
+
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from repocrunch.cli import app
+from repocrunch.fleet import discover_repos, scan_dir
+
+
+@pytest.fixture
+def mirrors(tmp_path):
+    root = tmp_path / "mirrors"
+    repos = {
+        "org-a/api": {"pyproject.toml": '[project]\nname = "api"\ndependencies = ["fastapi"]\n', "app.py": "x = 1\n"},
+        "org-a/web": {"package.json": '{"dependencies": {"react": "^18"}}', "index.ts": "export {};\n"},
+        "org-b/tool": {"go.mod": "module tool\n\ngo 1.22\n", "main.go": "package main\n"},
+    }
+    for name, files in repos.items():
+        for rel, content in {**files, ".git/HEAD": "ref: refs/heads/main\n"}.items():
+            path = root / name / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+    (root / "org-b" / "notes").mkdir()  # not a repo
+    return root
+
+
+def test_discover_repos_stops_at_repo_roots(mirrors):
+    found = [p.relative_to(mirrors).as_posix() for p in discover_repos(mirrors)]
+    assert found == ["org-a/api", "org-a/web", "org-b/tool"]
+
+
+def test_scan_dir_runs_every_repo(mirrors):
+    results = list(scan_dir(mirrors, workers=2, chunk_size=1))
+    by_name = {r.analysis.repo: r.analysis for r in results if r.analysis}
+    assert all(r.error is None for r in results)
+    assert by_name["api"].tech_stack.runtime == "Python"
+    assert by_name["web"].tech_stack.framework == "React"
+    assert by_name["tool"].tech_stack.runtime == "Go"
+
+
+def test_scan_dir_cli_streams_ndjson(mirrors, tmp_path):
+    out = tmp_path / "out.ndjson"
+    result = CliRunner().invoke(app, ["scan-dir", str(mirrors), "-w", "2", "-o", str(out)])
+    assert result.exit_code == 0
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    assert len(lines) == 3
+    assert "repos/sec" in result.stderr
+
+
+def test_scan_dir_cli_rejects_missing_dir(tmp_path):
+    result = CliRunner().invoke(app, ["scan-dir", str(tmp_path / "nope")])
+    assert result.exit_code == 1
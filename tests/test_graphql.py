@@ -0,0 +1,124 @@
+"""Tests for the GraphQL prefetch path."""
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from repocrunch.analyzer import analyze_repo
+from repocrunch.client import GitHubClient
+from repocrunch.graphql import prefetch_repo
+
+RATE_HEADERS = {"X-RateLimit-Remaining": "4990", "X-RateLimit-Limit": "5000"}
+GRAPHQL_HEADERS = {"X-RateLimit-Remaining": "4000", "X-RateLimit-Resource": "graphql"}
+
+REPOSITORY = {
+    "name": "test-repo",
+    "nameWithOwner": "testowner/test-repo",
+    "createdAt": "2020-01-01T00:00:00Z",
+    "pushedAt": "2026-02-01T10:00:00Z",
+    "isArchived": False,
+    "stargazerCount": 1500,
+    "forkCount": 20,
+    "watchers": {"totalCount": 30},
+    "issues": {"totalCount": 7},
+    "pullRequests": {"totalCount": 3},
+    "primaryLanguage": {"name": "Python"},
+    "licenseInfo": {"spdxId": "MIT"},
+    "languages": {"edges": [{"size": 900, "node": {"name": "Python"}}, {"size": 100, "node": {"name": "Shell"}}]},
+    "defaultBranchRef": {
+        "name": "main",
+        "target": {"oid": "c0ffee", "history": {"nodes": [{"committedDate": "2026-02-01T10:00:00Z"}]}},
+    },
+    "branchProtectionRules": {"nodes": [{"pattern": "ma*"}]},
+    "m0": None,
+    "m1": {"text": '[project]\ndependencies = ["fastapi"]\n'},
+    "m2": None,
+}
+
+
+@pytest.mark.asyncio
+async def test_prefetch_primes_rest_shapes(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url="https://api.github.com/graphql",
+        method="POST",
+        json={"data": {"repository": REPOSITORY}},
+        headers=GRAPHQL_HEADERS,
+    )
+    async with GitHubClient(token="test") as client:
+        assert await prefetch_repo(client, "testowner", "test-repo") is True
+        repo_data = await client.get_repo("testowner", "test-repo")
+        assert repo_data["stargazers_count"] == 1500
+        assert repo_data["open_issues_count"] == 10
+        assert repo_data["open_pull_requests_count"] == 3
+        assert repo_data["license"] == {"spdx_id": "MIT"}
+        assert await client.get_languages("testowner", "test-repo") == {"Python": 900, "Shell": 100}
+        assert await client.get_branch_protection("testowner", "test-repo", "main") is not None
+        content = await client.get_file_content("testowner", "test-repo", "pyproject.toml")
+        assert "fastapi" in content
+        # GraphQL budget is tracked separately from the core REST budget
+        assert client.rate_remaining is None
+
+
+@pytest.mark.asyncio
+async def test_prefetch_marks_missing_repo_only_on_not_found(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url="https://api.github.com/graphql",
+        method="POST",
+        json={
+            "data": {"repository": None},
+            "errors": [{"type": "NOT_FOUND", "path": ["repository"], "message": "Not found"}],
+        },
+        headers=GRAPHQL_HEADERS,
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/graphql",
+        method="POST",
+        json={
+            "data": {"repository": None},
+            "errors": [{"type": "FORBIDDEN", "path": ["repository"], "message": "SAML"}],
+        },
+        headers=GRAPHQL_HEADERS,
+    )
+    async with GitHubClient(token="test") as client:
+        assert await prefetch_repo(client, "testowner", "gone") is True
+        assert await client.get_repo("testowner", "gone") is None
+        # Any other error falls back to REST instead of reporting the repo missing
+        assert await prefetch_repo(client, "testowner", "saml") is False
+        assert "/repos/testowner/saml" not in client._prefetched
+
+
+@pytest.mark.asyncio
+async def test_prefetch_without_token_falls_back(monkeypatch):
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    async with GitHubClient() as client:
+        assert await prefetch_repo(client, "testowner", "test-repo") is False
+
+
+@pytest.mark.asyncio
+async def test_graphql_analysis_skips_rest_fanout(httpx_mock: HTTPXMock, tree_data):
+    base = "https://api.github.com/repos/testowner/test-repo"
+    httpx_mock.add_response(
+        url="https://api.github.com/graphql",
+        method="POST",
+        json={"data": {"repository": REPOSITORY}},
+        headers=GRAPHQL_HEADERS,
+    )
+    httpx_mock.add_response(
+        url=httpx.URL(f"{base}/git/trees/c0ffee", params={"recursive": "1"}),
+        json=tree_data,
+        headers=RATE_HEADERS,
+    )
+    httpx_mock.add_response(
+        url=httpx.URL(f"{base}/contributors", params={"per_page": "1", "anon": "true"}),
+        json=[{"login": "user1"}],
+        headers=RATE_HEADERS,
+    )
+
+    result = await analyze_repo("testowner/test-repo", token="test-token", graphql=True)
+
+    assert result.summary.stars == 1500
+    assert result.summary.languages == {"Python": 90.0, "Shell": 10.0}
+    assert result.tech_stack.framework == "FastAPI"
+    assert result.health.open_prs == 3
+    assert result.security.branch_protection is True
+    assert len(httpx_mock.get_requests()) == 3
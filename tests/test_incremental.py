@@ -0,0 +1,127 @@
+"""Tests for incremental re-analysis from the compare API."""
+
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from pytest_httpx import HTTPXMock
+
+from repocrunch.client import GitHubClient
+from repocrunch.incremental import apply_changes, reanalyze_repo
+from repocrunch.models import Architecture, RepoAnalysis, RepoSummary, TechStack
+from repocrunch.pathindex import PathIndex
+
+BASE = "a" * 40
+HEAD = "b" * 40
+API = "https://api.github.com/repos/o/r"
+RATE_HEADERS = {"X-RateLimit-Remaining": "4990", "X-RateLimit-Limit": "5000"}
+
+
+def _base_tree() -> PathIndex:
+    return PathIndex.from_tree_data({
+        "sha": "t0",
+        "truncated": False,
+        "tree": [
+            {"path": "pyproject.toml", "type": "blob", "sha": "p1"},
+            {"path": "old", "type": "tree", "sha": "t-old"},
+            {"path": "old/only.py", "type": "blob", "sha": "o1"},
+            {"path": "src", "type": "tree", "sha": "t-src"},
+            {"path": "src/app.py", "type": "blob", "sha": "s1"},
+        ],
+    })
+
+
+def test_apply_changes():
+    files = [
+        {"filename": "src/app.py", "status": "modified", "sha": "s2"},
+        {"filename": "new/Dockerfile", "status": "added", "sha": "d1"},
+        {"filename": "src/only.py", "status": "renamed", "sha": "o1",
+         "previous_filename": "old/only.py"},
+        {"filename": "README.md", "status": "added", "sha": "r1"},
+    ]
+    tree = apply_changes(_base_tree(), files)
+
+    assert tree.blobs == {
+        "pyproject.toml", "src/app.py", "src/only.py", "new/Dockerfile", "README.md",
+    }
+    assert tree.dirs == {"src": None, "new": None}
+    assert tree.root_blobs == {"pyproject.toml": "p1", "README.md": "r1"}
+    assert not tree.truncated
+
+
+def _previous() -> RepoAnalysis:
+    return RepoAnalysis(
+        repo="o/r",
+        url="https://github.com/o/r",
+        analyzed_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        summary=RepoSummary(primary_language="Python"),
+        tech_stack=TechStack(runtime="Python", key_deps=["fastapi"], framework="FastAPI"),
+        architecture=Architecture(docker=False),
+    )
+
+
+@pytest.mark.asyncio
+async def test_reanalysis_reads_only_the_diff(httpx_mock: HTTPXMock, repo_data):
+    httpx_mock.add_response(url=API, json=repo_data, headers=RATE_HEADERS)
+    httpx_mock.add_response(url=f"{API}/commits/HEAD", text=HEAD, headers=RATE_HEADERS)
+    httpx_mock.add_response(
+        url=f"{API}/compare/{BASE}...{HEAD}",
+        json={
+            "status": "ahead",
+            "files": [
+                {"filename": "src/app.py", "status": "modified", "sha": "s2"},
+                {"filename": "Dockerfile", "status": "added", "sha": "d1"},
+            ],
+        },
+        headers=RATE_HEADERS,
+    )
+    httpx_mock.add_response(url=f"{API}/languages", json={"Python": 100}, headers=RATE_HEADERS)
+    httpx_mock.add_response(
+        url=httpx.URL(f"{API}/commits", params={"per_page": "100"}), json=[], headers=RATE_HEADERS
+    )
+    httpx_mock.add_response(
+        url=httpx.URL(f"{API}/contributors", params={"per_page": "1", "anon": "true"}),
+        json=[{}],
+        headers=RATE_HEADERS,
+    )
+
+    async with GitHubClient(token="test-token") as client:
+        client.prime_tree("o", "r", BASE, _base_tree())  # cached from the previous run
+        result = await reanalyze_repo(_previous(), BASE, client=client)
+
+    assert result.incremental
+    assert result.sha == HEAD
+    assert result.analysis.architecture.docker is True
+    # No manifest changed, so the stack is carried over without reading one
+    assert result.analysis.tech_stack.framework == "FastAPI"
+    urls = {str(r.url) for r in httpx_mock.get_requests()}
+    assert not any("/git/trees/" in url or "/contents/" in url for url in urls)
+    # The tree rebuilt from the diff isn't cached as HEAD's real tree
+    assert f"tree:{HEAD}:r" not in client._objects
+
+
+@pytest.mark.asyncio
+async def test_diverged_history_falls_back_to_full_analysis(
+    httpx_mock: HTTPXMock, repo_data, monkeypatch
+):
+    import repocrunch.incremental as incremental
+
+    httpx_mock.add_response(url=API, json=repo_data, headers=RATE_HEADERS)
+    httpx_mock.add_response(url=f"{API}/commits/HEAD", text=HEAD, headers=RATE_HEADERS)
+    httpx_mock.add_response(
+        url=f"{API}/compare/{BASE}...{HEAD}",
+        json={"status": "diverged", "files": []},
+        headers=RATE_HEADERS,
+    )
+    full_runs = []
+
+    async def fake_analyze_repo(repo_input, client=None, **kwargs):
+        full_runs.append(repo_input)
+        return _previous()
+
+    monkeypatch.setattr(incremental, "analyze_repo", fake_analyze_repo)
+    result = await reanalyze_repo(_previous(), BASE, token="test-token")
+
+    assert not result.incremental
+    assert result.sha == HEAD
+    assert full_runs == ["o/r"]
@@ -0,0 +1,119 @@
+"""Tests for durable batch jobs."""
+
+import asyncio
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+import repocrunch.jobs as jobs
+from repocrunch.client import GitHubClient
+from repocrunch.jobs import JobRunner, JobStore
+from repocrunch.models import RepoAnalysis
+from repocrunch.scheduler import CALLS_PER_REPO, RateLimitScheduler
+
+
+def test_store_tracks_progress_and_pages(tmp_path):
+    store = JobStore(tmp_path / "jobs.db")
+    job_id = store.create(["a/one", "a/two", "a/three"], ["summary"])
+
+    assert store.get(job_id)["status"] == "queued"
+    assert [item[2] for item in store.pending(10)] == ["a/one", "a/two", "a/three"]
+    assert store.pending(10)[0][3] == ["summary"]
+
+    store.finish(job_id, 0, result={"summary": {"stars": 1}})
+    store.finish(job_id, 2, error="Repository not found: a/three")
+    job = store.get(job_id)
+    assert (job["status"], job["done"], job["failed"], job["pending"]) == ("running", 1, 1, 1)
+    assert [item[2] for item in store.pending(10, exclude={(job_id, 1)})] == []
+
+    page = store.items(job_id, offset=1, limit=5)
+    assert [item["repo"] for item in page] == ["a/two", "a/three"]
+    assert page[1]["error"] == "Repository not found: a/three"
+    assert store.get("missing") is None
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_runner_resumes_pending_items_after_restart(tmp_path, monkeypatch):
+    path = tmp_path / "jobs.db"
+    job_id = JobStore(path).create(["o/r1", "o/r2", "o/missing"])
+
+    async def fake_analyze_repo(repo_input, client=None, **kwargs):
+        if repo_input == "o/missing":
+            raise ValueError("Repository not found: o/missing")
+        return RepoAnalysis(
+            repo=repo_input,
+            url=f"https://github.com/{repo_input}",
+            analyzed_at=datetime.now(timezone.utc),
+        )
+
+    monkeypatch.setattr(jobs, "analyze_repo", fake_analyze_repo)
+    # A fresh store stands in for the restarted process
+    store = JobStore(path)
+    async with GitHubClient(token="test-token") as client:
+        runner = JobRunner(store, concurrency=2, client=client)
+        runner.start()
+        for _ in range(100):
+            if store.get(job_id)["status"] == "finished":
+                break
+            await asyncio.sleep(0.01)
+        await runner.stop()
+
+    job = store.get(job_id)
+    assert (job["done"], job["failed"]) == (2, 1)
+    assert store.items(job_id)[0]["analysis"]["repo"] == "o/r1"
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_runner_plans_queued_and_submitted_repos(tmp_path, monkeypatch):
+    store = JobStore(tmp_path / "jobs.db")
+    store.create(["o/r1", "o/r2"])
+    scheduler = RateLimitScheduler()
+    async with GitHubClient(token="test-token", scheduler=scheduler) as client:
+        runner = JobRunner(store, client=client)
+        monkeypatch.setattr(runner, "_feed", lambda: asyncio.sleep(0))
+        monkeypatch.setattr(runner, "_work", lambda: asyncio.sleep(0))
+        runner.start()
+        assert scheduler.planned_calls == 2 * CALLS_PER_REPO
+        await runner.submit(["o/r3"])
+        assert scheduler.planned_calls == 3 * CALLS_PER_REPO
+        await runner.stop()
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_store_errors(tmp_path, monkeypatch):
+    store = JobStore(tmp_path / "jobs.db")
+    job_id = store.create(["o/r1", "o/r2"])
+
+    async def fake_analyze_repo(repo_input, client=None, **kwargs):
+        return RepoAnalysis(
+            repo=repo_input,
+            url=f"https://github.com/{repo_input}",
+            analyzed_at=datetime.now(timezone.utc),
+        )
+
+    finish = store.finish
+
+    def flaky_finish(job_id, position, *args):
+        if position == 0:
+            raise sqlite3.OperationalError("database is locked")
+        finish(job_id, position, *args)
+
+    monkeypatch.setattr(jobs, "analyze_repo", fake_analyze_repo)
+    monkeypatch.setattr(store, "finish", flaky_finish)
+    async with GitHubClient(token="test-token") as client:
+        runner = JobRunner(store, concurrency=1, client=client)
+        runner.start()
+        for _ in range(100):
+            if store.get(job_id)["done"] == 1:
+                break
+            await asyncio.sleep(0.01)
+        await runner.stop()
+
+    job = store.get(job_id)
+    assert (job["done"], job["pending"]) == (1, 1)
+    assert store.items(job_id)[1]["status"] == "done"
+    store.close()
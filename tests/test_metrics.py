@@ -0,0 +1,101 @@
+"""Tests for the Prometheus metrics."""
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from repocrunch.client import GitHubClient
+from repocrunch.metrics import (
+    CACHE_EVENTS,
+    GITHUB_LATENCY,
+    GITHUB_REQUESTS,
+    RATE_REMAINING,
+    Counter,
+    Histogram,
+    _registry,
+    endpoint_template,
+    render,
+)
+
+
+@pytest.fixture
+def scratch_metrics():
+    start = len(_registry)
+    yield
+    del _registry[start:]
+
+
+def test_render_text_format(scratch_metrics):
+    counter = Counter("test_calls_total", "Calls.", ("path",))
+    counter.inc('/a"b')
+    counter.inc('/a"b', amount=2)
+    histogram = Histogram("test_seconds", "Time.", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(3.0)
+
+    text = render()
+    assert "# TYPE test_calls_total counter" in text
+    assert 'test_calls_total{path="/a\\"b"} 3.0' in text
+    assert 'test_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_seconds_bucket{le="1.0"} 2' in text
+    assert 'test_seconds_bucket{le="+Inf"} 3' in text
+    assert "test_seconds_sum 3.55" in text
+    assert "test_seconds_count 3" in text
+    assert text.endswith("\n")
+
+
+def test_labels_must_match(scratch_metrics):
+    counter = Counter("test_labelled_total", "Calls.", ("a", "b"))
+    with pytest.raises(ValueError):
+        counter.inc("only-one")
+
+
+@pytest.mark.parametrize(
+    "path, template",
+    [
+        ("/repos/pallets/flask", "/repos/{owner}/{repo}"),
+        ("/repos/pallets/flask/git/trees/abc123", "/repos/{owner}/{repo}/git/trees/{sha}"),
+        ("/repos/pallets/flask/contents/src/app.py", "/repos/{owner}/{repo}/contents/{path}"),
+        ("/repos/pallets/flask/compare/a...b", "/repos/{owner}/{repo}/compare/{basehead}"),
+        (
+            "/repos/pallets/flask/branches/release/2.x/protection",
+            "/repos/{owner}/{repo}/branches/{branch}/protection",
+        ),
+        ("/repos/pallets/flask/commits", "/repos/{owner}/{repo}/commits"),
+        ("/orgs/pallets/repos", "/orgs/{org}/repos"),
+        ("/graphql", "/graphql"),
+    ],
+)
+def test_endpoint_template(path, template):
+    assert endpoint_template(path) == template
+
+
+@pytest.mark.asyncio
+async def test_client_records_calls_and_etag_hits(httpx_mock: HTTPXMock):
+    endpoint = "/repos/{owner}/{repo}"
+    calls = GITHUB_REQUESTS.value("GET", endpoint, "200")
+    revalidated = GITHUB_REQUESTS.value("GET", endpoint, "304")
+    timed = GITHUB_LATENCY.count(endpoint)
+    hits = CACHE_EVENTS.value("etag", "hit")
+    misses = CACHE_EVENTS.value("etag", "miss")
+
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/test/metrics",
+        json={"name": "metrics"},
+        headers={"ETag": '"v1"', "X-RateLimit-Remaining": "4999", "X-RateLimit-Limit": "5000"},
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/test/metrics",
+        status_code=304,
+        headers={"X-RateLimit-Remaining": "4998", "X-RateLimit-Limit": "5000"},
+    )
+    async with GitHubClient(token="test") as client:
+        await client.get("/repos/test/metrics")
+        await client.get("/repos/test/metrics")
+
+    assert GITHUB_REQUESTS.value("GET", endpoint, "200") == calls + 1
+    assert GITHUB_REQUESTS.value("GET", endpoint, "304") == revalidated + 1
+    assert GITHUB_LATENCY.count(endpoint) == timed + 2
+    assert CACHE_EVENTS.value("etag", "hit") == hits + 1
+    assert CACHE_EVENTS.value("etag", "miss") == misses + 1
+    assert RATE_REMAINING.value() == 4998
@@ -0,0 +1,69 @@
+"""Tests for the path index and streaming tree parser."""
+
+import json
+
+import pytest
+
+from repocrunch.pathindex import PathIndex, TreeStreamParser
+
+TREE_RESPONSE = {
+    "sha": "t1",
+    "url": "https://api.github.com/repos/o/r/git/trees/t1",
+    "tree": [
+        {"path": "README.md", "mode": "100644", "type": "blob", "sha": "b1", "size": 12},
+        {"path": "src", "mode": "040000", "type": "tree", "sha": "t2"},
+        {"path": "src/café.py", "mode": "100644", "type": "blob", "sha": "b2", "size": 3},
+        {"path": "vendor/lib", "mode": "160000", "type": "commit", "sha": "c1"},
+    ],
+    "truncated": True,
+}
+
+
+def _parse(body: bytes, chunk_size: int) -> PathIndex:
+    parser = TreeStreamParser()
+    for i in range(0, len(body), chunk_size):
+        parser.feed(body[i : i + chunk_size])
+    return parser.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_stream_parser_matches_parsed_response(chunk_size):
+    body = json.dumps(TREE_RESPONSE, indent=2, ensure_ascii=False).encode()
+    index = _parse(body, chunk_size)
+
+    assert index.sha == "t1"
+    assert index.truncated is True
+    assert index.blobs == {"README.md", "src/café.py"}
+    assert index.dirs == {"src": "t2"}
+    assert index.root_blobs == {"README.md": "b1"}
+    assert index.tail == "vendor/lib"
+    assert "src" in index and "vendor/lib" not in index
+
+
+def test_stream_parser_rejects_incomplete_body():
+    body = json.dumps(TREE_RESPONSE).encode()
+    with pytest.raises(ValueError):
+        _parse(body[: len(body) // 2], 64)
+
+
+def test_dict_round_trip():
+    index = PathIndex.from_tree_data(TREE_RESPONSE)
+    restored = PathIndex.from_dict(json.loads(json.dumps(index.to_dict())))
+    assert restored.blobs == index.blobs
+    assert restored.dirs == index.dirs
+    assert restored.root_blobs == index.root_blobs
+    assert (restored.sha, restored.truncated, restored.tail) == ("t1", True, "vendor/lib")
+
+
+def test_prefix_queries():
+    index = PathIndex(
+        blobs=[
+            ".github/workflows/ci.yml", "Dockerfile", "services/api/Dockerfile",
+            "packages/a/package.json", "src/app/tests/test_x.py", "src/main_test.go",
+        ],
+        dirs=["packages", "packages/a"],
+    )
+    assert index.has_file_under(".github/")
+    assert not index.has_file_under(".gitlab/")
+    assert index.has_dir_under("packages/")
+    assert not index.has_dir_under("apps/")
@@ -0,0 +1,60 @@
+"""Tests for the field-driven analysis planner."""
+
+import pytest
+
+from repocrunch.planner import (
+    BRANCH_PROTECTION,
+    LANGUAGES,
+    MANIFESTS,
+    TREE,
+    plan_analysis,
+)
+
+
+def test_full_plan_needs_everything():
+    plan = plan_analysis()
+    assert plan.fields is None
+    assert plan.sections == {"summary", "tech_stack", "architecture", "health", "security"}
+    assert {LANGUAGES, TREE, MANIFESTS, BRANCH_PROTECTION} <= plan.needs
+
+
+def test_summary_needs_only_languages():
+    plan = plan_analysis(["summary"])
+    assert plan.sections == {"summary"}
+    assert plan.needs == {LANGUAGES}
+
+
+def test_single_field_narrows_section():
+    plan = plan_analysis(["security.branch_protection"])
+    assert plan.sections == {"security"}
+    assert plan.needs == {BRANCH_PROTECTION}
+
+
+def test_test_framework_pulls_in_tech_stack():
+    plan = plan_analysis(["architecture.test_framework"])
+    assert plan.sections == {"architecture", "tech_stack"}
+    assert plan.needs == {TREE, MANIFESTS}
+
+
+def test_top_level_field_needs_nothing_extra():
+    plan = plan_analysis(["repo"])
+    assert plan.sections == frozenset()
+    assert plan.needs == frozenset()
+
+
+def test_unknown_field_raises():
+    with pytest.raises(ValueError, match="Unknown field"):
+        plan_analysis(["nonexistent"])
+    with pytest.raises(ValueError):
+        plan_analysis(["security.nope"])
+
+
+def test_select_trims_to_requested_fields():
+    data = {
+        "repo": "o/r",
+        "summary": {"stars": 1, "forks": 2},
+        "security": {"has_env_file": True, "branch_protection": False},
+    }
+    plan = plan_analysis(["repo", "security.has_env_file"])
+    assert plan.select(data) == {"repo": "o/r", "security": {"has_env_file": True}}
+    assert plan_analysis().select(data) is data
@@ -0,0 +1,113 @@
+"""Tests for the analysis result cache."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from repocrunch.analyzer import WATCHERS_UNKNOWN, analyze_repo
+from repocrunch.cache import SQLiteCache
+from repocrunch.models import (
+    CommitFrequency,
+    Health,
+    MaintenanceStatus,
+    RepoAnalysis,
+    RepoSummary,
+)
+from repocrunch.results import ResultCache
+
+SHA = "c0ffee0000000000000000000000000000000000"
+RATE_HEADERS = {"X-RateLimit-Remaining": "4990", "X-RateLimit-Limit": "5000"}
+
+
+def _analysis(last_commit: datetime) -> RepoAnalysis:
+    return RepoAnalysis(
+        repo="o/r",
+        url="https://github.com/o/r",
+        analyzed_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        summary=RepoSummary(stars=5, age_days=1, last_commit=last_commit),
+        health=Health(
+            commit_frequency=CommitFrequency.weekly,
+            maintenance_status=MaintenanceStatus.actively_maintained,
+        ),
+    )
+
+
+def test_memory_hit_and_miss():
+    cache = ResultCache()
+    recent = datetime.now(timezone.utc) - timedelta(days=3)
+    cache.set("o", "r", SHA, _analysis(recent), {})
+
+    assert cache.get("o", "r", "other-sha") is None
+    hit = cache.get("O", "R", SHA)
+    assert hit is not None
+    assert hit.summary.stars == 5
+    assert hit.health.maintenance_status == MaintenanceStatus.actively_maintained
+
+
+def test_lru_evicts_oldest():
+    cache = ResultCache(max_entries=2)
+    recent = datetime.now(timezone.utc)
+    for sha in ("a", "b", "c"):
+        cache.set("o", "r", sha, _analysis(recent), {})
+    assert cache.get("o", "r", "a") is None
+    assert cache.get("o", "r", "c") is not None
+
+
+def test_persistent_tier_survives_new_instance(tmp_path):
+    created = (datetime.now(timezone.utc) - timedelta(days=400)).isoformat()
+    stale = datetime.now(timezone.utc) - timedelta(days=500)
+    writer = ResultCache(SQLiteCache(tmp_path / "cache.db"))
+    writer.set("o", "r", SHA, _analysis(stale), {"created_at": created})
+    writer.close()
+
+    reader = ResultCache(SQLiteCache(tmp_path / "cache.db"))
+    hit = reader.get("o", "r", SHA)
+    reader.close()
+
+    assert hit is not None
+    # Time-dependent fields are recomputed, not served as stored
+    assert hit.summary.age_days == 400
+    assert hit.health.maintenance_status == MaintenanceStatus.inactive
+
+
+@pytest.mark.asyncio
+async def test_unchanged_repo_costs_one_head_lookup(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/o/r/commits/HEAD", text=SHA, headers=RATE_HEADERS
+    )
+    cache = ResultCache()
+    cache.set("o", "r", SHA, _analysis(datetime.now(timezone.utc)), {})
+
+    result = await analyze_repo("o/r", token="test-token", result_cache=cache)
+
+    assert result.summary.stars == 5
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_hit_fills_in_watchers_missing_from_org_scan(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/o/r/commits/HEAD",
+        text=SHA,
+        headers=RATE_HEADERS,
+        is_reusable=True,
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/o/r",
+        json={"full_name": "o/r", "subscribers_count": 9, "private": False},
+        headers=RATE_HEADERS,
+    )
+    cache = ResultCache()
+    listed = _analysis(datetime.now(timezone.utc))
+    listed.warnings.append(WATCHERS_UNKNOWN)
+    cache.set("o", "r", SHA, listed, {"private": False})
+
+    result = await analyze_repo("o/r", token="test-token", result_cache=cache)
+    assert result.summary.watchers == 9
+    assert result.warnings == []
+
+    # The upgrade was stored: the next hit is one HEAD lookup again
+    result = await analyze_repo("o/r", token="test-token", result_cache=cache)
+    assert result.summary.watchers == 9
+    assert len(httpx_mock.get_requests()) == 3
@@ -0,0 +1,44 @@
+"""Tests for the compiled path rule engine."""
+
+import pytest
+
+from repocrunch.pathindex import PathIndex
+from repocrunch.rules import RuleSet, tree_signals
+
+
+def test_rule_kinds_match_in_one_pass():
+    rules = RuleSet({
+        "exact": ("Makefile",),
+        "prefix": (".github/workflows/*",),
+        "suffix": ("*_test.go",),
+        "dir": ("*/tests/*",),
+    })
+    counts = rules.match([
+        "Makefile", "src/Makefile", ".github/workflows/ci.yml",
+        "pkg/a_test.go", "pkg/b_test.go", "src/tests/test_x.py", "tests/root.py",
+    ])
+    assert counts == {"exact": 1, "prefix": 1, "suffix": 2, "dir": 1}
+
+
+def test_path_counts_once_per_signal():
+    rules = RuleSet({"tests": ("tests/*", "*_test.py")})
+    assert rules.match(["tests/foo_test.py"]) == {"tests": 1}
+
+
+def test_unsupported_pattern_is_rejected():
+    with pytest.raises(ValueError):
+        RuleSet({"bad": ("src/*/main.py",)})
+
+
+def test_tree_signals_cover_every_extractor():
+    tree = PathIndex(blobs=[
+        ".env", "SECURITY.md", ".github/dependabot.yml", ".github/workflows/ci.yml",
+        "services/api/Dockerfile", "poetry.lock", "tests/test_app.py", "pytest.ini",
+    ])
+    signals = tree_signals(tree)
+    for signal in (
+        "env_file", "security_policy", "dependabot", "ci:GitHub Actions",
+        "docker", "pm:poetry", "tests", "test_config:pytest.ini",
+    ):
+        assert signal in signals
+    assert "pm:npm" not in signals
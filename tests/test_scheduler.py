@@ -0,0 +1,136 @@
+"""Tests for the rate-limit-aware scheduler."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from repocrunch.client import GitHubClient, RateLimitError
+from repocrunch.scheduler import CALLS_PER_REPO, RateLimitScheduler
+from repocrunch.tokens import TokenPool
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _pool(remaining: int, reset_at: float, limit: int = 5000) -> TokenPool:
+    pool = TokenPool(["a"])
+    pool.update(pool.budgets[0], {
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Reset": str(int(reset_at)),
+    })
+    return pool
+
+
+def test_plan_predicts_calls():
+    scheduler = RateLimitScheduler()
+    assert scheduler.plan(10) == 10 * CALLS_PER_REPO
+    assert scheduler.plan(10, graphql=True) < 10 * CALLS_PER_REPO
+    assert scheduler.outstanding_calls == scheduler.planned_calls
+
+
+@pytest.mark.asyncio
+async def test_paces_requests_across_reset_window():
+    clock = FakeClock()
+    scheduler = RateLimitScheduler(sleep=clock.sleep, clock=clock)
+    scheduler.plan(1000)
+    pool = _pool(remaining=100, reset_at=clock.now + 1000)
+    for _ in range(3):
+        await scheduler.before_request(pool)
+    assert clock.sleeps == [10.0, 10.0]
+
+
+@pytest.mark.asyncio
+async def test_no_pacing_when_plan_fits_budget():
+    clock = FakeClock()
+    scheduler = RateLimitScheduler(sleep=clock.sleep, clock=clock)
+    scheduler.plan(1)
+    pool = _pool(remaining=100, reset_at=clock.now + 1000)
+    for _ in range(3):
+        await scheduler.before_request(pool)
+    assert clock.sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_unplanned_paces_only_when_budget_runs_low():
+    clock = FakeClock()
+    scheduler = RateLimitScheduler(sleep=clock.sleep, clock=clock)
+    for _ in range(3):
+        await scheduler.before_request(_pool(remaining=4000, reset_at=clock.now + 3000))
+    assert clock.sleeps == []
+
+    for _ in range(2):
+        await scheduler.before_request(_pool(remaining=300, reset_at=clock.now + 3000))
+    assert clock.sleeps == [10.0]
+
+
+def test_eta_accounts_for_reset_windows():
+    clock = FakeClock()
+    scheduler = RateLimitScheduler(clock=clock)
+    scheduler.plan(2000)  # 16000 calls
+    scheduler.completed_calls = 1000
+    clock.now += 100  # 10 calls/s observed
+    pool = _pool(remaining=0, reset_at=clock.now + 600)
+    # 15000 outstanding calls need three fresh windows of 5000
+    assert scheduler.eta(pool) == 600 + 2 * 3600
+
+
+@pytest.mark.asyncio
+async def test_client_pauses_until_reset(httpx_mock: HTTPXMock, monkeypatch):
+    clock = FakeClock(float(int(time.time())))
+    monkeypatch.setattr("repocrunch.tokens.time", SimpleNamespace(time=clock))
+    scheduler = RateLimitScheduler(sleep=clock.sleep, clock=clock)
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/test/repo",
+        json={"name": "repo"},
+        headers={"X-RateLimit-Remaining": "4999", "X-RateLimit-Limit": "5000"},
+    )
+    pool = _pool(remaining=0, reset_at=clock.now + 120)
+    async with GitHubClient(tokens=pool, scheduler=scheduler) as client:
+        assert await client.get("/repos/test/repo") == {"name": "repo"}
+    assert clock.sleeps == [121]
+    assert scheduler.completed_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_secondary_limit_honors_retry_after(httpx_mock: HTTPXMock):
+    clock = FakeClock()
+    scheduler = RateLimitScheduler(sleep=clock.sleep, clock=clock)
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/test/repo",
+        status_code=403,
+        headers={"Retry-After": "30", "X-RateLimit-Remaining": "4000"},
+        json={"message": "You have exceeded a secondary rate limit."},
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/test/repo",
+        json={"name": "repo"},
+        headers={"X-RateLimit-Remaining": "3999"},
+    )
+    async with GitHubClient(token="test", scheduler=scheduler) as client:
+        assert await client.get("/repos/test/repo") == {"name": "repo"}
+    assert clock.sleeps == [30.0]
+
+
+@pytest.mark.asyncio
+async def test_secondary_limit_raises_without_scheduler(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/test/repo",
+        status_code=403,
+        json={"message": "You have exceeded a secondary rate limit."},
+    )
+    async with GitHubClient(token="test") as client:
+        with pytest.raises(RateLimitError):
+            await client.get("/repos/test/repo")
@@ -0,0 +1,121 @@
+"""Tests for streaming tarball extraction."""
+
+import base64
+import io
+import tarfile
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+import repocrunch.tarball as tarball
+from repocrunch.analyzer import _fetch_tarball_tree
+from repocrunch.client import GitHubClient
+from repocrunch.tarball import read_tarball
+
+ROOT = "owner-repo-c0ffee"
+LONG_PATH = "src/" + "deeply/" * 20 + "nested.py"
+
+
+def _make_tarball() -> bytes:
+    buf = io.BytesIO()
+    with tarfile.open(
+        fileobj=buf, mode="w:gz", format=tarfile.PAX_FORMAT,
+        pax_headers={"comment": "c0ffee"},
+    ) as tar:
+        for name, data in [
+            ("package.json", b'{"dependencies": {"react": "1"}}'),
+            ("README.md", b"# readme\n" * 200),
+            ("docs/package.json", b"{}"),
+            (LONG_PATH, b"print('hi')\n"),
+        ]:
+            info = tarfile.TarInfo(f"{ROOT}/{name}")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+        directory = tarfile.TarInfo(f"{ROOT}/src")
+        directory.type = tarfile.DIRTYPE
+        tar.addfile(directory)
+    return buf.getvalue()
+
+
+async def _chunks(data: bytes, size: int = 97):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+@pytest.mark.asyncio
+async def test_read_tarball_streams_paths_and_wanted_files():
+    contents = await read_tarball(_chunks(_make_tarball()), wanted=lambda p: p == "package.json")
+    assert contents.commit_sha == "c0ffee"
+    assert contents.files == {"package.json": '{"dependencies": {"react": "1"}}'}
+    assert ("README.md", "blob") in contents.paths
+    assert ("docs/package.json", "blob") in contents.paths
+    assert (LONG_PATH, "blob") in contents.paths
+    assert ("src", "tree") in contents.paths
+    tree = contents.to_index()
+    assert "package.json" in tree.blobs
+    assert "src" in tree.dirs
+
+
+@pytest.mark.asyncio
+async def test_client_follows_codeload_redirect(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/owner/repo/tarball/c0ffee",
+        status_code=302,
+        headers={
+            "Location": "https://codeload.github.com/owner/repo/legacy.tar.gz/c0ffee",
+            "X-RateLimit-Remaining": "4999",
+            "X-RateLimit-Limit": "5000",
+        },
+    )
+    httpx_mock.add_response(
+        url="https://codeload.github.com/owner/repo/legacy.tar.gz/c0ffee",
+        content=_make_tarball(),
+    )
+    async with GitHubClient(token="test") as client:
+        contents = await read_tarball(
+            client.iter_tarball("owner", "repo", "c0ffee"), wanted=lambda p: p == "package.json"
+        )
+        assert "react" in contents.files["package.json"]
+        assert client.rate_remaining == 4999
+
+
+@pytest.mark.asyncio
+async def test_tarball_rotates_to_next_token(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/owner/repo/tarball/c0ffee",
+        status_code=403,
+        match_headers={"Authorization": "Bearer tok-a"},
+        headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Limit": "5000"},
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/owner/repo/tarball/c0ffee",
+        match_headers={"Authorization": "Bearer tok-b"},
+        content=_make_tarball(),
+        headers={"X-RateLimit-Remaining": "4999", "X-RateLimit-Limit": "5000"},
+    )
+    async with GitHubClient(tokens=["tok-a", "tok-b"]) as client:
+        contents = await read_tarball(
+            client.iter_tarball("owner", "repo", "c0ffee"), wanted=lambda p: p == "package.json"
+        )
+        assert "react" in contents.files["package.json"]
+
+
+@pytest.mark.asyncio
+async def test_oversized_manifest_is_fetched_separately(httpx_mock: HTTPXMock, monkeypatch):
+    monkeypatch.setattr(tarball, "MAX_FILE_BYTES", 16)  # package.json is 32 bytes
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/owner/repo/commits/HEAD", text="c0ffee"
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/owner/repo/tarball/c0ffee", content=_make_tarball()
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/owner/repo/contents/package.json",
+        json={"content": base64.b64encode(b'{"name": "big"}').decode(), "encoding": "base64"},
+    )
+    async with GitHubClient(token="test") as client:
+        tree = await _fetch_tarball_tree(client, "owner", "repo", [])
+        assert "package.json" in tree.blobs
+        assert await client.get_file_content("owner", "repo", "package.json") == '{"name": "big"}'
+        # Manifests missing from the tarball are still known absent, with no call
+        assert await client.get_file_content("owner", "repo", "Cargo.toml") is None
@@ -0,0 +1,75 @@
+"""Tests for the token pool."""
+
+import time
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from repocrunch.client import GitHubClient, RateLimitError
+from repocrunch.tokens import TokenPool
+
+
+def test_from_env_tokens(monkeypatch, tmp_path):
+    tokens_file = tmp_path / "tokens"
+    tokens_file.write_text("# nightly pool\nghp_c\n\nghp_a\n")
+    monkeypatch.setenv("GITHUB_TOKENS", "ghp_a, ghp_b")
+    monkeypatch.setenv("GITHUB_TOKENS_FILE", str(tokens_file))
+    assert TokenPool.from_env().tokens == ["ghp_a", "ghp_b", "ghp_c"]
+    assert TokenPool.from_env("explicit").tokens == ["explicit"]
+
+
+def test_from_env_falls_back_to_single_token(monkeypatch):
+    monkeypatch.delenv("GITHUB_TOKENS", raising=False)
+    monkeypatch.delenv("GITHUB_TOKENS_FILE", raising=False)
+    monkeypatch.setenv("GITHUB_TOKEN", "ghp_single")
+    assert TokenPool.from_env().tokens == ["ghp_single"]
+    monkeypatch.delenv("GITHUB_TOKEN")
+    assert TokenPool.from_env().tokens == [None]
+
+
+def test_acquire_prefers_most_headroom():
+    pool = TokenPool(["a", "b"])
+    pool.update(pool.budgets[0], {"X-RateLimit-Remaining": "10", "X-RateLimit-Limit": "5000"})
+    pool.update(pool.budgets[1], {"X-RateLimit-Remaining": "900", "X-RateLimit-Limit": "5000"})
+    assert pool.acquire().token == "b"
+    assert pool.remaining == 909
+    assert pool.limit == 10000
+
+
+def test_acquire_raises_when_all_exhausted():
+    reset = int(time.time()) + 600
+    pool = TokenPool(["a", "b"])
+    for budget in pool.budgets:
+        pool.update(budget, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)})
+    with pytest.raises(RateLimitError) as exc:
+        pool.acquire()
+    assert exc.value.reset_at == reset
+
+
+def test_acquire_restores_budget_after_reset():
+    pool = TokenPool(["a"])
+    pool.update(pool.budgets[0], {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1"})
+    assert pool.acquire().token == "a"
+
+
+@pytest.mark.asyncio
+async def test_client_rotates_to_next_token(httpx_mock: HTTPXMock):
+    reset = str(int(time.time()) + 600)
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/test/repo",
+        status_code=403,
+        match_headers={"Authorization": "Bearer tok-a"},
+        headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Limit": "5000", "X-RateLimit-Reset": reset},
+    )
+    httpx_mock.add_response(
+        url="https://api.github.com/repos/test/repo",
+        json={"name": "repo"},
+        match_headers={"Authorization": "Bearer tok-b"},
+        headers={"X-RateLimit-Remaining": "4999", "X-RateLimit-Limit": "5000"},
+    )
+    async with GitHubClient(tokens=["tok-a", "tok-b"]) as client:
+        data = await client.get("/repos/test/repo")
+        assert data == {"name": "repo"}
+        assert client.rate_remaining == 4999
+        # tok-a is spent until its reset, so everything now routes to tok-b
+        assert client.pool.acquire().token == "tok-b"
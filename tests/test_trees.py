@@ -0,0 +1,116 @@
+"""Tests for completing truncated recursive trees."""
+
+import pytest
+
+from repocrunch.pathindex import PathIndex
+from repocrunch.trees import complete_tree
+
+
+class FakeTreeClient:
+    """Serves git trees by SHA and records each fetch."""
+
+    def __init__(self, trees: dict[tuple[str, bool], dict]):
+        self.trees = trees
+        self.calls: list[tuple[str, bool]] = []
+
+    async def get_tree(self, owner, repo, sha, recursive=True, subtree=False):
+        self.calls.append((sha, recursive))
+        tree_data = self.trees.get((sha, recursive))
+        return PathIndex.from_tree_data(tree_data) if tree_data else None
+
+
+def _truncated_root() -> PathIndex:
+    # Listing was cut off inside src/, so .github/ and tests/ never appeared
+    return PathIndex.from_tree_data({
+        "sha": "root",
+        "truncated": True,
+        "tree": [
+            {"path": "README.md", "type": "blob", "sha": "b1"},
+            {"path": "src", "type": "tree", "sha": "t-src"},
+            {"path": "src/a.py", "type": "blob", "sha": "b2"},
+        ],
+    })
+
+
+TREES = {
+    ("root", False): {
+        "sha": "root",
+        "truncated": False,
+        "tree": [
+            {"path": ".github", "type": "tree", "sha": "t-gh"},
+            {"path": "README.md", "type": "blob", "sha": "b1"},
+            {"path": "src", "type": "tree", "sha": "t-src"},
+            {"path": "tests", "type": "tree", "sha": "t-tests"},
+        ],
+    },
+    ("t-src", False): {
+        "sha": "t-src",
+        "truncated": False,
+        "tree": [
+            {"path": "a.py", "type": "blob", "sha": "b2"},
+            {"path": "b.py", "type": "blob", "sha": "b3"},
+        ],
+    },
+    ("t-gh", True): {
+        "sha": "t-gh",
+        "truncated": False,
+        "tree": [
+            {"path": "workflows", "type": "tree", "sha": "t-wf"},
+            {"path": "workflows/ci.yml", "type": "blob", "sha": "b4"},
+        ],
+    },
+    ("t-tests", True): {
+        "sha": "t-tests",
+        "truncated": False,
+        "tree": [{"path": "test_a.py", "type": "blob", "sha": "b5"}],
+    },
+}
+
+
+@pytest.mark.asyncio
+async def test_untruncated_tree_is_returned_unchanged():
+    client = FakeTreeClient({})
+    tree = PathIndex(sha="root")
+    result = await complete_tree(client, "o", "r", tree)
+    assert result.index is tree
+    assert result.complete
+    assert client.calls == []
+
+
+@pytest.mark.asyncio
+async def test_truncated_tree_is_completed():
+    client = FakeTreeClient(TREES)
+    result = await complete_tree(client, "o", "r", _truncated_root())
+
+    assert result.index.blobs == {
+        ".github/workflows/ci.yml", "README.md", "src/a.py", "src/b.py", "tests/test_a.py",
+    }
+    assert set(result.index.dirs) == {".github", ".github/workflows", "src", "tests"}
+    assert result.index.root_blobs == {"README.md": "b1"}
+    assert result.complete
+    assert result.index.truncated is False
+    assert result.fetches == 4
+    # The root is re-listed first, then detection-relevant directories
+    assert client.calls[0] == ("root", False)
+
+
+@pytest.mark.asyncio
+async def test_fetch_budget_leaves_tree_marked_incomplete():
+    client = FakeTreeClient(TREES)
+    result = await complete_tree(client, "o", "r", _truncated_root(), max_fetches=2)
+
+    assert result.fetches == 2
+    assert not result.complete
+    assert result.skipped > 0
+    assert result.index.truncated is True
+
+
+@pytest.mark.asyncio
+async def test_failed_subtree_fetch_counts_as_skipped():
+    trees = {k: v for k, v in TREES.items() if k != ("t-tests", True)}
+    client = FakeTreeClient(trees)
+    result = await complete_tree(client, "o", "r", _truncated_root())
+
+    assert result.skipped == 1
+    assert not result.complete
+    assert "tests" in result.index.dirs